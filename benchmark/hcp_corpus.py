@@ -0,0 +1,124 @@
+import argparse
+import os
+import random
+from typing import NamedTuple
+
+
+class CorpusConfig(NamedTuple):
+    """生成するHCPファイル群の構成
+
+    Attributes:
+        file_count(int): 生成するファイル数
+        module_count(int): 1ファイルあたりのモジュール数
+        top_width(int): 関数の直下(レベル2)に並べる処理の数
+        width(int): 入れ子の中に並べる処理の数
+        depth(int): 入れ子の最大レベル
+        data_count(int): 1モジュールあたりのデータ数
+        io_density(float): 1処理あたりの\\in/\\outの平均個数
+        fork_ratio(float): 処理のうち\\forkとする割合
+        repeat_ratio(float): 処理のうち\\repeatとする割合
+        seed(int): 乱数の種
+    """
+
+    file_count: int = 4
+    module_count: int = 4
+    top_width: int = 50
+    width: int = 3
+    depth: int = 5
+    data_count: int = 20
+    io_density: float = 0.5
+    fork_ratio: float = 0.15
+    repeat_ratio: float = 0.1
+    seed: int = 0
+
+
+def generate_module(config: CorpusConfig, rand: random.Random, name: str) -> list[str]:
+    """1モジュール分の行を生成する
+
+    Args:
+        config (CorpusConfig): 生成する構成
+        rand (random.Random): 乱数生成器
+        name (str): モジュール名
+
+    Returns:
+        list[str]: モジュールを構成する行のリスト
+    """
+    lines = [f"\\module {name}"]
+
+    # データの半分はデータ部に記載し、残りは\in/\outだけで参照する
+    lines += [f"    \\data データ{count}" for count in range(config.data_count // 2)]
+
+    def io_text() -> str:
+        io_count = int(config.io_density) + (1 if rand.random() < config.io_density % 1 else 0)
+        return "".join(f" \\{rand.choice(['in', 'out'])} データ{rand.randrange(config.data_count)}" for _ in range(io_count))
+
+    step_count = 0
+
+    def add_block(level: int, width: int) -> None:
+        nonlocal step_count
+        indent = "    " * level
+        for _ in range(width):
+            step_count += 1
+            kind = rand.random()
+            nested = level < config.depth
+            if nested and kind < config.fork_ratio:
+                fork_no = step_count
+                lines.append(f"{indent}\\fork 分岐{fork_no}{io_text()}")
+                lines.append(f"{indent}    \\true 条件{fork_no}")
+                add_block(level + 2, config.width)
+                lines.append(f"{indent}    \\false 条件{fork_no}")
+                add_block(level + 2, config.width)
+            elif nested and kind < config.fork_ratio + config.repeat_ratio:
+                lines.append(f"{indent}\\repeat 繰り返し{step_count}{io_text()}")
+                add_block(level + 1, config.width)
+            else:
+                lines.append(f"{indent}処理{step_count}{io_text()}")
+
+    lines.append(f"    {name}の処理 \\in データ0 \\out データ1")
+    add_block(2, config.top_width)
+    return lines
+
+
+def generate_corpus(config: CorpusConfig, output_dir: str) -> list[str]:
+    """HCPファイル群を生成する
+
+    Args:
+        config (CorpusConfig): 生成する構成
+        output_dir (str): 出力先フォルダ
+
+    Returns:
+        list[str]: 生成したファイルパスのリスト
+    """
+    rand = random.Random(config.seed)
+    os.makedirs(output_dir, exist_ok=True)
+
+    file_paths: list[str] = []
+    for file_count in range(config.file_count):
+        lines: list[str] = []
+        for module_count in range(config.module_count):
+            lines += generate_module(config, rand, f"module{file_count}_{module_count}")
+            lines.append("")
+
+        file_path = os.path.join(output_dir, f"corpus{file_count}.hcp")
+        with open(file_path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines))
+        file_paths.append(file_path)
+
+    return file_paths
+
+
+def main() -> None:
+    default = CorpusConfig()
+    arg_parser = argparse.ArgumentParser(description="ベンチマーク用のHCPファイル群を生成する")
+    arg_parser.add_argument("output_dir", help="出力先フォルダ")
+    for field, value in default._asdict().items():
+        arg_parser.add_argument(f"--{field.replace('_', '-')}", type=type(value), default=value)
+    args = arg_parser.parse_args()
+
+    config = CorpusConfig(**{field: getattr(args, field) for field in CorpusConfig._fields})
+    for file_path in generate_corpus(config, args.output_dir):
+        print(file_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+import argparse
+import json
+import math
+import os
+import platform
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import main_cli  # noqa: E402
+from core import create_renderer, read_module_sections  # noqa: E402
+from hcp_corpus import CorpusConfig, generate_corpus  # noqa: E402
+from parse import DiagramParser  # noqa: E402
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+SCALES = [1, 2, 4]
+STAGES = ["file_parse", "diagram_parser", "render", "main_cli"]
+
+# 規模に対する処理時間の増え方(log(時間比) / log(行数比))の上限
+GROWTH_EXPONENT_MAX = 1.25
+# ベースラインに対する処理時間比の上限
+BASELINE_RATIO_MAX = 1.5
+
+
+def measure(func: Callable[[], object], repeat: int) -> float:
+    """処理時間を計測する
+
+    Args:
+        func (Callable[[], object]): 計測したい処理
+        repeat (int): 繰り返し回数
+
+    Returns:
+        float: 最も速かった回の処理時間(秒)
+    """
+    elapsed = math.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = min(elapsed, time.perf_counter() - start)
+    return elapsed
+
+
+def measure_stages(input_dir: str, output_dir: str, repeat: int) -> tuple[int, dict[str, float]]:
+    """各段階の処理時間を計測する
+
+    Args:
+        input_dir (str): HCPファイル群のフォルダ
+        output_dir (str): SVG画像の出力先フォルダ
+        repeat (int): 繰り返し回数
+
+    Returns:
+        tuple[int, dict[str, float]]: 総行数と、段階ごとの処理時間(秒)
+    """
+    file_paths = sorted(os.path.join(input_dir, name) for name in os.listdir(input_dir))
+    sections = [section for file_path in file_paths for section in read_module_sections(file_path)]
+    line_count = sum(len(section_lines) for _, section_lines in sections)
+
+    def file_parse() -> None:
+        for file_path in file_paths:
+            read_module_sections(file_path)
+
+    def diagram_parser() -> None:
+        for _, section_lines in sections:
+            DiagramParser(section_lines)
+
+    def render() -> None:
+        # 描画だけを計測するため、パースは計測の対象外とする
+        renderers = [create_renderer(section_name, section_lines) for section_name, section_lines in sections]
+        start = time.perf_counter()
+        for renderer in renderers:
+            renderer.render()
+        render_times.append(time.perf_counter() - start)
+
+    render_times: list[float] = []
+    for _ in range(repeat):
+        render()
+
+    elapsed = {
+        "file_parse": measure(file_parse, repeat),
+        "diagram_parser": measure(diagram_parser, repeat),
+        "render": min(render_times),
+        # 変換記録による読み飛ばしを避けるため、毎回全てのファイルを変換する
+        "main_cli": measure(lambda: main_cli.main(os.path.join(input_dir, ""), os.path.join(output_dir, ""), incremental=False), repeat),
+    }
+    return line_count, elapsed
+
+
+def run(config: CorpusConfig, repeat: int) -> dict:
+    """規模をn, 2n, 4nと変えて各段階の処理時間を計測する
+
+    Args:
+        config (CorpusConfig): 規模nとするHCPファイル群の構成
+        repeat (int): 繰り返し回数
+
+    Returns:
+        dict: 計測結果
+    """
+    line_counts: list[int] = []
+    seconds: dict[str, list[float]] = {stage: [] for stage in STAGES}
+    for scale in SCALES:
+        with tempfile.TemporaryDirectory() as work_dir:
+            input_dir = os.path.join(work_dir, "input")
+            output_dir = os.path.join(work_dir, "output")
+            os.makedirs(output_dir)
+            generate_corpus(config._replace(top_width=config.top_width * scale), input_dir)
+
+            line_count, elapsed = measure_stages(input_dir, output_dir, repeat)
+            line_counts.append(line_count)
+            for stage in STAGES:
+                seconds[stage].append(elapsed[stage])
+            print(f"scale={scale} lines={line_count} " + " ".join(f"{stage}={elapsed[stage]:.4f}s" for stage in STAGES))
+
+    # 最小規模と最大規模の比から増え方を求める
+    line_ratio = math.log(line_counts[-1] / line_counts[0])
+    return {
+        "python": platform.python_version(),
+        "config": config._asdict(),
+        "scales": SCALES,
+        "lines": line_counts,
+        "stages": {
+            stage: {
+                "seconds": seconds[stage],
+                "growth_exponent": math.log(seconds[stage][-1] / seconds[stage][0]) / line_ratio,
+            }
+            for stage in STAGES
+        },
+    }
+
+
+def check(result: dict, baseline: dict | None) -> list[str]:
+    """計測結果の問題点を列挙する
+
+    Args:
+        result (dict): 計測結果
+        baseline (dict | None): 比較するベースライン
+
+    Returns:
+        list[str]: 問題点のリスト
+    """
+    warnings: list[str] = []
+    for stage, stage_result in result["stages"].items():
+        if stage_result["growth_exponent"] > GROWTH_EXPONENT_MAX:
+            warnings.append(f"{stage}: 規模に対して線形より速く増加しています (指数 {stage_result['growth_exponent']:.2f})")
+
+        if baseline is None or stage not in baseline["stages"]:
+            continue
+
+        for scale, current, base in zip(result["scales"], stage_result["seconds"], baseline["stages"][stage]["seconds"], strict=False):
+            if current > base * BASELINE_RATIO_MAX:
+                warnings.append(f"{stage}: 規模{scale}nでベースラインの{current / base:.2f}倍です ({base:.4f}s -> {current:.4f}s)")
+
+    return warnings
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description="HCPファイルの変換を段階ごとに計測する")
+    arg_parser.add_argument("--output", default="bench_output.json", help="計測結果の出力先")
+    arg_parser.add_argument("--baseline", default=BASELINE_PATH, help="比較するベースライン")
+    arg_parser.add_argument("--update-baseline", action="store_true", help="計測結果をベースラインとして保存する")
+    arg_parser.add_argument("--repeat", type=int, default=3, help="各計測の繰り返し回数")
+    arg_parser.add_argument("--top-width", type=int, default=CorpusConfig().top_width, help="規模nとする処理の数")
+    args = arg_parser.parse_args()
+
+    result = run(CorpusConfig(top_width=args.top_width), args.repeat)
+
+    baseline = None
+    if os.path.exists(args.baseline) and not args.update_baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    result["warnings"] = check(result, baseline)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+
+    if args.update_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+
+    for warning in result["warnings"]:
+        print(f"WARNING {warning}")
+
+    sys.exit(1 if result["warnings"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import tempfile
+import tracemalloc
+from collections.abc import Callable
+from dataclasses import dataclass
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from core import read_module_sections  # noqa: E402
+from define import LineInfo  # noqa: E402
+from hcp_corpus import CorpusConfig, generate_corpus  # noqa: E402
+from parse import DiagramParser  # noqa: E402
+
+# ベースラインに対するメモリ使用量比の上限
+MEMORY_RATIO_MAX = 0.5
+
+
+# 比較の基準とする、__slots__を用いる前のパース結果の表現
+# 行ごとにレベルと種別の形式のインスタンスを持ち、入出力はリストで持つ
+
+
+class BaselineLineLevel:
+    def __init__(self, value: int) -> None:
+        self.value = value
+
+
+@dataclass
+class BaselineLineTypeFormat:
+    type_value: int = 0
+    type_format: str = ""
+
+
+@dataclass
+class BaselineDataInfo:
+    name: str
+    connect_line: object | None = None
+
+
+@dataclass
+class BaselineInOutData:
+    in_data_list: list[BaselineDataInfo]
+    out_data_list: list[BaselineDataInfo]
+    process_level: int
+
+
+@dataclass
+class BaselineLineInfo:
+    text_org: str
+    level: BaselineLineLevel
+    type: BaselineLineTypeFormat
+    text_typeless: str
+    iodata: BaselineInOutData | None
+    text_clean: str
+    no: int
+    next_no: int
+    before_no: int
+
+
+def copy_text(text: str) -> str:
+    """文字列を共有しないよう、同じ値の別のインスタンスを作成する
+
+    ベースラインでは行ごとに正規表現の結果から文字列を作成していたため、共有した文字列の分を計上する
+
+    Args:
+        text (str): 元の文字列
+
+    Returns:
+        str: 同じ値の別のインスタンス。空文字列は共有される
+    """
+    return (text + " ")[:-1]
+
+
+def to_baseline(line_info: LineInfo) -> BaselineLineInfo:
+    """パース結果の行の情報を、ベースラインの表現へ変換する
+
+    Args:
+        line_info (LineInfo): パース結果の行の情報
+
+    Returns:
+        BaselineLineInfo: 同じ値を持つベースラインの表現
+    """
+    iodata = None
+    if line_info.iodata is not None:
+        iodata = BaselineInOutData(
+            [BaselineDataInfo(copy_text(data.name)) for data in line_info.iodata.in_data_list],
+            [BaselineDataInfo(copy_text(data.name)) for data in line_info.iodata.out_data_list],
+            line_info.iodata.process_level,
+        )
+    return BaselineLineInfo(
+        copy_text(line_info.text_org),
+        BaselineLineLevel(line_info.level.value),
+        BaselineLineTypeFormat(line_info.type.type_value, line_info.type.type_format),
+        copy_text(line_info.text_typeless),
+        iodata,
+        copy_text(line_info.text_clean),
+        line_info.no,
+        line_info.next_no,
+        line_info.before_no,
+    )
+
+
+def measure_retained(create: Callable[[], object]) -> int:
+    """処理の結果として保持し続けるメモリ量を計測する
+
+    Args:
+        create (Callable[[], object]): 計測したい結果を作成する処理
+
+    Returns:
+        int: 作成した結果が保持するメモリ量(バイト)
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = create()
+        gc.collect()
+        retained, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return retained
+
+
+def run(config: CorpusConfig) -> dict:
+    """ベンチマーク用のHCPファイル群について、パース結果のメモリ使用量をベースラインの表現と比較する
+
+    Args:
+        config (CorpusConfig): HCPファイル群の構成
+
+    Returns:
+        dict: 計測結果
+    """
+    with tempfile.TemporaryDirectory() as work_dir:
+        generate_corpus(config, work_dir)
+        file_paths = sorted(os.path.join(work_dir, name) for name in os.listdir(work_dir))
+        sections = [section_lines for file_path in file_paths for _, section_lines in read_module_sections(file_path)]
+    line_count = sum(len(section_lines) for section_lines in sections)
+
+    # パースの途中で作成する一時的なオブジェクトは含めず、行ごとの情報として残る分だけを比べる
+    slots_bytes = measure_retained(lambda: [DiagramParser(section_lines).line_info_list for section_lines in sections])
+    line_info_lists = [DiagramParser(section_lines).line_info_list for section_lines in sections]
+    baseline_bytes = measure_retained(lambda: [[to_baseline(line_info) for line_info in line_info_list] for line_info_list in line_info_lists])
+
+    ratio = slots_bytes / baseline_bytes
+    print(f"lines={line_count} slots={slots_bytes / line_count:.1f}B/line baseline={baseline_bytes / line_count:.1f}B/line ratio={ratio:.2f}")
+    return {
+        "python": platform.python_version(),
+        "config": config._asdict(),
+        "lines": line_count,
+        "bytes": {"slots": slots_bytes, "baseline": baseline_bytes},
+        "bytes_per_line": {"slots": slots_bytes / line_count, "baseline": baseline_bytes / line_count},
+        "ratio": ratio,
+    }
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description="パース結果のメモリ使用量をベースラインの表現と比較する")
+    arg_parser.add_argument("--output", default="memory_output.json", help="計測結果の出力先")
+    arg_parser.add_argument("--top-width", type=int, default=CorpusConfig().top_width, help="生成する処理の数")
+    args = arg_parser.parse_args()
+
+    result = run(CorpusConfig(top_width=args.top_width))
+    result["warnings"] = (
+        [f"ベースラインの{result['ratio']:.2f}倍です (上限 {MEMORY_RATIO_MAX:.2f}倍)"] if result["ratio"] > MEMORY_RATIO_MAX else []
+    )
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+
+    for warning in result["warnings"]:
+        print(f"WARNING {warning}")
+
+    sys.exit(1 if result["warnings"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import sysconfig
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import main_cli  # noqa: E402
+from hcp_corpus import CorpusConfig, generate_corpus  # noqa: E402
+from run_benchmark import measure  # noqa: E402
+
+JOBS = [1, 2, 4, 8]
+
+
+def is_gil_enabled() -> bool:
+    """実行中のPythonでGILが有効か判定する
+
+    Returns:
+        bool: GILが有効ならTrue。3.13より前のPythonは常にTrue
+    """
+    is_gil_enabled_func = getattr(sys, "_is_gil_enabled", None)
+    return is_gil_enabled_func() if is_gil_enabled_func is not None else True
+
+
+def run(config: CorpusConfig, jobs_list: list[int], repeat: int) -> dict:
+    """ワーカの種類と数ごとに、全てのファイルを変換する処理時間を計測する
+
+    Args:
+        config (CorpusConfig): 変換するHCPファイル群の構成
+        jobs_list (list[int]): 計測するワーカ数のリスト
+        repeat (int): 繰り返し回数
+
+    Returns:
+        dict: 計測結果
+    """
+    seconds: dict[str, list[float]] = {executor: [] for executor in main_cli.EXECUTORS}
+    with tempfile.TemporaryDirectory() as work_dir:
+        input_dir = os.path.join(work_dir, "input", "")
+        output_dir = os.path.join(work_dir, "output", "")
+        os.makedirs(output_dir)
+        generate_corpus(config, input_dir)
+
+        # ワーカ数1は逐次変換とし、両方の種類で共通の基準とする
+        sequential = measure(lambda: main_cli.main(input_dir, output_dir, incremental=False), repeat)
+        print(f"sequential={sequential:.4f}s")
+        for executor in main_cli.EXECUTORS:
+            for jobs in jobs_list:
+                elapsed = (
+                    sequential
+                    if jobs == 1
+                    else measure(lambda: main_cli.main(input_dir, output_dir, incremental=False, jobs=jobs, executor=executor), repeat)
+                )
+                seconds[executor].append(elapsed)
+                print(f"executor={executor} jobs={jobs} {elapsed:.4f}s speedup={sequential / elapsed:.2f}")
+
+    return {
+        "python": platform.python_version(),
+        "free_threaded_build": bool(sysconfig.get_config_var("Py_GIL_DISABLED")),
+        "gil_enabled": is_gil_enabled(),
+        "cpu_count": os.cpu_count(),
+        "config": config._asdict(),
+        "jobs": jobs_list,
+        "executors": {
+            executor: {
+                "seconds": executor_seconds,
+                "speedup": [sequential / elapsed for elapsed in executor_seconds],
+            }
+            for executor, executor_seconds in seconds.items()
+        },
+    }
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description="プロセスとスレッドの並列変換のスケーリングを計測する")
+    arg_parser.add_argument("--output", default="scaling_output.json", help="計測結果の出力先")
+    arg_parser.add_argument("--jobs", type=int, nargs="+", default=JOBS, help="計測するワーカ数")
+    arg_parser.add_argument("--repeat", type=int, default=3, help="各計測の繰り返し回数")
+    arg_parser.add_argument("--file-count", type=int, default=16, help="生成するファイル数")
+    args = arg_parser.parse_args()
+
+    result = run(CorpusConfig(file_count=args.file_count), sorted(set(args.jobs)), args.repeat)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
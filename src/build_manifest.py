@@ -0,0 +1,133 @@
+import json
+import os
+from typing import NamedTuple
+
+
+class InputRecord(NamedTuple):
+    """前回の変換時の入力ファイルの状態
+
+    Attributes:
+        mtime_ns(int): 更新日時(ナノ秒)
+        size(int): ファイルサイズ
+        digest(str): ファイル内容のハッシュ値
+        outputs(list[str]): 出力したSVG画像のファイル名のリスト
+    """
+
+    mtime_ns: int
+    size: int
+    digest: str
+    outputs: list[str]
+
+
+class BuildManifest:
+    """入力ファイルと出力したSVG画像の対応を記録する
+
+    出力先フォルダへ保存し、次回の変換で変更のない入力ファイルを読み飛ばすために用いる
+    """
+
+    FILE_NAME = ".hcp_manifest.json"
+    FORMAT_VERSION = 1
+
+    def __init__(self, build_key: str, inputs: dict[str, InputRecord] | None = None) -> None:
+        """
+        初期化メソッド
+
+        Args:
+            build_key: ツールのバージョンなど、変わった場合に全ての入力を変換し直すべき情報
+            inputs: 入力ファイルのパスごとの状態
+        """
+        self.build_key = build_key
+        self.inputs: dict[str, InputRecord] = inputs if inputs is not None else {}
+
+    @classmethod
+    def load(cls, manifest_path: str) -> "BuildManifest":
+        """保存した記録を読み込む
+
+        Args:
+            manifest_path (str): 記録のファイルパス
+
+        Returns:
+            BuildManifest: 読み込んだ記録。ファイルがない場合や解釈できない場合は空の記録
+        """
+        try:
+            with open(manifest_path, encoding="utf-8") as f:
+                manifest = json.load(f)
+            if manifest["format_version"] != cls.FORMAT_VERSION:
+                return cls("")
+            inputs = {file_path: InputRecord(**record) for file_path, record in manifest["inputs"].items()}
+            return cls(manifest["build_key"], inputs)
+        except (OSError, ValueError, KeyError, TypeError):
+            return cls("")
+
+    def save(self, manifest_path: str) -> None:
+        """記録を保存する
+
+        書き込み途中で中断しても前回の記録が壊れないよう、一時ファイルを経由して置き換える
+
+        Args:
+            manifest_path (str): 記録のファイルパス
+        """
+        manifest = {
+            "format_version": self.FORMAT_VERSION,
+            "build_key": self.build_key,
+            "inputs": {file_path: record._asdict() for file_path, record in sorted(self.inputs.items())},
+        }
+        temp_path = manifest_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=1)
+        os.replace(temp_path, manifest_path)
+
+    def get_outputs(self) -> set[str]:
+        """記録されている全ての出力ファイル名を取得する
+
+        Returns:
+            set[str]: 出力ファイル名の集合
+        """
+        return {output for record in self.inputs.values() for output in record.outputs}
+
+    @staticmethod
+    def exists_outputs(record: InputRecord, output_path: str) -> bool:
+        """記録された出力ファイルが全て存在するかを判定する
+
+        Args:
+            record (InputRecord): 入力ファイルの記録
+            output_path (str): SVG画像を保存するフォルダパス
+
+        Returns:
+            bool: 全て存在すればTrue
+        """
+        return all(os.path.exists(os.path.join(output_path, output)) for output in record.outputs)
+
+    def get_up_to_date_record(self, file_path: str, stat: os.stat_result, output_path: str) -> InputRecord | None:
+        """更新日時とサイズが前回から変わっていない入力ファイルの記録を取得する
+
+        Args:
+            file_path (str): 入力ファイルのパス
+            stat (os.stat_result): 入力ファイルの現在の状態
+            output_path (str): SVG画像を保存するフォルダパス
+
+        Returns:
+            InputRecord | None: 変換し直す必要がなければ前回の記録、そうでなければNone
+        """
+        record = self.inputs.get(file_path)
+        if record is None or record.mtime_ns != stat.st_mtime_ns or record.size != stat.st_size:
+            return None
+        return record if self.exists_outputs(record, output_path) else None
+
+    def get_unchanged_record(self, file_path: str, digest: str, output_path: str) -> InputRecord | None:
+        """内容が前回から変わっていない入力ファイルの記録を取得する
+
+        更新日時だけが変わった場合に、変換し直さずに済ませるために用いる
+
+        Args:
+            file_path (str): 入力ファイルのパス
+            digest (str): 入力ファイルの現在の内容のハッシュ値
+            output_path (str): SVG画像を保存するフォルダパス
+
+        Returns:
+            InputRecord | None: 変換し直す必要がなければ前回の記録、そうでなければNone
+        """
+        record = self.inputs.get(file_path)
+        if record is None or record.digest != digest:
+            return None
+        return record if self.exists_outputs(record, output_path) else None
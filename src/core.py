@@ -1,56 +1,291 @@
+from collections.abc import Iterable, Iterator, Sequence
 from typing import NamedTuple
 
-from define import ParseInfo, ParseInfo4Render
+from define import ParseInfo, ParseInfo4Render, RenderOption
+from file_reader import HCPFileReader
+from line_level import LineLevel
 from parse import DiagramParser
 from parse_file import FileParse
+from profiler import get_profiler
 from render import SVGRenderer
+from render_cache import get_disk_render_cache, get_render_cache, get_section_digest
 
 
-class HCPInfo(NamedTuple):
+class HCPDocument(NamedTuple):
+    """ファイルを介さずに変換するhcpの文書
+
+    Attributes:
+        name(str): 文書の名前。変換結果のファイル名として用いる
+        text(str | Sequence[str]): hcpのテキスト、もしくはテキストを行に分けたもの
+    """
+
+    name: str
+    text: str | Sequence[str]
+
+
+class ModuleSVG(NamedTuple):
+    """モジュール単位の変換結果
+
+    Attributes:
+        file(str): 変換元の文書の名前
+        module(str): モジュール名
+        svg(str): モジュールのSVG
+    """
+
+    file: str
+    module: str
+    svg: str
+
+
+def split_module_sections(text: str | Sequence[str]) -> list[tuple[str, list[str]]]:
+    """hcpのテキストからモジュールごとのセクションを取得する
+
+    ファイルから読み込んだ場合と同じく、コメントと空行は取り除く
+
+    Args:
+        text (str | Sequence[str]): hcpのテキスト、もしくはテキストを行に分けたもの
+
+    Returns:
+        list[tuple[str, list[str]]]: モジュール名とセクション行のリストから成るタプルのリスト
+    """
+    if not isinstance(text, str):
+        text = "\n".join(text)
+    return FileParse.get_module_sections(FileParse.convert_text2lines(text))
+
+
+def open_module_sections(file_path: str) -> Iterator[tuple[str, list[str]]]:
+    """ファイルを開き、モジュールごとのセクションを順に取り出すイテレータを取得する
+
+    ファイルは開いた時点ではデコードせず、セクションを取り出すたびにそのセクションだけをデコードする
+    そのため、最初のモジュールは後続のセクションをデコードする前に処理できる
+    全てのセクションを取り出すとファイルを閉じる
+
+    Args:
+        file_path (str): 読み込むファイルパス
+
+    Returns:
+        Iterator[tuple[str, list[str]]]: モジュール名とセクション行のリストから成るタプルのイテレータ
+
+    Raises:
+        OSError: ファイルを開けない場合
+        ValueError: ファイルが空の場合
+    """
+    # 開けないファイルは、セクションを取り出す前にこの時点で検出する
+    with get_profiler().span("read", file=file_path):
+        reader = HCPFileReader(file_path)
+    return iter_reader_sections(reader)
+
+
+def iter_reader_sections(reader: HCPFileReader) -> Iterator[tuple[str, list[str]]]:
+    """開いたファイルからモジュールごとのセクションを順に取り出す
+
+    取り出した行はセクションが保持する、デコード済みの行のリストそのものとする
+
+    Args:
+        reader (HCPFileReader): 開いたファイルの読み込みクラス
+
+    Yields:
+        tuple[str, list[str]]: モジュール名とセクション行のリスト
+
+    Raises:
+        OSError: セクションをデコードできない場合
+    """
+    profiler = get_profiler()
+    with reader:
+        for section in reader.iter_module_sections():
+            with profiler.span("split", file=reader.file_path):
+                section_lines = section.lines()
+                profiler.add_counters(lines=len(section_lines), modules=1)
+            yield section.name, section_lines
+
+
+def read_module_sections(file_path: str) -> list[tuple[str, list[str]]]:
+    """ファイルを読み込んでモジュールごとのセクションを取得する
+
+    Args:
+        file_path (str): 読み込むファイルパス
+
+    Returns:
+        list[tuple[str, list[str]]]: モジュール名とセクション行のリストから成るタプルのリスト
+    """
+    return list(open_module_sections(file_path))
+
+
+def create_renderer(section_name: str, section_lines: list[str], option: RenderOption = RenderOption()) -> SVGRenderer:
+    """モジュールのセクションをパースして描画の準備をする
+
+    Args:
+        section_name (str): モジュール名
+        section_lines (list[str]): セクション行のリスト
+        option (RenderOption): 描画方法の指定
+
+    Returns:
+        SVGRenderer: パース結果を保持した描画クラス
+    """
+    # パース
+    profiler = get_profiler()
+    with profiler.span("parse", module=section_name):
+        parser = DiagramParser(section_lines)
+        profiler.add_counters(lines=len(section_lines))
+
+    parse_info_4_render = ParseInfo4Render(
+        ParseInfo(tuple(parser.process_line_info_list), parser.process_level_min),
+        ParseInfo(tuple(parser.data_line_info_list), parser.data_level_min),
+    )
+
+    return SVGRenderer(section_name, parse_info_4_render, option)
+
+
+def render_section(section_name: str, section_lines: list[str], option: RenderOption = RenderOption()) -> str:
+    """モジュールのセクションをSVGへ変換する
+
+    同じ内容と描画方法のセクションは、パースと描画を行わずにキャッシュから返す
+    プロセス内のキャッシュになければ、設定されていればディスク上のキャッシュを参照する
+
+    Args:
+        section_name (str): モジュール名
+        section_lines (list[str]): セクション行のリスト
+        option (RenderOption): 描画方法の指定
+
+    Returns:
+        str: モジュールのSVG
+    """
+    render_cache = get_render_cache()
+    digest = get_section_digest(section_name, section_lines, option)
+    svg_img = render_cache.get(digest)
+    if svg_img is not None:
+        get_profiler().add_counters(cache_hits=1)
+        return svg_img
+
+    disk_render_cache = get_disk_render_cache()
+    if disk_render_cache is not None:
+        svg_img = disk_render_cache.get(digest)
+
+    if svg_img is None:
+        svg_img = create_renderer(section_name, section_lines, option).render()
+        if disk_render_cache is not None:
+            disk_render_cache.put(digest, svg_img)
+    else:
+        get_profiler().add_counters(disk_cache_hits=1)
+
+    render_cache.put(digest, svg_img)
+    return svg_img
+
+
+class HCPInfo:
     """hcpに関する情報
 
+    SVG画像は初めて参照された時点でキャッシュを参照し、なければパースして描画する
+    生成時はインデントの誤りだけを検証し、パースはしない
+
     Attributes:
         name(str): モジュール名
-        raw_text(list[str]): svgへ変換する基の生文字列
+        raw_text(Sequence[str]): svgへ変換する基の生文字列
         svg_img(str): hcpファイルをパースしてレンダリングしたsvg画像の文字列
     """
 
-    name: str
-    raw_text: list[str]
-    svg_img: str
+    __slots__ = ("name", "raw_text", "option", "_svg_img")
+
+    def __init__(self, name: str, raw_text: Sequence[str], option: RenderOption = RenderOption()) -> None:
+        """
+        初期化メソッド
+
+        Args:
+            name: モジュール名
+            raw_text: svgへ変換する基の生文字列
+            option: 描画方法の指定
+
+        Raises:
+            ValueError: インデントの記載に誤りがある場合
+        """
+        self.name = name
+        # 渡された行をコピーせずに参照する
+        self.raw_text = raw_text
+        self.option = option
+        self._svg_img: str | None = None
+
+        # 誤りはSVG画像の参照を待たずに検出する
+        for line in self.raw_text:
+            LineLevel.get_line_level(line)
+
+    @property
+    def svg_img(self) -> str:
+        """SVG画像を取得する
 
+        Returns:
+            str: モジュールのSVG。初回のみ描画する
+        """
+        if self._svg_img is None:
+            self._svg_img = render_section(self.name, self.raw_text, self.option)
+        return self._svg_img
 
-def convert_file2hcp_info_list(file_path: str) -> list[HCPInfo]:
+
+def convert_file2hcp_info_list(file_path: str, option: RenderOption = RenderOption()) -> list[HCPInfo]:
     """ファイルからモジュール単位のSVG情報を取得する
 
+    読み込みまでを行い、SVG画像は各HCPInfoのsvg_imgを参照した時点でキャッシュを参照して描画する
+
     Args:
         file_path (str): 読み込むファイルパス
+        option (RenderOption): 描画方法の指定
 
     Returns:
-        list[tuple[str, str]]: モジュール名とモジュールのSVGから成るタプルのリスト
+        list[HCPInfo]: モジュール単位のSVG情報のリスト
     """
-    # ファイル読み込み
-    file_parser = FileParse()
-    file_text = file_parser.read_file(file_path)
-    file_lines = file_parser.convert_text2lines(file_text)
-
     # モジュールごとに処理する
+    profiler = get_profiler()
     hcp_info_list: list[HCPInfo] = []
-    module_sections = file_parser.get_module_sections(file_lines)
-    for module_section in module_sections:
-        section_name = module_section[0]
-        section_lines = module_section[1]
+    with profiler.span("file", file=file_path):
+        # 全てのセクションを取り出すとメモリマップを解放し、ファイルを開いたままにしない
+        for section_name, section_lines in open_module_sections(file_path):
+            with profiler.span("module", module=section_name):
+                hcp_info_list.append(HCPInfo(section_name, section_lines, option))
 
-        # パース
-        parser = DiagramParser(section_lines)
-        parse_info_4_render = ParseInfo4Render(
-            ParseInfo(parser.process_line_info_list, parser.process_level_min),
-            ParseInfo(parser.data_line_info_list, parser.data_level_min),
-        )
+    return hcp_info_list
 
-        # 描画
-        renderer = SVGRenderer(section_name, parse_info_4_render)
-        svg_output = renderer.render()
-        hcp_info_list.append(HCPInfo(section_name, section_lines, svg_output))
 
-    return hcp_info_list
+def iter_convert_documents(documents: Iterable[HCPDocument], option: RenderOption = RenderOption()) -> Iterator[ModuleSVG]:
+    """hcpの文書をモジュールごとにSVGへ変換し、変換した順に取り出す
+
+    Args:
+        documents (Iterable[HCPDocument]): 変換するhcpの文書
+        option (RenderOption): 描画方法の指定
+
+    Yields:
+        ModuleSVG: モジュール単位の変換結果
+    """
+    profiler = get_profiler()
+    for document in documents:
+        with profiler.span("split", file=document.name):
+            sections = split_module_sections(document.text)
+        for section_name, section_lines in sections:
+            with profiler.span("module", file=document.name, module=section_name):
+                svg_img = render_section(section_name, section_lines, option)
+            yield ModuleSVG(document.name, section_name, svg_img)
+
+
+def convert_documents(documents: Iterable[HCPDocument], option: RenderOption = RenderOption()) -> list[ModuleSVG]:
+    """複数のhcpの文書をまとめてモジュールごとにSVGへ変換する
+
+    Args:
+        documents (Iterable[HCPDocument]): 変換するhcpの文書
+        option (RenderOption): 描画方法の指定
+
+    Returns:
+        list[ModuleSVG]: 全ての文書のモジュール単位の変換結果のリスト
+    """
+    return list(iter_convert_documents(documents, option))
+
+
+def convert_text2svg_list(text: str | Sequence[str], name: str = "", option: RenderOption = RenderOption()) -> list[ModuleSVG]:
+    """hcpのテキストをモジュールごとにSVGへ変換する
+
+    Args:
+        text (str | Sequence[str]): hcpのテキスト、もしくはテキストを行に分けたもの
+        name (str): 文書の名前
+        option (RenderOption): 描画方法の指定
+
+    Returns:
+        list[ModuleSVG]: モジュール単位の変換結果のリスト
+    """
+    return convert_documents([HCPDocument(name, text)], option)
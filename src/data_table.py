@@ -0,0 +1,91 @@
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+
+from define import LineInfo
+
+
+@dataclass(slots=True)
+class DataSymbol:
+    """データ部の1データに関する情報
+
+    Attributes:
+        name(str): データ名
+        index(int): データ部の情報を作成する元の行の位置。処理部のin/outだけに記載されたデータは-1
+        line_info(LineInfo | None): データ部の情報。作成するまではNone
+        readers(list[LineInfo]): データを\\inで参照する処理部の情報リスト
+        writers(list[LineInfo]): データを\\outで参照する処理部の情報リスト
+    """
+
+    NO_INDEX = -1
+
+    name: str
+    index: int = NO_INDEX
+    line_info: LineInfo | None = None
+    readers: list[LineInfo] = field(default_factory=list)
+    writers: list[LineInfo] = field(default_factory=list)
+
+
+class DataSymbolTable:
+    """データ名をキーとしてデータ部の情報を管理する
+
+    登録順を保持したまま、データ名から一定時間で情報を引けるようにする
+    パース結果の行の情報は変更できないため、先に名前と元の行の位置で登録し、行の情報は作成してから設定する
+    """
+
+    def __init__(self) -> None:
+        self._symbols: dict[str, DataSymbol] = {}
+
+    def __len__(self) -> int:
+        return len(self._symbols)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._symbols
+
+    def __iter__(self) -> Iterator[DataSymbol]:
+        return iter(self._symbols.values())
+
+    def add(self, name: str, index: int = DataSymbol.NO_INDEX) -> DataSymbol:
+        """データを登録する
+
+        同じ名前のデータが登録済みなら登録済みの情報を優先する
+
+        Args:
+            name (str): データ名
+            index (int): データ部の情報を作成する元の行の位置
+
+        Returns:
+            DataSymbol: データ名に対応する登録済みの情報
+        """
+        symbol = self._symbols.get(name)
+        if symbol is None:
+            symbol = DataSymbol(name, index)
+            self._symbols[name] = symbol
+
+        return symbol
+
+    def get(self, name: str) -> DataSymbol | None:
+        """データ名に対応する情報を取得する
+
+        Args:
+            name (str): データ名
+
+        Returns:
+            DataSymbol | None: 登録済みならその情報、未登録ならNone
+        """
+        return self._symbols.get(name)
+
+    def get_indexes(self) -> list[int]:
+        """登録順に、データ部の情報を作成する元の行の位置を取得する
+
+        Returns:
+            list[int]: 元の行の位置のリスト。処理部のin/outだけに記載されたデータは含まない
+        """
+        return [symbol.index for symbol in self._symbols.values() if symbol.index != DataSymbol.NO_INDEX]
+
+    def get_line_info_list(self) -> list[LineInfo]:
+        """登録順にデータ部の情報リストを取得する
+
+        Returns:
+            list[LineInfo]: データ部の情報リスト。行の情報を設定していないデータは含まない
+        """
+        return [symbol.line_info for symbol in self._symbols.values() if symbol.line_info is not None]
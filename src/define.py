@@ -2,55 +2,36 @@ from dataclasses import dataclass
 from typing import NamedTuple
 
 from line_level import LineLevel
-from line_type import LineTypeFormat
+from line_type import LineTypeDefine, LineTypeEnum, LineTypeFormat
 
+# 行ごと・要素ごとに大量に生成されるクラスは、__dict__を持たないよう__slots__を用いる
 
-@dataclass
-class Coordinate:
-    x: int
-    y: int
 
+# パース結果は描画時に変更しないよう、変更できないクラスとする
+# 1つのパース結果を、複数の描画で同時に参照しても安全にしておく
 
-class Line:
-    start: Coordinate
-    end: Coordinate
 
-    def line_width(self) -> int:
-        return abs(self.start.x - self.end.x)
-
-    def line_height(self) -> int:
-        return abs(self.start.y - self.end.y)
-
-
-@dataclass
-class Process2Data:
-    exit_from_process: Line | None = None
-    between_process_data: Line | None = None
-    enter_to_data: Line | None = None
-    color: str = "black"
-
-
-@dataclass
+@dataclass(frozen=True, slots=True)
 class DataInfo:
     name: str
-    connect_line: Process2Data | None = None
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class InOutData:
-    in_data_list: list[DataInfo]
-    out_data_list: list[DataInfo]
+    in_data_list: tuple[DataInfo, ...]
+    out_data_list: tuple[DataInfo, ...]
     process_level: int
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class LineInfo:
     DEFAULT_VALUE = -1
 
     text_org: str = ""
-    level: LineLevel | None = None
+    # レベルと種別の形式は値ごとに1つのインスタンスを全ての行で共有する
+    level: LineLevel = LineLevel.of(LineLevel.LEVEL_MIN)
 
-    type: LineTypeFormat | None = None
+    type: LineTypeFormat = LineTypeDefine.get_format_by_type(LineTypeEnum.NORMAL)
     text_typeless: str = ""
 
     iodata: InOutData | None = None
@@ -60,31 +41,26 @@ class LineInfo:
     next_no: int = DEFAULT_VALUE
     before_no: int = DEFAULT_VALUE
 
-    def __post_init__(self) -> None:
-        if self.level is None:
-            self.level = LineLevel()
 
-        if self.type is None:
-            self.type = LineTypeFormat()
+class RenderOption(NamedTuple):
+    """描画方法の指定
+
+    Attributes:
+        use_symbols(bool): 図形を<defs>へ定義して<use>で配置する場合はTrue
+        batch_lines(bool): 線分を色ごとに<path>へまとめる場合はTrue
+        font_path(str | None): 文字列の幅を求めるフォントファイルのパス
+    """
+
+    use_symbols: bool = False
+    batch_lines: bool = False
+    font_path: str | None = None
 
 
 class ParseInfo(NamedTuple):
-    line_info_list: list[LineInfo]
+    line_info_list: tuple[LineInfo, ...]
     level_min: int
 
 
 class ParseInfo4Render(NamedTuple):
     process_parse_info: ParseInfo
     data_parse_info: ParseInfo
-
-
-@dataclass
-class DiagramElement:
-    LEVEL_SHIFT = 30
-
-    line_info: LineInfo
-
-    x: int = 0
-    y: int = 0
-
-    end_x: int = 0
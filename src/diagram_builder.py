@@ -0,0 +1,164 @@
+import sys
+from collections.abc import Sequence
+
+from define import ParseInfo, ParseInfo4Render, RenderOption
+from line_level import LineLevel
+from line_lexer import LexedLine
+from line_type import LineTypeDefine, LineTypeEnum
+from parse import DiagramParser
+from render import SVGRenderer
+
+
+class DiagramBuilder:
+    """hcpのテキストを介さずに、モジュールの図を組み立てる
+
+    処理・データを追加するたびに構造を検証し、誤りがあればその時点でエラーとする
+    組み立てた結果はDiagramParserでテキストをパースした場合と同じパース結果になる
+    """
+
+    # 処理として追加できない種別
+    _NOT_STEP_TYPES = (LineTypeEnum.DATA, LineTypeEnum.MODULE)
+    # 条件分岐(\fork)の直下にのみ追加できる種別
+    _FORK_CHILD_TYPES = (LineTypeEnum.TRUE, LineTypeEnum.FALSE, LineTypeEnum.BRANCH)
+
+    def __init__(self) -> None:
+        self._lines: list[tuple[str, LexedLine]] = []
+        # 最後に追加した処理・データのレベル
+        self._last_step_level: int | None = None
+        self._last_data_level: int | None = None
+        # 直前の処理から遡って辿れる、レベルごとの処理の種別
+        self._step_types: list[LineTypeEnum] = []
+        self._data_names: set[str] = set()
+
+    @staticmethod
+    def validate_level(level: int, last_level: int | None) -> None:
+        """追加する行のレベルを検証する
+
+        Args:
+            level (int): 追加する行のレベル
+            last_level (int | None): 同じ部(処理部もしくはデータ部)に最後に追加した行のレベル
+
+        Raises:
+            ValueError: レベルが負の場合、もしくは直前の行より2以上深い場合
+        """
+        if level < LineLevel.LEVEL_MIN:
+            raise ValueError(f"Wrong level: {level}")
+        if last_level is not None and level > last_level + 1:
+            raise ValueError(f"Level is too deep: {level} (previous: {last_level})")
+
+    @staticmethod
+    def validate_name(name: str) -> str:
+        """データ名を検証する
+
+        Args:
+            name (str): データ名
+
+        Returns:
+            str: 同じ名前と文字列を共有したデータ名
+
+        Raises:
+            ValueError: データ名が空、もしくは空白を含む場合
+        """
+        if not name or len(name.split()) != 1 or name != name.strip():
+            raise ValueError(f"Wrong data name: {name!r}")
+        return sys.intern(name)
+
+    def add_step(
+        self,
+        text: str,
+        level: int,
+        line_type: LineTypeEnum = LineTypeEnum.NORMAL,
+        in_data: Sequence[str] = (),
+        out_data: Sequence[str] = (),
+    ) -> "DiagramBuilder":
+        """処理部へ処理を追加する
+
+        Args:
+            text (str): 処理の文字列
+            level (int): 処理のレベル
+            line_type (LineTypeEnum): 処理の種別
+            in_data (Sequence[str]): 入力するデータ名
+            out_data (Sequence[str]): 出力するデータ名
+
+        Returns:
+            DiagramBuilder: 続けて追加できるよう自身を返す
+
+        Raises:
+            ValueError: 処理の構造や文字列に誤りがある場合
+        """
+        if line_type in self._NOT_STEP_TYPES:
+            raise ValueError(f"Wrong step type: {line_type}")
+        if "\n" in text or "\r" in text:
+            raise ValueError(f"Step text must be one line: {text!r}")
+        if line_type is LineTypeEnum.NORMAL and not text.strip():
+            raise ValueError("Step text is empty")
+        self.validate_level(level, self._last_step_level)
+
+        # \true・\false・\branchは\forkの1つ下のレベルにのみ置ける
+        if line_type in self._FORK_CHILD_TYPES:
+            parent_type = self._step_types[level - 1] if 0 < level <= len(self._step_types) else None
+            if parent_type is not LineTypeEnum.FORK:
+                raise ValueError(f"{LineTypeDefine.get_format_by_type(line_type).type_format} must be placed under \\fork: {text!r}")
+
+        in_names = [self.validate_name(name) for name in in_data]
+        out_names = [self.validate_name(name) for name in out_data]
+
+        del self._step_types[level:]
+        self._step_types.extend([LineTypeEnum.NORMAL] * (level - len(self._step_types)))
+        self._step_types.append(line_type)
+        self._last_step_level = level
+
+        lexed = LexedLine(level, LineTypeDefine.get_format_by_type(line_type), text, in_names, out_names, text.strip())
+        self._lines.append((text, lexed))
+        return self
+
+    def add_data(self, name: str, level: int) -> "DiagramBuilder":
+        """データ部へデータを追加する
+
+        Args:
+            name (str): データ名
+            level (int): データのレベル
+
+        Returns:
+            DiagramBuilder: 続けて追加できるよう自身を返す
+
+        Raises:
+            ValueError: レベルやデータ名に誤りがある場合、もしくは同じ名前のデータを追加済みの場合
+        """
+        name = self.validate_name(name)
+        if name in self._data_names:
+            raise ValueError(f"Data is already defined: {name}")
+        self.validate_level(level, self._last_data_level)
+
+        self._data_names.add(name)
+        self._last_data_level = level
+
+        lexed = LexedLine(level, LineTypeDefine.get_format_by_type(LineTypeEnum.DATA), name, [], [], name)
+        self._lines.append((name, lexed))
+        return self
+
+    def build(self) -> ParseInfo4Render:
+        """組み立てた図から描画用のパース結果を作成する
+
+        呼び出すたびに新しいパース結果を作成するため、描画後に続けて追加してもよい
+
+        Returns:
+            ParseInfo4Render: 描画用のパース結果
+        """
+        parser = DiagramParser.from_lexed_lines(self._lines)
+        return ParseInfo4Render(
+            ParseInfo(tuple(parser.process_line_info_list), parser.process_level_min),
+            ParseInfo(tuple(parser.data_line_info_list), parser.data_level_min),
+        )
+
+    def build_renderer(self, name: str, option: RenderOption = RenderOption()) -> SVGRenderer:
+        """組み立てた図を描画する描画クラスを作成する
+
+        Args:
+            name (str): モジュール名
+            option (RenderOption): 描画方法の指定
+
+        Returns:
+            SVGRenderer: パース結果を保持した描画クラス
+        """
+        return SVGRenderer(name, self.build(), option)
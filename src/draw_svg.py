@@ -1,8 +1,74 @@
 import math
 from collections.abc import Callable
 
-from define import DiagramElement
+from define import LineInfo
 from line_type import LineTypeDefine, LineTypeEnum
+from svg_writer import SvgSink
+from text_metrics import TextMetrics, get_text_metrics
+
+
+class LinePathBatch:
+    """線分を色ごとにまとめて<path>として描画する
+
+    線分ごとに<line>要素を作らず、相対座標のコマンドを連結して要素数を減らす
+    """
+
+    def __init__(self) -> None:
+        self._commands: dict[str, list[str]] = {}
+        self._cursors: dict[str, tuple[int, int]] = {}
+
+    def add(self, x1: int, y1: int, x2: int, y2: int, color: str = "black") -> None:
+        """線分を追加する
+
+        Args:
+            x1 (int): 始点のX座標
+            y1 (int): 始点のY座標
+            x2 (int): 終点のX座標
+            y2 (int): 終点のY座標
+            color (str): 線の色
+        """
+        commands = self._commands.setdefault(color, [])
+        cursor = self._cursors.get(color)
+
+        # 始点へ移動する。直前の終点から続く場合は移動を省略する
+        if cursor is None:
+            commands.append(f"M{x1} {y1}")
+        elif cursor != (x1, y1):
+            commands.append(f"m{x1 - cursor[0]} {y1 - cursor[1]}")
+
+        commands.append(self.create_line_command(x2 - x1, y2 - y1))
+        self._cursors[color] = (x2, y2)
+
+    @staticmethod
+    def create_line_command(dx: int, dy: int) -> str:
+        """現在の位置から線分を引く相対座標のコマンドを生成する
+
+        水平線と垂直線は短いコマンドで表す
+
+        Args:
+            dx (int): X方向の移動量
+            dy (int): Y方向の移動量
+
+        Returns:
+            str: パスのコマンド
+        """
+        if dy == 0:
+            return f"h{dx}"
+        if dx == 0:
+            return f"v{dy}"
+        return f"l{dx} {dy}"
+
+    def flush(self, svg: SvgSink) -> None:
+        """まとめた線分を色ごとに描画して空にする
+
+        Args:
+            svg (SvgSink): 描画先
+        """
+        for color, commands in self._commands.items():
+            svg.append(f'<path d="{"".join(commands)}" stroke="{color}" fill="none"/>')
+
+        self._commands.clear()
+        self._cursors.clear()
 
 
 class DrawSvg:
@@ -14,35 +80,35 @@ class DrawSvg:
 
     FONT_SIZE_PX = 12
 
-    @classmethod
-    def get_string_widths(cls, string: str) -> int:
-        """文字列の幅を取得する
+    def __init__(self, text_metrics: TextMetrics | None = None) -> None:
+        # 文字列の幅の計算は、指定がなければ共有のものを使う
+        self.text_metrics = text_metrics if text_metrics is not None else get_text_metrics()
 
-        2バイト文字を基準に積算する
-        1バイト文字は、0.5文字扱いとする
+        # 設定されていれば、線分は要素として描画せずにまとめる
+        self.line_batch: LinePathBatch | None = None
 
-        Args:
-            string (str): 幅を取得したい文字列
+    def create_defs(self) -> list[str]:
+        """SVGの先頭に置く定義を生成する
+
+        Returns:
+            list[str]: 定義を構成する文字列リスト。定義が不要なら空のリスト
+        """
+        return []
+
+    def create_glyph_defs(self) -> list[str]:
+        """描画した要素が参照する図形の定義を生成する
+
+        要素を描画し終えてから、SVGの末尾に置く
 
         Returns:
-            int: 文字列の幅。端数は切り上げ。
+            list[str]: 定義を構成する文字列リスト。定義が不要なら空のリスト
         """
-        count_bytes: float = 0
-        for char in string:
-            # ASCII文字(1バイト文字)
-            if ord(char) < 128:
-                count_bytes += 0.5
-            # それ以外(2バイト文字)
-            else:
-                count_bytes += 1.0
-        string_bytes = math.ceil(count_bytes)
-        return string_bytes
+        return []
 
     def get_text_width(self, text: str, font_px: int) -> int:
-        text_bytes = self.get_string_widths(text.strip())
-        return text_bytes * font_px
+        return self.text_metrics.get_text_width(text.strip(), font_px)
 
-    def draw_text(self, svg: list[str], center_x: int, center_y: int, text: str, font_size: int = 100, rotate: int = 0) -> int:
+    def draw_text(self, svg: SvgSink, center_x: int, center_y: int, text: str, font_size: int = 100, rotate: int = 0) -> int:
         font_px = int(DrawSvg.FONT_SIZE_PX * (font_size / 100))
         svg.append(
             f'<text x="{center_x}" y="{center_y}" '
@@ -53,7 +119,7 @@ class DrawSvg:
         text_width = self.get_text_width(text, font_px)
         return text_width
 
-    def draw_string(self, svg: list[str], center_x: int, center_y: int, text: str, font_size: int = 100, rotate: int = 0) -> int:
+    def draw_string(self, svg: SvgSink, center_x: int, center_y: int, text: str, font_size: int = 100, rotate: int = 0) -> int:
         if text != "":
             figure_2_text_space = self.CIRCLE_R + self.SPACE_FIGURE_TO_TEXT
             text_width = self.draw_text(svg, center_x + figure_2_text_space, center_y, text, font_size, rotate)
@@ -65,49 +131,58 @@ class DrawSvg:
         end_x = center_x + figure_2_text_space + text_width + DrawSvg.TEXT_MARGIN
         return end_x
 
-    @staticmethod
-    def draw_line(svg: list[str], x1: int, y1: int, x2: int, y2: int, color: str = "black") -> None:
+    def draw_line(self, svg: SvgSink, x1: int, y1: int, x2: int, y2: int, color: str = "black") -> None:
+        if self.line_batch is not None:
+            self.line_batch.add(x1, y1, x2, y2, color)
+            return
+
         svg.append(f'<line x1="{x1}" y1="{y1}" x2="{x2}" y2="{y2}" stroke="{color}"/>')
 
-    def draw_line_h(self, svg: list[str], center_x: int, center_y: int, length: int, color: str = "black") -> None:
+    def draw_line_h(self, svg: SvgSink, center_x: int, center_y: int, length: int, color: str = "black") -> None:
         self.draw_line(svg, x1=center_x, y1=center_y, x2=(center_x + length), y2=center_y, color=color)
 
-    def draw_line_v(self, svg: list[str], center_x: int, center_y: int, length: int, color: str = "black") -> None:
+    def draw_line_v(self, svg: SvgSink, center_x: int, center_y: int, length: int, color: str = "black") -> None:
         self.draw_line(svg, x1=center_x, y1=center_y, x2=center_x, y2=(center_y + length), color=color)
 
-    def draw_arrow_r(self, svg: list[str], center_x: int, center_y: int, length: int, color: str = "black") -> None:
+    def draw_arrow_r(self, svg: SvgSink, center_x: int, center_y: int, length: int, color: str = "black") -> None:
+        end_x = center_x + length
+        self.draw_line(svg, x1=center_x, y1=center_y, x2=end_x, y2=center_y, color=color)
+        self.draw_arrow_head_r(svg, end_x, center_y, color)
+
+    def draw_arrow_l(self, svg: SvgSink, center_x: int, center_y: int, length: int, color: str = "black") -> None:
         end_x = center_x + length
         self.draw_line(svg, x1=center_x, y1=center_y, x2=end_x, y2=center_y, color=color)
+        self.draw_arrow_head_l(svg, center_x, center_y, color)
+
+    def draw_arrow_head_r(self, svg: SvgSink, tip_x: int, tip_y: int, color: str = "black") -> None:
         arrow_hed = self.ARROW_HEAD
         svg.append(
-            f'<path d="M {end_x} {center_y} '
-            f'L {end_x - arrow_hed} {center_y - int(arrow_hed / 2)} L {end_x - arrow_hed} {center_y + int(arrow_hed / 2)}" '
+            f'<path d="M {tip_x} {tip_y} '
+            f'L {tip_x - arrow_hed} {tip_y - int(arrow_hed / 2)} L {tip_x - arrow_hed} {tip_y + int(arrow_hed / 2)}" '
             f'stroke="{color}" fill="{color}" />'
         )
 
-    def draw_arrow_l(self, svg: list[str], center_x: int, center_y: int, length: int, color: str = "black") -> None:
-        end_x = center_x + length
-        self.draw_line(svg, x1=center_x, y1=center_y, x2=end_x, y2=center_y, color=color)
+    def draw_arrow_head_l(self, svg: SvgSink, tip_x: int, tip_y: int, color: str = "black") -> None:
         arrow_hed = self.ARROW_HEAD
         svg.append(
-            f'<path d="M {center_x} {center_y} '
-            f'L {center_x + arrow_hed} {center_y - int(arrow_hed / 2)} L {center_x + arrow_hed} {center_y + int(arrow_hed / 2)}" '
+            f'<path d="M {tip_x} {tip_y} '
+            f'L {tip_x + arrow_hed} {tip_y - int(arrow_hed / 2)} L {tip_x + arrow_hed} {tip_y + int(arrow_hed / 2)}" '
             f'stroke="{color}" fill="{color}" />'
         )
 
-    def draw_figure_level_start(self, svg: list[str], center_x: int, center_y: int) -> None:
+    def draw_figure_level_start(self, svg: SvgSink, center_x: int, center_y: int) -> None:
         # 垂直線の追加 上
         self.draw_line_v(svg, center_x, center_y - self.CIRCLE_R * 2, self.CIRCLE_R)
         # 水平線の追加 上
         self.draw_line_h(svg, (center_x - self.CIRCLE_R), center_y - (self.CIRCLE_R * 2), (self.CIRCLE_R * 2))
 
-    def draw_figure_level_end(self, svg: list[str], center_x: int, center_y: int) -> None:
+    def draw_figure_level_end(self, svg: SvgSink, center_x: int, center_y: int) -> None:
         # 垂直線の追加 下
         self.draw_line_v(svg, center_x, center_y + self.CIRCLE_R, self.CIRCLE_R)
         # 水平線の追加 下
         self.draw_line_h(svg, (center_x - self.CIRCLE_R), center_y + (self.CIRCLE_R * 2), (self.CIRCLE_R * 2))
 
-    def draw_figure_level_step(self, svg: list[str], center_x: int, center_y: int) -> None:
+    def draw_figure_level_step(self, svg: SvgSink, center_x: int, center_y: int) -> None:
         # 垂直線の追加 上
         self.draw_line_v(svg, center_x, center_y - self.CIRCLE_R * 2, self.CIRCLE_R)
         # 水平線の追加 上
@@ -115,7 +190,7 @@ class DrawSvg:
         # 垂直線の追加 上
         self.draw_line_v(svg, (center_x - self.CIRCLE_R * 2), center_y - self.CIRCLE_R * 4, self.CIRCLE_R * 2)
 
-    def draw_figure_normal(self, svg: list[str], center_x: int, center_y: int, text: str = "") -> int:
+    def draw_figure_normal(self, svg: SvgSink, center_x: int, center_y: int, text: str = "") -> int:
         svg.append(f'<circle cx="{center_x}" cy="{center_y}" r="{self.CIRCLE_R}" fill="white" stroke="black"/>')
 
         # 文字列の描画
@@ -147,15 +222,16 @@ class DrawSvg:
         vertices = []
         for vertex in range(num_of_vertex):
             angle = rotation + vertex * (2 * math.pi / num_of_vertex)
-            x = int(center_x + radius * math.cos(angle))
-            y = int(center_y + radius * math.sin(angle))
+            # 中心の座標によらず同じ形になるよう、端数は常に小さい方へ切り捨てる
+            x = math.floor(center_x + radius * math.cos(angle))
+            y = math.floor(center_y + radius * math.sin(angle))
             vertices.append((x, y))
 
         return vertices
 
     def draw_figure_fork(
         self,
-        svg: list[str],
+        svg: SvgSink,
         center_x: int,
         center_y: int,
         text: str = "",
@@ -179,7 +255,7 @@ class DrawSvg:
 
     def draw_figure_repeat(
         self,
-        svg: list[str],
+        svg: SvgSink,
         center_x: int,
         center_y: int,
         text: str = "",
@@ -220,7 +296,7 @@ class DrawSvg:
         # 終端位置を返す
         return end_x
 
-    def draw_figure_mod(self, svg: list[str], center_x: int, center_y: int, text: str = "") -> int:
+    def draw_figure_mod(self, svg: SvgSink, center_x: int, center_y: int, text: str = "") -> int:
         svg.append(f'<circle cx="{center_x}" cy="{center_y}" r="{self.CIRCLE_R}" fill="white" stroke="black"/>')
         svg.append(f'<circle cx="{center_x}" cy="{center_y}" r="{int(self.CIRCLE_R / 2)}" fill="white" stroke="black"/>')
 
@@ -232,7 +308,7 @@ class DrawSvg:
 
     def draw_figure_return(
         self,
-        svg: list[str],
+        svg: SvgSink,
         center_x: int,
         center_y: int,
         text: str = "",
@@ -256,7 +332,7 @@ class DrawSvg:
         # 終端位置を返す
         return end_x
 
-    def __draw_figure_cond(self, svg: list[str], center_x: int, center_y: int, text: str = "") -> int:
+    def __draw_figure_cond(self, svg: SvgSink, center_x: int, center_y: int, text: str = "") -> int:
         # 垂直線の追加
         self.draw_line_v(svg, center_x, center_y - self.CIRCLE_R, self.CIRCLE_R * 2)
 
@@ -270,22 +346,22 @@ class DrawSvg:
         end_x = center_x + figure_2_text_space + text_width
         return end_x
 
-    def draw_figure_true(self, svg: list[str], center_x: int, center_y: int, text: str = "") -> int:
+    def draw_figure_true(self, svg: SvgSink, center_x: int, center_y: int, text: str = "") -> int:
         text_cond = "(true) " + text
         end_x = self.__draw_figure_cond(svg, center_x, center_y, text_cond)
         return end_x
 
-    def draw_figure_false(self, svg: list[str], center_x: int, center_y: int, text: str = "") -> int:
+    def draw_figure_false(self, svg: SvgSink, center_x: int, center_y: int, text: str = "") -> int:
         text_cond = "(false) " + text
         end_x = self.__draw_figure_cond(svg, center_x, center_y, text_cond)
         return end_x
 
-    def draw_figure_branch(self, svg: list[str], center_x: int, center_y: int, text: str = "") -> int:
+    def draw_figure_branch(self, svg: SvgSink, center_x: int, center_y: int, text: str = "") -> int:
         text_cond = "(" + text + ")"
         end_x = self.__draw_figure_cond(svg, center_x, center_y, text_cond)
         return end_x
 
-    def draw_figure_data(self, svg: list[str], center_x: int, center_y: int, text: str = "") -> int:
+    def draw_figure_data(self, svg: SvgSink, center_x: int, center_y: int, text: str = "") -> int:
         svg.append(
             f'<rect x="{center_x - self.CIRCLE_R}" y="{center_y - self.CIRCLE_R}" '
             f'width="{self.CIRCLE_R * 2}" height="{self.CIRCLE_R * 2}" fill="white" stroke="black"/>'
@@ -298,7 +374,7 @@ class DrawSvg:
         return end_x
 
     @staticmethod
-    def draw_figure_data_func_in(svg: list[str], center_x: int, center_y: int) -> None:
+    def draw_figure_data_func_in(svg: SvgSink, center_x: int, center_y: int) -> None:
         svg.append(
             f'<path d="M {center_x - DrawSvg.CIRCLE_R} {center_y} '  # 描画開始位置指定
             f"L {center_x} {center_y - DrawSvg.CIRCLE_R} "  # 上弦描画
@@ -308,7 +384,7 @@ class DrawSvg:
         )
 
     @staticmethod
-    def draw_figure_data_func_out(svg: list[str], center_x: int, center_y: int) -> None:
+    def draw_figure_data_func_out(svg: SvgSink, center_x: int, center_y: int) -> None:
         svg.append(
             f'<path d="M {center_x + DrawSvg.CIRCLE_R} {center_y} '  # 描画開始位置指定
             f"L {center_x} {center_y - DrawSvg.CIRCLE_R} "  # 上弦描画
@@ -318,6 +394,181 @@ class DrawSvg:
         )
 
 
+class DrawSvgSymbol(DrawSvg):
+    """図形を<defs>へ一度だけ定義して<use>で配置する
+
+    共通のスタイルは<style>のクラスにまとめ、各要素には属性を繰り返し記載しない
+    色の異なる矢印は、図形をcurrentColorで定義しておき、配置する<use>のcolorで色を指定する
+    """
+
+    STYLE = (
+        "<style>"
+        "svg{color:black}"
+        ".t{font-family:Consolas, Courier New, monospace;font-size:%dpx;text-anchor:start;dominant-baseline:middle}"
+        ".l{stroke:black;fill:none}"
+        "</style>"
+    ) % DrawSvg.FONT_SIZE_PX
+
+    def __init__(self, text_metrics: TextMetrics | None = None) -> None:
+        super().__init__(text_metrics)
+
+        # <use>で配置した図形。使わなかった図形は定義しない
+        self.used_glyphs: set[str] = set()
+
+    def create_defs(self) -> list[str]:
+        """スタイルを生成する
+
+        Returns:
+            list[str]: 定義を構成する文字列リスト
+        """
+        return [self.STYLE]
+
+    def create_glyph_defs(self) -> list[str]:
+        """配置した図形の定義を生成する
+
+        図形は中心を原点として、通常の描画と同じメソッドで描画しておく
+
+        Returns:
+            list[str]: 定義を構成する文字列リスト
+        """
+        base = super()
+        glyphs: dict[str, Callable[[SvgSink], object]] = {
+            "normal": lambda svg: base.draw_figure_normal(svg, 0, 0),
+            "fork": lambda svg: base.draw_figure_fork(svg, 0, 0),
+            "repeat": lambda svg: base.draw_figure_repeat(svg, 0, 0),
+            "mod": lambda svg: base.draw_figure_mod(svg, 0, 0),
+            "return": lambda svg: base.draw_figure_return(svg, 0, 0),
+            "cond": lambda svg: self.__draw_cond_glyph(svg, 0, 0),
+            "data": lambda svg: base.draw_figure_data(svg, 0, 0),
+            "data-in": lambda svg: base.draw_figure_data_func_in(svg, 0, 0),
+            "data-out": lambda svg: base.draw_figure_data_func_out(svg, 0, 0),
+            "level-start": lambda svg: base.draw_figure_level_start(svg, 0, 0),
+            "level-end": lambda svg: base.draw_figure_level_end(svg, 0, 0),
+            "level-step": lambda svg: base.draw_figure_level_step(svg, 0, 0),
+            "arrow-r": lambda svg: base.draw_arrow_head_r(svg, 0, 0, "currentColor"),
+            "arrow-l": lambda svg: base.draw_arrow_head_l(svg, 0, 0, "currentColor"),
+        }
+
+        # 図形の中の線分はまとめずに定義へ含める
+        line_batch, self.line_batch = self.line_batch, None
+        try:
+            defs = ["<defs>"]
+            for glyph_id, draw_glyph in glyphs.items():
+                # 条件の図形は矢印の図形を配置するため、矢印は条件より後に判定する
+                if glyph_id not in self.used_glyphs:
+                    continue
+                defs.append(f'<g id="{glyph_id}">')
+                draw_glyph(defs)
+                defs.append("</g>")
+            defs.append("</defs>")
+        finally:
+            self.line_batch = line_batch
+        return defs
+
+    def use_glyph(self, svg: SvgSink, glyph_id: str, center_x: int, center_y: int, color: str = "black") -> None:
+        self.used_glyphs.add(glyph_id)
+        # 黒は<style>で指定した既定の色なので記載しない
+        color_attribute = "" if color == "black" else f' color="{color}"'
+        svg.append(f'<use href="#{glyph_id}" x="{center_x}" y="{center_y}"{color_attribute}/>')
+
+    def draw_text(self, svg: SvgSink, center_x: int, center_y: int, text: str, font_size: int = 100, rotate: int = 0) -> int:
+        font_px = int(DrawSvg.FONT_SIZE_PX * (font_size / 100))
+
+        # クラスと異なる指定だけを記載する
+        attributes = ""
+        if font_px != DrawSvg.FONT_SIZE_PX:
+            attributes += f' style="font-size:{font_px}px"'
+        if rotate != 0:
+            attributes += f' rotate="{rotate}"'
+
+        svg.append(f'<text x="{center_x}" y="{center_y}" class="t"{attributes}>{text}</text>')
+        text_width = self.get_text_width(text, font_px)
+        return text_width
+
+    def draw_line(self, svg: SvgSink, x1: int, y1: int, x2: int, y2: int, color: str = "black") -> None:
+        if (self.line_batch is not None) or (color != "black"):
+            super().draw_line(svg, x1, y1, x2, y2, color)
+            return
+
+        # 1本の線分も<line>より短い<path>で表す
+        svg.append(f'<path d="M{x1} {y1}{LinePathBatch.create_line_command(x2 - x1, y2 - y1)}" class="l"/>')
+
+    def draw_arrow_head_r(self, svg: SvgSink, tip_x: int, tip_y: int, color: str = "black") -> None:
+        self.use_glyph(svg, "arrow-r", tip_x, tip_y, color)
+
+    def draw_arrow_head_l(self, svg: SvgSink, tip_x: int, tip_y: int, color: str = "black") -> None:
+        self.use_glyph(svg, "arrow-l", tip_x, tip_y, color)
+
+    def draw_figure_level_start(self, svg: SvgSink, center_x: int, center_y: int) -> None:
+        self.use_glyph(svg, "level-start", center_x, center_y)
+
+    def draw_figure_level_end(self, svg: SvgSink, center_x: int, center_y: int) -> None:
+        self.use_glyph(svg, "level-end", center_x, center_y)
+
+    def draw_figure_level_step(self, svg: SvgSink, center_x: int, center_y: int) -> None:
+        self.use_glyph(svg, "level-step", center_x, center_y)
+
+    def draw_figure_normal(self, svg: SvgSink, center_x: int, center_y: int, text: str = "") -> int:
+        self.use_glyph(svg, "normal", center_x, center_y)
+        return self.draw_string(svg, center_x, center_y, text)
+
+    def draw_figure_fork(self, svg: SvgSink, center_x: int, center_y: int, text: str = "", rotation: int = 0) -> int:
+        # 回転させた図形は定義していないので通常通り描画する
+        if rotation != 0:
+            return super().draw_figure_fork(svg, center_x, center_y, text, rotation)
+
+        self.use_glyph(svg, "fork", center_x, center_y)
+        return self.draw_string(svg, center_x, center_y, text)
+
+    def draw_figure_repeat(self, svg: SvgSink, center_x: int, center_y: int, text: str = "") -> int:
+        self.use_glyph(svg, "repeat", center_x, center_y)
+        return self.draw_string(svg, center_x, center_y, text)
+
+    def draw_figure_mod(self, svg: SvgSink, center_x: int, center_y: int, text: str = "") -> int:
+        self.use_glyph(svg, "mod", center_x, center_y)
+        return self.draw_string(svg, center_x, center_y, text)
+
+    def draw_figure_return(self, svg: SvgSink, center_x: int, center_y: int, text: str = "") -> int:
+        self.use_glyph(svg, "return", center_x, center_y)
+        return self.draw_string(svg, center_x, center_y, text)
+
+    def __draw_cond_glyph(self, svg: SvgSink, center_x: int, center_y: int) -> None:
+        # 垂直線の追加
+        self.draw_line_v(svg, center_x, center_y - self.CIRCLE_R, self.CIRCLE_R * 2)
+
+        self.draw_arrow_r(svg, center_x, center_y - self.CIRCLE_R, 15)
+
+    def __draw_figure_cond(self, svg: SvgSink, center_x: int, center_y: int, text: str = "") -> int:
+        self.use_glyph(svg, "cond", center_x, center_y)
+
+        # テキストの描画
+        figure_2_text_space = self.CIRCLE_R + self.SPACE_FIGURE_TO_TEXT
+        text_width = self.draw_text(svg, center_x + figure_2_text_space, center_y, text)
+
+        # 終端位置を返す
+        end_x = center_x + figure_2_text_space + text_width
+        return end_x
+
+    def draw_figure_true(self, svg: SvgSink, center_x: int, center_y: int, text: str = "") -> int:
+        return self.__draw_figure_cond(svg, center_x, center_y, "(true) " + text)
+
+    def draw_figure_false(self, svg: SvgSink, center_x: int, center_y: int, text: str = "") -> int:
+        return self.__draw_figure_cond(svg, center_x, center_y, "(false) " + text)
+
+    def draw_figure_branch(self, svg: SvgSink, center_x: int, center_y: int, text: str = "") -> int:
+        return self.__draw_figure_cond(svg, center_x, center_y, "(" + text + ")")
+
+    def draw_figure_data(self, svg: SvgSink, center_x: int, center_y: int, text: str = "") -> int:
+        self.use_glyph(svg, "data", center_x, center_y)
+        return self.draw_string(svg, center_x, center_y, text)
+
+    def draw_figure_data_func_in(self, svg: SvgSink, center_x: int, center_y: int) -> None:  # type: ignore[override]
+        self.use_glyph(svg, "data-in", center_x, center_y)
+
+    def draw_figure_data_func_out(self, svg: SvgSink, center_x: int, center_y: int) -> None:  # type: ignore[override]
+        self.use_glyph(svg, "data-out", center_x, center_y)
+
+
 class DrawFigure:
     """図形描画を管理するクラス"""
 
@@ -343,21 +594,23 @@ class DrawFigure:
             LineTypeDefine.get_format_by_type(LineTypeEnum.DATA).type_value: self.draw_svg.draw_figure_data,
         }
 
-    def draw_figure_method(self, svg: list[str], element: DiagramElement) -> int:
+    def draw_figure(self, svg: SvgSink, line_info: LineInfo, center_x: int, center_y: int) -> int:
         """
-        要素の種別に応じた図形を描画する
+        行の種別に応じた図形を指定した位置へ描画する
 
         Args:
             svg: SVGオブジェクト
-            element: 描画要素情報
+            line_info: 描画する行の情報
+            center_x: 図形の中心のX座標
+            center_y: 図形の中心のY座標
 
         Returns:
             int: 描画した図形の終端X座標
         """
         # 要素の種別に対応するメソッドを取得
-        draw_method = self._figure_method_map.get(element.line_info.type.type_value)
+        draw_method = self._figure_method_map.get(line_info.type.type_value)
 
         # メソッドが見つかれば実行する
         if draw_method:
-            return int(draw_method(svg, element.x, element.y, element.line_info.text_clean))
+            return int(draw_method(svg, center_x, center_y, line_info.text_clean))
         return 0
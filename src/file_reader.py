@@ -0,0 +1,245 @@
+import codecs
+import mmap
+import re
+from collections.abc import Iterator, Sequence
+from typing import overload
+
+from line_type import LineTypeDefine, LineTypeEnum
+
+MODULE_FORMAT = LineTypeDefine.get_format_by_type(LineTypeEnum.MODULE).type_format
+MODULE_FORMAT_BYTES = MODULE_FORMAT.encode("ascii")
+MODULE_NAME_NONE = "モジュール名無し"
+
+NON_ASCII_PATTERN = re.compile(rb"[\x80-\xff]")
+
+
+def detect_encoding(sample: bytes) -> str:
+    """ファイルの一部から文字コードを判定する
+
+    UTF-8として解釈できればUTF-8、そうでなければShift-JISとする
+
+    Args:
+        sample (bytes): 判定に用いるファイルの一部。末尾で文字が途切れていてもよい
+
+    Returns:
+        str: 文字コード名
+    """
+    try:
+        # 末尾で途切れた文字は判定に用いない
+        codecs.getincrementaldecoder("utf-8")().decode(sample, final=False)
+    except UnicodeDecodeError:
+        return "shift_jis"
+    return "utf-8"
+
+
+def remove_comment(line: str) -> str:
+    """コメント("#"に続く文字列)を取り除く
+
+    Args:
+        line (str): 1行分の文字列
+
+    Returns:
+        str: コメントを取り除いた文字列
+    """
+    return line.split("#")[0]
+
+
+class ModuleSection(Sequence[str]):
+    """ファイル内の1モジュール分のセクション
+
+    ファイルをメモリマップしたバッファ上の範囲だけを保持し、行が必要になった時点でデコードする
+    デコードした行は保持し、以降の参照ではデコードし直さない
+    行はFileParse.convert_text2linesと同じく、コメントと空行を取り除いたものとする
+    """
+
+    __slots__ = ("reader", "name", "start", "end", "_lines")
+
+    def __init__(self, reader: "HCPFileReader", name: str, start: int, end: int) -> None:
+        """
+        初期化メソッド
+
+        Args:
+            reader: セクションを含むファイルの読み込みクラス
+            name: モジュール名
+            start: セクションの開始位置(バイト)
+            end: セクションの終了位置(バイト)
+        """
+        self.reader = reader
+        self.name = name
+        self.start = start
+        self.end = end
+        self._lines: list[str] | None = None
+
+    def lines(self) -> list[str]:
+        """セクション行をデコードして取得する
+
+        デコードは初回のみ行い、以降は同じリストを返す
+
+        Returns:
+            list[str]: コメントと空行を取り除いたセクション行のリスト
+        """
+        if self._lines is not None:
+            return self._lines
+
+        text = self.reader.decode(self.start, self.end)
+        # ファイル末尾の空白はファイル全体の読み込みと同じく取り除く
+        if self.end == self.reader.size:
+            text = text.rstrip()
+
+        section_lines: list[str] = []
+        for text_line in text.split("\n"):
+            line = remove_comment(text_line)
+            if line.strip():
+                section_lines.append(line)
+        self._lines = section_lines
+        return section_lines
+
+    def __len__(self) -> int:
+        return len(self.lines())
+
+    @overload
+    def __getitem__(self, index: int) -> str: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[str]: ...
+
+    def __getitem__(self, index: int | slice) -> str | list[str]:
+        return self.lines()[index]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.lines())
+
+
+class HCPFileReader:
+    """hcpファイルをメモリマップして、モジュールごとのセクションを順に取り出す
+
+    文字コードはBOMがあればUTF-8とし、なければ初めてASCII以外のバイトを含む範囲をデコードする時点で、
+    そこから最大ENCODING_SAMPLE_SIZEバイトの標本で判定する
+    ASCIIだけの範囲はUTF-8とShift-JISのどちらでも同じ文字列になるため、判定前にデコードしてよい
+    判定した文字コードで後の範囲をデコードできない場合は、文字コードを切り替えずにOSErrorを送出する
+    ファイル全体をデコードした文字列は保持しない
+    """
+
+    # 文字コードの判定に用いる標本の大きさ(バイト)
+    ENCODING_SAMPLE_SIZE = 64 * 1024
+
+    def __init__(self, file_path: str) -> None:
+        """
+        初期化メソッド
+
+        Args:
+            file_path: 読み込むファイルのパス
+
+        Raises:
+            OSError: ファイル読み込みに失敗した場合
+            ValueError: ファイルが空の場合
+        """
+        self.file_path = file_path
+        with open(file_path, "rb") as f:
+            f.seek(0, 2)
+            self.size = f.tell()
+            if self.size == 0:
+                raise ValueError("ファイルが空です")
+            self._buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        self.offset = 0
+        # 文字コード。ASCII以外のバイトをデコードするまではNone
+        self.encoding: str | None = None
+        if self._buffer[: len(codecs.BOM_UTF8)] == codecs.BOM_UTF8:
+            self.offset = len(codecs.BOM_UTF8)
+            self.encoding = "utf-8"
+
+    def __enter__(self) -> "HCPFileReader":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """メモリマップを解放する
+
+        解放後は、取り出したセクションの行を取得できない
+        """
+        self._buffer.close()
+
+    def decode(self, start: int, end: int) -> str:
+        """バッファの指定範囲をデコードする
+
+        Args:
+            start (int): 開始位置(バイト)
+            end (int): 終了位置(バイト)
+
+        Returns:
+            str: デコードした文字列
+
+        Raises:
+            OSError: 判定した文字コードでデコードできない場合
+        """
+        data = self._buffer[start:end]
+        if self.encoding is None:
+            non_ascii = NON_ASCII_PATTERN.search(data)
+            if non_ascii is None:
+                return data.decode("ascii")
+            sample_start = start + non_ascii.start()
+            self.encoding = detect_encoding(self._buffer[sample_start : sample_start + self.ENCODING_SAMPLE_SIZE])
+
+        try:
+            return data.decode(self.encoding)
+        except UnicodeDecodeError as e:
+            raise OSError(f"ファイルの先頭部分から判定した文字コード({self.encoding})でデコードできません: {self.file_path}: {e!r}") from e
+
+    def get_module_name(self, start: int, end: int) -> str | None:
+        """1行がモジュールの開始行であればモジュール名を取得する
+
+        Args:
+            start (int): 行の開始位置(バイト)
+            end (int): 行の終了位置(バイト)
+
+        Returns:
+            str | None: モジュール名。モジュールの開始行でなければNone
+        """
+        # デコードせずに候補を絞り込む
+        if self._buffer.find(MODULE_FORMAT_BYTES, start, end) < 0:
+            return None
+
+        line = remove_comment(self.decode(start, end)).strip()
+        if not line.startswith(MODULE_FORMAT):
+            return None
+
+        split_texts = line.split(maxsplit=1)
+        return split_texts[1] if len(split_texts) > 1 else MODULE_NAME_NONE
+
+    def iter_module_sections(self) -> Iterator[ModuleSection]:
+        """モジュールごとのセクションを先頭から順に取り出す
+
+        次のモジュールの開始行が見つかった時点でセクションを返すため、後続の行はまだ読み込まれていない
+        モジュールの開始行の候補はバッファ上で探し、それ以外の行はデコードしない
+
+        Yields:
+            ModuleSection: 1モジュール分のセクション
+        """
+        buffer = self._buffer
+        module_name: str | None = None
+        section_start = 0
+        search_start = self.offset
+        while True:
+            found = buffer.find(MODULE_FORMAT_BYTES, search_start)
+            if found < 0:
+                break
+
+            # 候補を含む1行の範囲を求める
+            line_start = max(buffer.rfind(b"\n", self.offset, found) + 1, self.offset)
+            line_end = buffer.find(b"\n", found)
+            next_line_start = self.size if line_end < 0 else line_end + 1
+
+            name = self.get_module_name(line_start, next_line_start)
+            if name is not None:
+                if module_name is not None:
+                    yield ModuleSection(self, module_name, section_start, line_start)
+                module_name = name
+                section_start = next_line_start
+
+            search_start = next_line_start
+
+        if module_name is not None:
+            yield ModuleSection(self, module_name, section_start, self.size)
@@ -0,0 +1,120 @@
+import os
+from typing import NamedTuple
+
+
+class FileState(NamedTuple):
+    """ファイルの更新状態
+
+    Attributes:
+        mtime_ns(int): 更新日時(ナノ秒)
+        size(int): ファイルサイズ
+    """
+
+    mtime_ns: int
+    size: int
+
+
+class SnapshotDiff(NamedTuple):
+    """2つのスナップショットの差分
+
+    Attributes:
+        changed(list[str]): 追加・更新されたファイルのパスのリスト
+        removed(list[str]): 削除されたファイルのパスのリスト
+    """
+
+    changed: list[str]
+    removed: list[str]
+
+
+def take_snapshot(folder_path: str, extension: str = ".hcp", folder_states: dict[str, int] | None = None) -> dict[str, FileState]:
+    """フォルダ内のファイルの更新状態を取得する
+
+    ファイルの中身は読まず、ディレクトリの走査で得られる情報だけを用いる
+    パスはglob.globで"**"を指定した場合と同じ形式とし、隠しファイルは含めない
+
+    Args:
+        folder_path (str): 走査するフォルダパス
+        extension (str): 対象とするファイルの拡張子
+        folder_states (dict[str, int] | None): 指定した場合、走査したフォルダの更新日時(ナノ秒)を格納する
+
+    Returns:
+        dict[str, FileState]: ファイルパスごとの更新状態
+    """
+    snapshot: dict[str, FileState] = {}
+    folders = [folder_path]
+    while folders:
+        folder = folders.pop()
+        try:
+            if folder_states is not None:
+                # 走査中に追加されたファイルを次回に検出できるよう、走査する前の更新日時を記録する
+                folder_states[folder] = os.stat(folder).st_mtime_ns
+            entries = os.scandir(folder)
+        except OSError:
+            # 走査中に削除されたフォルダは無視する
+            continue
+
+        with entries:
+            for entry in entries:
+                if entry.name.startswith("."):
+                    continue
+                try:
+                    if entry.is_dir():
+                        folders.append(entry.path)
+                    elif entry.name.endswith(extension):
+                        stat = entry.stat()
+                        snapshot[entry.path] = FileState(stat.st_mtime_ns, stat.st_size)
+                except OSError:
+                    continue
+
+    return snapshot
+
+
+def refresh_snapshot(
+    folder_path: str, snapshot: dict[str, FileState], folder_states: dict[str, int], extension: str = ".hcp"
+) -> dict[str, FileState]:
+    """前回のスナップショットに含まれるファイルとフォルダだけを調べて、更新状態を取得し直す
+
+    ファイルの追加・削除・名前の変更はフォルダの更新日時が変わるため、その場合だけフォルダ全体を走査し直す
+    それ以外はファイルごとにos.statを呼ぶだけで済み、ディレクトリの一覧は読まない
+
+    Args:
+        folder_path (str): 走査するフォルダパス
+        snapshot (dict[str, FileState]): 前回のスナップショット
+        folder_states (dict[str, int]): 前回走査したフォルダの更新日時。走査し直した場合は更新する
+        extension (str): 対象とするファイルの拡張子
+
+    Returns:
+        dict[str, FileState]: ファイルパスごとの更新状態
+    """
+    for folder, mtime_ns in folder_states.items():
+        try:
+            is_changed = os.stat(folder).st_mtime_ns != mtime_ns
+        except OSError:
+            is_changed = True
+        if is_changed:
+            folder_states.clear()
+            return take_snapshot(folder_path, extension, folder_states)
+
+    refreshed: dict[str, FileState] = {}
+    for file_path in snapshot:
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            continue
+        refreshed[file_path] = FileState(stat.st_mtime_ns, stat.st_size)
+    return refreshed
+
+
+def diff_snapshots(old: dict[str, FileState], new: dict[str, FileState]) -> SnapshotDiff:
+    """2つのスナップショットの差分を求める
+
+    Args:
+        old (dict[str, FileState]): 前回のスナップショット
+        new (dict[str, FileState]): 今回のスナップショット
+
+    Returns:
+        SnapshotDiff: 追加・更新されたファイルと削除されたファイル
+    """
+    changed = [file_path for file_path, state in new.items() if old.get(file_path) != state]
+    removed = [file_path for file_path in old if file_path not in new]
+    return SnapshotDiff(changed, removed)
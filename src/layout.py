@@ -0,0 +1,432 @@
+import heapq
+import json
+from array import array
+from collections.abc import Sequence
+from typing import NamedTuple
+
+from define import LineInfo, ParseInfo, ParseInfo4Render
+from draw_svg import DrawSvg
+from line_level import LineLevel
+from line_type import LineTypeDefine, LineTypeEnum
+from text_metrics import TextMetrics, get_text_metrics
+
+# 列は型付きの配列(array.array)として保持する
+# バッファプロトコルに対応しているので、NumPyを使う場合はnumpy.frombufferでコピーせずに参照できる
+
+
+class ElementColumns(NamedTuple):
+    """処理部もしくはデータ部の要素の配置を列ごとに保持する
+
+    Attributes:
+        line_info_list(tuple[LineInfo, ...]): 要素ごとのパース結果
+        level_min(int): 要素の最小レベル
+        x(array): 図形の中心のX座標
+        y(array): 図形の中心のY座標
+        end_x(array): 文字列を含めた図形の終端のX座標
+    """
+
+    line_info_list: tuple[LineInfo, ...]
+    level_min: int
+    x: array
+    y: array
+    end_x: array
+
+    def to_dict(self) -> dict[str, list]:
+        """JSONへ書き出せる形式に変換する
+
+        Returns:
+            dict[str, list]: 列名ごとの値のリスト
+        """
+        return {
+            "type": [line_info.type.type_format for line_info in self.line_info_list],
+            "level": [line_info.level.value - self.level_min for line_info in self.line_info_list],
+            "text": [line_info.text_clean for line_info in self.line_info_list],
+            "x": self.x.tolist(),
+            "y": self.y.tolist(),
+            "end_x": self.end_x.tolist(),
+        }
+
+
+class ConnectorColumns(NamedTuple):
+    """処理部からデータへの参照ごとの接続線の配置を列ごとに保持する
+
+    参照は処理部の順に、同じ処理部の中では入力、出力の順に並べる
+    関数への入出力(処理部の最小レベルからの参照)は接続線を持たず、幹の番号は-1、座標の列は0とする
+    接続線は処理部から幹の垂直線までの水平線(exit)から成り、幹はTrunkColumnsで保持する
+
+    Attributes:
+        process_no(array): 参照元の処理部の要素番号
+        data_no(array): 参照先のデータ部の要素番号
+        io(array): 種別(入力: 1, 出力: 0)
+        function(array): 関数への入出力なら1
+        trunk(array): 接続する幹の番号
+        color(array): 線の色の番号
+        exit_x1(array): 処理部からの水平線の始点のX座標
+        exit_x2(array): 処理部からの水平線の終点のX座標。幹の垂直線のX座標と同じ
+        exit_y(array): 処理部からの水平線のY座標
+    """
+
+    process_no: array
+    data_no: array
+    io: array
+    function: array
+    trunk: array
+    color: array
+    exit_x1: array
+    exit_x2: array
+    exit_y: array
+
+    def to_dict(self) -> dict[str, list[int]]:
+        """JSONへ書き出せる形式に変換する
+
+        Returns:
+            dict[str, list[int]]: 列名ごとの値のリスト
+        """
+        return {name: column.tolist() for name, column in zip(self._fields, self, strict=True)}
+
+
+class TrunkColumns(NamedTuple):
+    """同じデータへの同じ種別の参照をまとめた幹ごとの配置を列ごとに保持する
+
+    幹は垂直線と、垂直線からデータ部への水平線(enter)から成る
+    幹は最初に参照した処理部の順に並べ、Y座標の範囲が重ならない幹は同じ列(レーン)を共有する
+
+    Attributes:
+        data_no(array): 参照先のデータ部の要素番号
+        io(array): 種別(入力: 1, 出力: 0)
+        lane(array): 垂直線を置く列の番号
+        color(array): 線の色の番号
+        x(array): 垂直線のX座標。データ部への水平線の始点を兼ねる
+        top_y(array): 垂直線の上端のY座標
+        bottom_y(array): 垂直線の下端のY座標
+        enter_x2(array): データ部への水平線の終点のX座標
+        enter_y(array): データ部への水平線のY座標
+    """
+
+    data_no: array
+    io: array
+    lane: array
+    color: array
+    x: array
+    top_y: array
+    bottom_y: array
+    enter_x2: array
+    enter_y: array
+
+    def to_dict(self) -> dict[str, list[int]]:
+        """JSONへ書き出せる形式に変換する
+
+        Returns:
+            dict[str, list[int]]: 列名ごとの値のリスト
+        """
+        return {name: column.tolist() for name, column in zip(self._fields, self, strict=True)}
+
+
+class LayoutTable(NamedTuple):
+    """モジュールの図の配置結果
+
+    Attributes:
+        name(str): モジュール名
+        width(int): 画像全体の幅
+        height(int): 画像全体の高さ
+        process(ElementColumns): 処理部の要素の配置
+        data(ElementColumns): データ部の要素の配置
+        connectors(ConnectorColumns): 接続線の配置
+        trunks(TrunkColumns): 接続線をまとめた幹の配置
+    """
+
+    name: str
+    width: int
+    height: int
+    process: ElementColumns
+    data: ElementColumns
+    connectors: ConnectorColumns
+    trunks: TrunkColumns
+
+    def to_json(self) -> str:
+        """配置結果を区切りの空白を省いたJSONへ変換する
+
+        Returns:
+            str: JSON文字列
+        """
+        layout = {
+            "name": self.name,
+            "width": self.width,
+            "height": self.height,
+            "colors": DiagramLayout.COLOR_TABLE,
+            "process": self.process.to_dict(),
+            "data": self.data.to_dict(),
+            "connectors": self.connectors.to_dict(),
+            "trunks": self.trunks.to_dict(),
+        }
+        return json.dumps(layout, ensure_ascii=False, separators=(",", ":"))
+
+
+class DiagramLayout:
+    """パース結果から図の要素と接続線の配置を求める
+
+    SVGの描画とは独立しており、配置結果は描画やJSONへの書き出しに用いる
+    """
+
+    LEVEL_SHIFT = 30
+    LINE_OFFSET = 10
+    IMG_MARGIN = 30
+
+    TITLE_X = 0
+    TITLE_Y = 30
+    TITLE_PREFIX = "モジュール名: "
+    TITLE_FONT_SIZE = 150
+
+    # 複数のスレッドの描画で共有するため、変更できないタプルとする
+    COLOR_TABLE = (
+        "black",
+        "red",
+        "green",
+        "blue",
+        "yellow",
+        "purple",
+        "orange",
+        "turquoise",
+    )
+
+    # 条件分岐の先は図形に続けて文字列を置き、余白を設けない
+    _COND_TEXT_FORMATS = {
+        LineTypeDefine.get_format_by_type(LineTypeEnum.TRUE).type_value: "(true) {}",
+        LineTypeDefine.get_format_by_type(LineTypeEnum.FALSE).type_value: "(false) {}",
+        LineTypeDefine.get_format_by_type(LineTypeEnum.BRANCH).type_value: "({})",
+    }
+    # 図形を持たない種別
+    _NO_FIGURE_TYPES = frozenset([LineTypeDefine.get_format_by_type(LineTypeEnum.MODULE).type_value])
+
+    def __init__(self, text_metrics: TextMetrics | None = None) -> None:
+        """
+        初期化メソッド
+
+        Args:
+            text_metrics: 文字列の幅の計算方法。指定がなければ共有のものを使う
+        """
+        self.text_metrics = text_metrics if text_metrics is not None else get_text_metrics()
+
+    def measure_string(self, center_x: int, text: str, font_size: int = 100) -> int:
+        """図形に続けて文字列を置いた場合の終端位置を求める
+
+        DrawSvg.draw_stringで描画した場合と同じ位置とする
+
+        Args:
+            center_x (int): 図形の中心のX座標
+            text (str): 文字列
+            font_size (int): 文字の大きさ(%)
+
+        Returns:
+            int: 終端のX座標
+        """
+        if text == "":
+            return center_x + DrawSvg.CIRCLE_R + DrawSvg.TEXT_MARGIN
+
+        font_px = int(DrawSvg.FONT_SIZE_PX * (font_size / 100))
+        text_width = self.text_metrics.get_text_width(text.strip(), font_px)
+        return center_x + DrawSvg.CIRCLE_R + DrawSvg.SPACE_FIGURE_TO_TEXT + text_width + DrawSvg.TEXT_MARGIN
+
+    def measure_figure(self, type_value: int, center_x: int, text: str) -> int:
+        """種別に応じた図形と文字列の終端位置を求める
+
+        Args:
+            type_value (int): 行の種別の値
+            center_x (int): 図形の中心のX座標
+            text (str): 文字列
+
+        Returns:
+            int: 終端のX座標。図形を持たない種別は0
+        """
+        if type_value in self._NO_FIGURE_TYPES:
+            return 0
+
+        cond_text_format = self._COND_TEXT_FORMATS.get(type_value)
+        if cond_text_format is None:
+            return self.measure_string(center_x, text)
+
+        text_width = self.text_metrics.get_text_width(cond_text_format.format(text).strip(), DrawSvg.FONT_SIZE_PX)
+        return center_x + DrawSvg.CIRCLE_R + DrawSvg.SPACE_FIGURE_TO_TEXT + text_width
+
+    @classmethod
+    def get_level_x(cls, levels: Sequence[int], level_min: int, start_x: int) -> array:
+        """レベルの列から図形の中心のX座標の列を求める
+
+        Args:
+            levels (Sequence[int]): 要素ごとのレベル
+            level_min (int): 最小レベル
+            start_x (int): 描画開始位置(X座標)
+
+        Returns:
+            array: 要素ごとのX座標
+        """
+        offset = start_x + (1 - level_min) * cls.LEVEL_SHIFT
+        return array("i", [offset + level * cls.LEVEL_SHIFT for level in levels])
+
+    @classmethod
+    def get_row_y(cls, count: int, start_y: int) -> array:
+        """行番号から図形の中心のY座標の列を求める
+
+        Args:
+            count (int): 要素の数
+            start_y (int): 描画開始位置(Y座標)
+
+        Returns:
+            array: 要素ごとのY座標
+        """
+        return array("i", range(start_y, start_y + count * cls.LEVEL_SHIFT, cls.LEVEL_SHIFT))
+
+    @staticmethod
+    def allocate_lanes(top_y: Sequence[int], bottom_y: Sequence[int]) -> list[int]:
+        """垂直線ごとに、Y座標の範囲が重ならないものが同じ列を共有するよう列を割り当てる
+
+        区間グラフの彩色として、上端の順に空いている最も左の列を割り当てる
+        列の数は同じY座標を通る垂直線の最大数と等しくなる
+        端点が接すると線が繋がって見えるため、同じ列では範囲の間を空ける
+
+        Args:
+            top_y (Sequence[int]): 垂直線ごとの上端のY座標
+            bottom_y (Sequence[int]): 垂直線ごとの下端のY座標
+
+        Returns:
+            list[int]: 垂直線ごとの列の番号
+        """
+        lanes = [0] * len(top_y)
+        # 使用中の列を下端の昇順に、空いた列を番号の昇順に保持する
+        busy_lanes: list[tuple[int, int]] = []
+        free_lanes: list[int] = []
+        lane_count = 0
+        for index in sorted(range(len(top_y)), key=top_y.__getitem__):
+            while busy_lanes and busy_lanes[0][0] < top_y[index]:
+                heapq.heappush(free_lanes, heapq.heappop(busy_lanes)[1])
+            if free_lanes:
+                lane = heapq.heappop(free_lanes)
+            else:
+                lane = lane_count
+                lane_count += 1
+            lanes[index] = lane
+            heapq.heappush(busy_lanes, (bottom_y[index], lane))
+        return lanes
+
+    def layout_elements(self, parse_info: ParseInfo, start_x: int, start_y: int) -> ElementColumns:
+        """処理部もしくはデータ部の要素を配置する
+
+        Args:
+            parse_info (ParseInfo): 処理部もしくはデータ部のパース結果
+            start_x (int): 描画開始位置(X座標)
+            start_y (int): 描画開始位置(Y座標)
+
+        Returns:
+            ElementColumns: 要素の配置
+        """
+        line_info_list = parse_info.line_info_list
+        x = self.get_level_x([line_info.level.value for line_info in line_info_list], parse_info.level_min, start_x)
+        y = self.get_row_y(len(line_info_list), start_y)
+        end_x = array(
+            "i",
+            [self.measure_figure(line_info.type.type_value, center_x, line_info.text_clean) for line_info, center_x in zip(line_info_list, x)],
+        )
+        return ElementColumns(line_info_list, parse_info.level_min, x, y, end_x)
+
+    def compute(self, name: str, parse_info_4_render: ParseInfo4Render) -> LayoutTable:
+        """モジュールの図の配置を求める
+
+        Args:
+            name (str): モジュール名
+            parse_info_4_render (ParseInfo4Render): 描画用のパース結果
+
+        Returns:
+            LayoutTable: 配置結果
+        """
+        # タイトル部
+        title_width = self.measure_string(self.TITLE_X, self.TITLE_PREFIX + name, self.TITLE_FONT_SIZE) + self.IMG_MARGIN
+        title_height = self.TITLE_Y + self.LEVEL_SHIFT + self.IMG_MARGIN
+
+        # 処理部
+        process = self.layout_elements(parse_info_4_render.process_parse_info, self.TITLE_X, title_height)
+        process_width = max(process.end_x, default=0)
+        process_height = max(process.y, default=0)
+
+        # 処理部からデータへの参照を列挙する
+        data_index: dict[str, int] = {}
+        for no, line_info in enumerate(parse_info_4_render.data_parse_info.line_info_list):
+            data_index.setdefault(line_info.text_clean, no)
+        process_no = array("i")
+        data_no = array("i")
+        io = array("b")
+        function = array("b")
+        for line_info in process.line_info_list:
+            is_function = int(line_info.level.value - process.level_min == LineLevel.LEVEL_MIN)
+            for data_list, is_in in ((line_info.iodata.in_data_list, 1), (line_info.iodata.out_data_list, 0)):
+                for data_info in data_list:
+                    process_no.append(line_info.no)
+                    data_no.append(data_index.get(data_info.name, -1))
+                    io.append(is_in)
+                    function.append(is_function)
+
+        # データ部の行の位置はX座標によらず決まるので、幹の範囲を先に求める
+        data_y = self.get_row_y(len(parse_info_4_render.data_parse_info.line_info_list), title_height)
+
+        # 同じデータへの同じ種別の参照を1つの幹にまとめる
+        reference_count = len(process_no)
+        trunk = array("i", [-1] * reference_count)
+        exit_y = array("i", bytes(4 * reference_count))
+        trunk_index: dict[tuple[int, int], int] = {}
+        trunk_keys: list[tuple[int, int]] = []
+        top_y = array("i")
+        bottom_y = array("i")
+        for index in range(reference_count):
+            if function[index]:
+                continue
+            exit_y[index] = process.y[process_no[index]] + (-5 if io[index] else 5)
+            key = (data_no[index], io[index])
+            trunk_no = trunk_index.get(key)
+            if trunk_no is None:
+                trunk_no = trunk_index[key] = len(trunk_keys)
+                trunk_keys.append(key)
+                # データ部への水平線の位置から幹を始める
+                trunk_start_y = data_y[key[0]] + (5 if key[1] else -5) if key[0] >= 0 else exit_y[index]
+                top_y.append(trunk_start_y)
+                bottom_y.append(trunk_start_y)
+            trunk[index] = trunk_no
+            top_y[trunk_no] = min(top_y[trunk_no], exit_y[index])
+            bottom_y[trunk_no] = max(bottom_y[trunk_no], exit_y[index])
+
+        # 範囲の重ならない幹で列を共有し、処理部からの水平線を列の位置まで伸ばす
+        lane = array("i", self.allocate_lanes(top_y, bottom_y))
+        exit_x2_start = process_width + self.IMG_MARGIN
+        trunk_x = array("i", [exit_x2_start + lane_no * self.LINE_OFFSET for lane_no in lane])
+        trunk_color = array("b", [lane_no % len(self.COLOR_TABLE) for lane_no in lane])
+        color = array("b", bytes(reference_count))
+        exit_x1 = array("i", bytes(4 * reference_count))
+        exit_x2 = array("i", exit_x1)
+        for index in range(reference_count):
+            trunk_no = trunk[index]
+            if trunk_no < 0:
+                continue
+            exit_x1[index] = process.end_x[process_no[index]]
+            exit_x2[index] = trunk_x[trunk_no]
+            color[index] = trunk_color[trunk_no]
+        exit_width = max(exit_x2, default=0)
+
+        # データ部
+        data = self.layout_elements(parse_info_4_render.data_parse_info, exit_width, title_height)
+        data_width = max(data.end_x, default=0)
+        data_height = max(data.y, default=0)
+
+        # データ部への水平線
+        trunk_data_no = array("i", [key[0] for key in trunk_keys])
+        trunk_io = array("b", [key[1] for key in trunk_keys])
+        enter_x2 = array("i", bytes(4 * len(trunk_keys)))
+        enter_y = array("i", enter_x2)
+        for trunk_no, (no, is_in) in enumerate(trunk_keys):
+            if no < 0:
+                continue
+            enter_x2[trunk_no] = data.x[no] - DrawSvg.CIRCLE_R
+            enter_y[trunk_no] = data.y[no] + (5 if is_in else -5)
+
+        connectors = ConnectorColumns(process_no, data_no, io, function, trunk, color, exit_x1, exit_x2, exit_y)
+        trunks = TrunkColumns(trunk_data_no, trunk_io, lane, trunk_color, trunk_x, top_y, bottom_y, enter_x2, enter_y)
+        width = max(title_width, process_width, data_width)
+        height = max(title_height, process_height, data_height)
+        return LayoutTable(name, width, height, process, data, connectors, trunks)
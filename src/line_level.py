@@ -1,45 +1,39 @@
+import functools
 import re
+from dataclasses import dataclass
 
 
+@dataclass(frozen=True, slots=True)
 class LineLevel:
+    """行のレベル
+
+    変更できないので、同じレベルの行ではofで取得したインスタンスを共有する
+    """
+
     LEVEL_MIN = 0
-    LEVEL_MAX = 20
     LEVEL_ERROR = -1
     LEVEL_NONE = -2
 
     TAB2SPACE = 4
 
-    def __init__(self) -> None:
-        self.value = self.LEVEL_MIN
+    # 行頭は タブのみ もしくは 半角空白のみ で、空白以外の文字が続くパターン
+    # インデントの深さに上限は設けない
+    _INDENT_PATTERN = re.compile(r"( *|\t*)(?=\S)")
 
-    @classmethod
-    def __create_indent_pattern(cls, tab_count: int) -> str:
-        """インデントパターンを動的に生成する
+    value: int = LEVEL_MIN
 
-        行頭は タブ*n個 もしくは 半角空白m個 で、任意の文字が続いて行末 となるパターン
+    @classmethod
+    @functools.cache
+    def of(cls, value: int) -> "LineLevel":
+        """レベルの値に対応するインスタンスを取得する
 
         Args:
-            tab_count (int): タブの数
+            value (int): レベルの値
 
         Returns:
-            str: 生成したインデントパターンの正規表現
-
-        Raises:
-            ValueError: tab_countが負の数の場合
+            LineLevel: 値ごとに共有するインスタンス
         """
-        if tab_count < 0:
-            raise ValueError("tab_count must be non-negative")
-
-        # タブと半角スペースを変換する
-        space_count = tab_count * cls.TAB2SPACE
-
-        # 正規表現を作成する
-        # {}の数、書き方に注意
-        # f-stringの置換の為に変数名の前後に1組必要
-        # さらに、直前の文字がn個続く表現{n}を表すために、{}を2重で記載する必要がある。
-        # 間に空白を含むとエラーになるので、{}を3組連続で記載することになる。
-        pattern = f"^(?:[ ]{{{space_count}}}|\t{{{tab_count}}})\\S.*$"
-        return pattern
+        return cls(value)
 
     @classmethod
     def get_line_level(cls, line: str) -> int:
@@ -52,20 +46,22 @@ class LineLevel:
 
         Returns:
             int: タブの数(半角空白なら4文字)をレベルとして返す
+
+        Raises:
+            ValueError: インデントがタブと半角空白の混在や4の倍数でない半角空白の場合
         """
-        # 空行は無視する
-        strip_line = line.strip()
-        if strip_line is None:
-            return cls.LEVEL_NONE
-
-        # レベル0から順にインデントをチェックする
-        for level in range(cls.LEVEL_MIN, cls.LEVEL_MAX):
-            # レベルに応じたチェックパターンを生成する
-            tab_count = level
-            pattern = cls.__create_indent_pattern(tab_count)
-
-            # 該当したレベルを返す
-            if re.match(pattern, line) is not None:
-                return level
-
-        raise ValueError(f"Wrong indent pattern: {line}")
+        match = cls._INDENT_PATTERN.match(line)
+        if match is None:
+            raise ValueError(f"Wrong indent pattern: {line}")
+
+        # タブはそのままレベルとする
+        indent = match.group(1)
+        if indent.startswith("\t"):
+            return len(indent)
+
+        # 半角空白は4文字で1レベルとする
+        space_count, remainder = divmod(len(indent), cls.TAB2SPACE)
+        if remainder != 0:
+            raise ValueError(f"Wrong indent pattern: {line}")
+
+        return space_count
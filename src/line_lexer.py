@@ -0,0 +1,63 @@
+import re
+import sys
+from typing import NamedTuple
+
+from line_level import LineLevel
+from line_type import LineType, LineTypeFormat
+
+
+class LexedLine(NamedTuple):
+    """1行分の字句解析結果
+
+    Attributes:
+        level(int): インデントに応じたレベル
+        type(LineTypeFormat): 行の種別
+        text_typeless(str): 種別指定を除いた文字列
+        in_names(list[str]): \\inで指定されたデータ名のリスト
+        out_names(list[str]): \\outで指定されたデータ名のリスト
+        text_clean(str): \\inと\\out要素を取り除いた文字列
+    """
+
+    level: int
+    type: LineTypeFormat
+    text_typeless: str
+    in_names: list[str]
+    out_names: list[str]
+    text_clean: str
+
+
+class LineLexer:
+    # 正規表現は読み込み時に一度だけコンパイルしておく
+    _IN_PATTERN = re.compile(r"\\in\s+(\S+)")
+    _OUT_PATTERN = re.compile(r"\\out\s+(\S+)")
+    _IO_REMOVE_PATTERN = re.compile(r"\\(?:in\s|out\s)(?:(\S+))?")
+
+    @classmethod
+    def lex(cls, line: str) -> LexedLine:
+        """1行を読み込んでレベル・種別・入出力・整形後の文字列をまとめて取得する
+
+        Args:
+            line (str): 字句解析したい行
+
+        Returns:
+            LexedLine: 字句解析結果
+
+        Raises:
+            ValueError: インデントの記載に誤りがある場合
+        """
+        level = LineLevel.get_line_level(line)
+        line_type, text_typeless = LineType.get_line_type(line)
+
+        # \inと\outは"\"を含むので、含まない行は正規表現を使わずに済ませる
+        if "\\" not in text_typeless:
+            return LexedLine(level, line_type, text_typeless, [], [], text_typeless.strip())
+
+        # \inと\outのパターンを抽出
+        # 同じデータ名は何度も現れるので、文字列を共有しておく
+        in_names = [sys.intern(name) for name in cls._IN_PATTERN.findall(text_typeless)]
+        out_names = [sys.intern(name) for name in cls._OUT_PATTERN.findall(text_typeless)]
+
+        # \inと\out要素を取り除いた行を取得
+        text_clean = cls._IO_REMOVE_PATTERN.sub("", text_typeless).strip()
+
+        return LexedLine(level, line_type, text_typeless, in_names, out_names, text_clean)
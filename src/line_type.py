@@ -2,9 +2,12 @@ from dataclasses import dataclass
 from enum import Enum, auto
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class LineTypeFormat:
-    """行の種別とその形式を表す"""
+    """行の種別とその形式を表す
+
+    種別ごとに1つのインスタンスを共有するので、変更できないようにしておく
+    """
 
     type_value: int = 0
     type_format: str = ""
@@ -1,10 +1,49 @@
+import argparse
 import glob
-from typing import NamedTuple
+import hashlib
+import heapq
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections.abc import Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import NamedTuple, TextIO
 
-from core import HCPInfo, convert_file2hcp_info_list
+from build_manifest import BuildManifest, InputRecord
+from core import HCPDocument, create_renderer, iter_convert_documents, open_module_sections, read_module_sections, render_section
+from define import RenderOption
+from file_snapshot import FileState, SnapshotDiff, diff_snapshots, refresh_snapshot, take_snapshot
+from pipeline import prefetch
+from profiler import NullProfiler, Profiler, get_profiler, set_profiler
+from render_cache import DiskRenderCache, get_disk_render_cache, get_section_digest, get_tool_version, set_disk_render_cache
 
-INPUT_PATH = ".\\src\\input\\"
-OUTPUT_PATH = ".\\src\\output\\"
+INPUT_PATH = os.path.join(".", "src", "input", "")
+OUTPUT_PATH = os.path.join(".", "src", "output", "")
+
+# 変換より先に読み込んでおくhcpファイルの最大数
+PREFETCH_FILES = 4
+# 並列変換で、行数の多い順に並べ替えるために先読みするモジュールの数(ワーカあたり)
+PARALLEL_WINDOW = 8
+# 既存のSVG画像と内容を比較する際に、一度に読み込むバイト数
+COMPARE_CHUNK_SIZE = 64 * 1024
+# 新しく作るSVG画像のパーミッション。open()で作成した場合と同じくumaskを適用する
+# umaskは変更しないと取得できず、スレッドから変更すると競合するため、読み込み時に一度だけ求める
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+NEW_FILE_MODE = 0o666 & ~_UMASK
+
+# 並列変換のワーカの種類
+EXECUTOR_PROCESS = "process"
+EXECUTOR_THREAD = "thread"
+EXECUTORS = (EXECUTOR_PROCESS, EXECUTOR_THREAD)
+
+# 変換に失敗したファイル・モジュールの数
+# 先読みやワーカのスレッドからも数えるため、ロックを取ってから更新する
+_error_count = 0
+_error_count_lock = threading.Lock()
 
 
 class HCPFileInfo(NamedTuple):
@@ -12,59 +51,907 @@ class HCPFileInfo(NamedTuple):
 
     Attributes:
         name(str): HCPファイル名
-        contents(list[HCPInfo]): HCPファイル内のモジュール毎の情報リスト
+        contents(Iterable[tuple[str, list[str]]]): HCPファイル内のモジュール毎のモジュール名とセクション行のリスト。
+            ファイルから読み込む場合は、取り出すたびに1モジュール分をデコードするイテレータ
     """
 
     name: str
-    contents: list[HCPInfo]
+    contents: Iterable[tuple[str, list[str]]]
+
+
+class RenderTask(NamedTuple):
+    """並列変換でワーカへ渡す1モジュール分の処理
+
+    Attributes:
+        hcp_file_path(str): hcpファイルのパス
+        section_name(str): モジュール名
+        section_lines(list[str]): セクション行のリスト
+        output_module_svg(str): SVG画像の保存先
+        skip_unchanged(bool): Trueなら、内容の変わらないSVG画像は書き出さない
+    """
+
+    hcp_file_path: str
+    section_name: str
+    section_lines: list[str]
+    output_module_svg: str
+    skip_unchanged: bool
+
+
+class RenderResult(NamedTuple):
+    """ワーカから返す1モジュール分の処理結果
+
+    SVG画像はワーカが書き出すため、結果には含めない
+
+    Attributes:
+        hcp_file_path(str): hcpファイルのパス
+        section_name(str): モジュール名
+        line_count(int): セクション行の数
+        start(float): 処理の開始時刻(time.perf_counterの値)
+        elapsed(float): 処理時間(秒)
+        process_id(int): 処理したワーカのプロセスID
+        thread_id(int): 処理したワーカのスレッドID
+        error(str | None): 失敗した場合のエラー内容
+    """
+
+    hcp_file_path: str
+    section_name: str
+    line_count: int
+    start: float
+    elapsed: float
+    process_id: int
+    thread_id: int
+    error: str | None
+
+
+def report_error(hcp_file_path: str, error: str, section_name: str | None = None) -> None:
+    """変換に失敗したファイル・モジュールを標準エラー出力へ表示する
+
+    Args:
+        hcp_file_path (str): hcpファイルのパス
+        error (str): エラー内容
+        section_name (str | None): モジュール名。ファイルの読み込みに失敗した場合はNone
+    """
+    global _error_count
+    with _error_count_lock:
+        _error_count += 1
+    target = hcp_file_path if section_name is None else f"{hcp_file_path} : {section_name}"
+    print(f"変換に失敗しました: {target}: {error}", file=sys.stderr)
+
+
+def iter_hcp_file_paths(folder_path: str) -> Iterator[str]:
+    """フォルダ内のhcpファイルのパスを順に取得する
+
+    Args:
+        folder_path (str): 探索するフォルダパス
 
+    Yields:
+        str: hcpファイルのパス
+    """
+    yield from glob.iglob(os.path.join(folder_path, "**", "*.hcp"), recursive=True)
+
+
+def iter_hcp_files_info(hcp_file_paths: Iterable[str], skip_errors: bool = False) -> Iterator[HCPFileInfo]:
+    """hcpファイルを1つずつ開いてsvg画像とする情報を取得する
+
+    モジュールのセクションはデコードせず、contentsから取り出した時点でデコードする
 
-def get_hcp_files_info(folder_path: str) -> list[HCPFileInfo]:
+    Args:
+        hcp_file_paths (Iterable[str]): hcpファイルのパス
+        skip_errors (bool): Trueなら、読み込めないファイルはエラーを表示して読み飛ばす
+
+    Yields:
+        HCPFileInfo: 読み込んだhcpファイルに関する情報
+    """
+    profiler = get_profiler()
+    for hcp_file_path in hcp_file_paths:
+        with profiler.span("file", file=hcp_file_path):
+            try:
+                contents = open_module_sections(hcp_file_path)
+            except (OSError, ValueError) as e:
+                if not skip_errors:
+                    raise
+                report_error(hcp_file_path, repr(e))
+                continue
+
+        yield HCPFileInfo(name=hcp_file_path, contents=contents)
+
+
+def get_hcp_files_info(folder_path: str, skip_errors: bool = False) -> list[HCPFileInfo]:
     """フォルダ内のhcpファイルを読み込んでsvg画像とする情報を取得する
 
     Args:
         folder_path (str): 読み込むフォルダパス
+        skip_errors (bool): Trueなら、読み込めないファイルはエラーを表示して読み飛ばす
 
     Returns:
         list[HCPInfo]: 読み込んだhcpファイルに関する情報のリスト
     """
-    hcp_files_info: list[HCPFileInfo] = []
-    for hcp_file_path in glob.glob(folder_path + "**\\*.hcp", recursive=True):
-        hcp_files_info.append(
-            HCPFileInfo(
-                name=hcp_file_path,
-                contents=convert_file2hcp_info_list(hcp_file_path),
-            )
-        )
+    # 呼び出し元で全てのファイルを保持するため、セクションもデコードしておく
+    return [
+        hcp_file_info._replace(contents=list(hcp_file_info.contents))
+        for hcp_file_info in iter_hcp_files_info(iter_hcp_file_paths(folder_path), skip_errors)
+    ]
 
-    return hcp_files_info
 
+def get_file_digest(hcp_file_path: str) -> str:
+    """変換の記録に用いる、hcpファイルの内容のハッシュ値を求める
 
-def create_hcp_images(hcp_files_info: list[HCPFileInfo]) -> None:
+    Args:
+        hcp_file_path (str): hcpファイルのパス
+
+    Returns:
+        str: ファイル内容のハッシュ値
+    """
+    with open(hcp_file_path, "rb") as f:
+        return hashlib.blake2b(f.read(), digest_size=20).hexdigest()
+
+
+def get_output_svg_name(hcp_file_path: str, section_name: str, input_path: str = INPUT_PATH) -> str:
+    """モジュールのSVG画像のファイル名を取得する
+
+    Args:
+        hcp_file_path (str): hcpファイルのパス
+        section_name (str): モジュール名
+        input_path (str): hcpファイルを読み込んだフォルダパス
+
+    Returns:
+        str: SVG画像のファイル名
+    """
+    # 読み込んだファイルパスをそのまま出力ファイル名にする
+    file_path = hcp_file_path.removeprefix(input_path)
+    basename = file_path.replace(os.sep, "_").split(".")[0]
+    return f"{basename}_{section_name}.svg"
+
+
+def write_svg_if_changed(output_module_svg: str, svg_img: str) -> bool:
+    """SVG画像の内容が変わった場合だけファイルへ書き出す
+
+    Args:
+        output_module_svg (str): SVG画像のファイルパス
+        svg_img (str): SVG画像の文字列
+
+    Returns:
+        bool: 書き出した場合はTrue
+    """
+    # テキストモードで書き出した場合と同じバイト列と比較する
+    svg_bytes = (svg_img if os.linesep == "\n" else svg_img.replace("\n", os.linesep)).encode("utf-8")
+    try:
+        if os.path.getsize(output_module_svg) == len(svg_bytes):
+            with open(output_module_svg, "rb") as f:
+                if f.read() == svg_bytes:
+                    return False
+    except OSError:
+        pass
+
+    with open(output_module_svg, "wb") as f:
+        f.write(svg_bytes)
+    return True
+
+
+def is_same_file_content(path_a: str, path_b: str) -> bool:
+    """2つのファイルの内容が同じか判定する
+
+    ファイル全体を読み込まず、少しずつ読み込んで比較する
+
+    Args:
+        path_a (str): 比較するファイルのパス
+        path_b (str): 比較するファイルのパス
+
+    Returns:
+        bool: 内容が同じならTrue。どちらかを読み込めない場合はFalse
+    """
+    try:
+        if os.path.getsize(path_a) != os.path.getsize(path_b):
+            return False
+        with open(path_a, "rb") as file_a, open(path_b, "rb") as file_b:
+            while True:
+                chunk_a = file_a.read(COMPARE_CHUNK_SIZE)
+                if chunk_a != file_b.read(COMPARE_CHUNK_SIZE):
+                    return False
+                if not chunk_a:
+                    return True
+    except OSError:
+        return False
+
+
+def stream_svg_if_changed(section_name: str, section_lines: list[str], output_module_svg: str) -> bool:
+    """SVG画像を一時ファイルへ描画しながら書き出し、内容が変わった場合だけ置き換える
+
+    Args:
+        section_name (str): モジュール名
+        section_lines (list[str]): セクション行のリスト
+        output_module_svg (str): SVG画像のファイルパス
+
+    Returns:
+        bool: 書き出した場合はTrue
+    """
+    renderer = create_renderer(section_name, section_lines)
+    output_dir, output_name = os.path.split(output_module_svg)
+    fd, temp_path = tempfile.mkstemp(suffix=".tmp", prefix=output_name, dir=output_dir or None)
+    try:
+        with open(fd, "w", encoding="utf-8") as f:
+            renderer.write(f)
+        if is_same_file_content(temp_path, output_module_svg):
+            return False
+        # mkstempは所有者だけが読み書きできるファイルを作るため、既存のSVG画像もしくは新しいファイルのパーミッションに揃える
+        try:
+            mode = os.stat(output_module_svg).st_mode & 0o7777
+        except FileNotFoundError:
+            mode = NEW_FILE_MODE
+        os.chmod(temp_path, mode)
+        os.replace(temp_path, output_module_svg)
+        return True
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def write_module_svg(section_name: str, section_lines: list[str], output_module_svg: str, skip_unchanged: bool = False) -> None:
+    """モジュールのSVG画像を生成してファイルへ保存する
+
+    SVG画像は文字列として保持せず、描画しながらファイルへ書き出す
+    一括変換では同じモジュールを1回しか描画しないため、プロセス内のキャッシュは用いない
+    内容の変わらないSVG画像を書き出さない場合は、一時ファイルへ書き出してから既存のSVG画像と比較する
+    ディスク上のキャッシュを設定している場合は、キャッシュに保存するため文字列として描画する
+
+    Args:
+        section_name (str): モジュール名
+        section_lines (list[str]): セクション行のリスト
+        output_module_svg (str): SVG画像の保存先
+        skip_unchanged (bool): Trueなら、内容の変わらないSVG画像は書き出さない
+    """
+    if get_disk_render_cache() is not None:
+        svg_img = render_section(section_name, section_lines)
+        if skip_unchanged:
+            write_svg_if_changed(output_module_svg, svg_img)
+        else:
+            with open(output_module_svg, "w", encoding="utf-8") as f:
+                f.write(svg_img)
+        return
+
+    if skip_unchanged:
+        stream_svg_if_changed(section_name, section_lines, output_module_svg)
+        return
+
+    renderer = create_renderer(section_name, section_lines)
+    with open(output_module_svg, "w", encoding="utf-8") as f:
+        renderer.write(f)
+
+
+def create_hcp_images(
+    hcp_files_info: Iterable[HCPFileInfo],
+    input_path: str = INPUT_PATH,
+    output_path: str = OUTPUT_PATH,
+    skip_unchanged: bool = False,
+    jobs: int = 1,
+    executor: str = EXECUTOR_PROCESS,
+) -> dict[str, list[str]]:
     """hcpファイル内のmoduleごとにSVG画像を生成する
 
+    hcpファイル単位の情報は1つずつ取り出して処理するため、ジェネレータを渡せば全てのファイルを保持せずに済む
+    ディスク上のキャッシュを設定している場合は、キャッシュを参照してからパースする
+
     Args:
-        hcp_files_info (list[HCPFileInfo]): hcpファイル単位の情報から成るリスト
+        hcp_files_info (Iterable[HCPFileInfo]): hcpファイル単位の情報
+        input_path (str): hcpファイルを読み込んだフォルダパス
+        output_path (str): SVG画像を保存するフォルダパス
+        skip_unchanged (bool): Trueなら、内容の変わらないSVG画像は書き出さない
+        jobs (int): 並列に処理するワーカ数。2以上ならcreate_hcp_images_parallelで処理する
+        executor (str): 並列に処理するワーカの種類(EXECUTORSのいずれか)
+
+    Returns:
+        dict[str, list[str]]: hcpファイルのパスごとの、生成したSVG画像のファイル名のリスト
     """
+    if jobs > 1:
+        return create_hcp_images_parallel(hcp_files_info, input_path, output_path, skip_unchanged, jobs, executor)
+
+    profiler = get_profiler()
+    outputs: dict[str, list[str]] = {}
     # ファイル単位で処理する
     for hcp_file_info in hcp_files_info:
-        # 読み込んだファイルパスをそのまま出力ファイル名にする
-        file_path = hcp_file_info.name.removeprefix(INPUT_PATH)
-        basename = file_path.replace("\\", "_").split(".")[0]
+        file_outputs = outputs.setdefault(hcp_file_info.name, [])
         # ファイル内のモジュール単位で保存する
-        for hcp_file_content in hcp_file_info.contents:
-            output_module_svg = f"{OUTPUT_PATH}{basename}_{hcp_file_content.name}.svg"
-            with open(output_module_svg, "w", encoding="utf-8") as f:
-                f.write(hcp_file_content.svg_img)
+        with profiler.span("file", file=hcp_file_info.name):
+            for section_name, section_lines in hcp_file_info.contents:
+                with profiler.span("module", module=section_name):
+                    output_svg_name = get_output_svg_name(hcp_file_info.name, section_name, input_path)
+                    file_outputs.append(output_svg_name)
+                    write_module_svg(section_name, section_lines, f"{output_path}{output_svg_name}", skip_unchanged)
+
+    return outputs
+
+
+def init_render_worker(cache_path: str | None, cache_max_bytes: int) -> None:
+    """並列変換のワーカを初期化する
+
+    Args:
+        cache_path (str | None): 親プロセスで設定したディスク上のキャッシュのパス
+        cache_max_bytes (int): キャッシュの合計サイズの上限
+    """
+    if cache_path is not None:
+        set_disk_render_cache(DiskRenderCache(cache_path, cache_max_bytes))
+
+
+def render_module_task(task: RenderTask) -> RenderResult:
+    """ワーカで1モジュール分のSVG画像を生成して保存する
+
+    Args:
+        task (RenderTask): 処理するモジュール
+
+    Returns:
+        RenderResult: 処理結果
+    """
+    start = time.perf_counter()
+    error: str | None = None
+    try:
+        write_module_svg(task.section_name, task.section_lines, task.output_module_svg, task.skip_unchanged)
+    except Exception as e:
+        # 1つのモジュールの失敗で他のモジュールの変換を止めない
+        error = repr(e)
+    elapsed = time.perf_counter() - start
+    return RenderResult(
+        task.hcp_file_path, task.section_name, len(task.section_lines), start, elapsed, os.getpid(), threading.get_ident(), error
+    )
+
+
+def render_module_task_in_thread(task: RenderTask) -> RenderResult:
+    """スレッドのワーカで1モジュール分のSVG画像を生成して保存する
+
+    スレッドはプロファイラを共有するので、ワーカのスレッドで区間を計測する
+    逐次変換と同じく、モジュールの区間はファイルの区間に含める
+
+    Args:
+        task (RenderTask): 処理するモジュール
+
+    Returns:
+        RenderResult: 処理結果
+    """
+    profiler = get_profiler()
+    with profiler.span("file", file=task.hcp_file_path), profiler.span("module", module=task.section_name, lines=len(task.section_lines)):
+        return render_module_task(task)
+
+
+def create_hcp_images_parallel(
+    hcp_files_info: Iterable[HCPFileInfo],
+    input_path: str = INPUT_PATH,
+    output_path: str = OUTPUT_PATH,
+    skip_unchanged: bool = False,
+    jobs: int = 2,
+    executor: str = EXECUTOR_PROCESS,
+) -> dict[str, list[str]]:
+    """hcpファイル内のmoduleごとのSVG画像を複数のワーカで生成する
+
+    行数の多いモジュールから順に割り当てることで、最後に大きなモジュールだけが残ることを避ける
+    ただし保持するモジュールの数を抑えるため、並べ替えは先読みした範囲(ワーカあたりPARALLEL_WINDOW個)で行う
+    SVG画像はワーカが直接書き出し、呼び出し元へは処理結果だけを返す
+    変換に失敗したモジュールはエラーを表示し、他のモジュールの変換は続ける
+
+    スレッドのワーカはセクション行の受け渡しに直列化が要らず、キャッシュも共有できる
+    GILを無効にしたPythonでなければ描画は並列に進まないため、既定はプロセスとする
+
+    Args:
+        hcp_files_info (Iterable[HCPFileInfo]): hcpファイル単位の情報
+        input_path (str): hcpファイルを読み込んだフォルダパス
+        output_path (str): SVG画像を保存するフォルダパス
+        skip_unchanged (bool): Trueなら、内容の変わらないSVG画像は書き出さない
+        jobs (int): 並列に処理するワーカ数
+        executor (str): ワーカの種類(EXECUTORSのいずれか)
+
+    Returns:
+        dict[str, list[str]]: 全てのモジュールの変換に成功したhcpファイルのパスごとの、生成したSVG画像のファイル名のリスト
+
+    Raises:
+        ValueError: ワーカの種類が誤っている場合
+    """
+    if executor not in EXECUTORS:
+        raise ValueError(f"Unknown executor: {executor}")
+
+    outputs: dict[str, list[str]] = {}
+    failed_files: set[str] = set()
+
+    def iter_tasks() -> Iterator[RenderTask]:
+        for hcp_file_info in hcp_files_info:
+            file_outputs = outputs.setdefault(hcp_file_info.name, [])
+            try:
+                for section_name, section_lines in hcp_file_info.contents:
+                    output_svg_name = get_output_svg_name(hcp_file_info.name, section_name, input_path)
+                    file_outputs.append(output_svg_name)
+                    yield RenderTask(hcp_file_info.name, section_name, section_lines, f"{output_path}{output_svg_name}", skip_unchanged)
+            except OSError as e:
+                # デコードできないセクション以降は変換せず、他のファイルの変換は続ける
+                failed_files.add(hcp_file_info.name)
+                report_error(hcp_file_info.name, repr(e))
+
+    tasks = iter_tasks()
+    # 行数を処理時間の見積もりとして、大きいモジュールから取り出す
+    pending: list[tuple[int, int, RenderTask]] = []
+    task_count = 0
+
+    def fill_pending() -> None:
+        nonlocal task_count
+        while len(pending) < jobs * PARALLEL_WINDOW:
+            task = next(tasks, None)
+            if task is None:
+                return
+            heapq.heappush(pending, (-len(task.section_lines), task_count, task))
+            task_count += 1
+
+    pool: Executor
+    if executor == EXECUTOR_THREAD:
+        # スレッドはキャッシュを共有するので、ワーカの初期化は要らない
+        pool = ThreadPoolExecutor(max_workers=jobs, thread_name_prefix="render")
+        task_function = render_module_task_in_thread
+    else:
+        disk_render_cache = get_disk_render_cache()
+        init_args = (disk_render_cache.path, disk_render_cache.max_bytes) if disk_render_cache is not None else (None, 0)
+        pool = ProcessPoolExecutor(max_workers=jobs, initializer=init_render_worker, initargs=init_args)
+        task_function = render_module_task
+
+    profiler = get_profiler()
+    with pool:
+        running: set[Future[RenderResult]] = set()
+        fill_pending()
+        while pending or running:
+            # ワーカが待たないよう、ワーカ数の2倍まで投入しておく
+            while pending and len(running) < jobs * 2:
+                running.add(pool.submit(task_function, heapq.heappop(pending)[2]))
+                fill_pending()
+
+            done, running = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = future.result()
+                if executor == EXECUTOR_PROCESS:
+                    # ワーカで計測した処理時間を、ワーカのプロセス・スレッドの区間として記録する
+                    # 逐次変換と同じく、モジュールの処理時間はファイルの処理時間にも含める
+                    worker_id = {"pid": result.process_id, "tid": result.thread_id}
+                    profiler.record("file", result.start, result.elapsed, file=result.hcp_file_path, **worker_id)
+                    profiler.record(
+                        "module",
+                        result.start,
+                        result.elapsed,
+                        file=result.hcp_file_path,
+                        module=result.section_name,
+                        lines=result.line_count,
+                        **worker_id,
+                    )
+                if result.error is not None:
+                    failed_files.add(result.hcp_file_path)
+                    report_error(result.hcp_file_path, result.error, result.section_name)
+
+    return {hcp_file_path: file_outputs for hcp_file_path, file_outputs in outputs.items() if hcp_file_path not in failed_files}
+
+
+def build_hcp_images(
+    input_path: str = INPUT_PATH, output_path: str = OUTPUT_PATH, jobs: int = 1, executor: str = EXECUTOR_PROCESS
+) -> list[str]:
+    """前回の変換から変わったhcpファイルだけをSVG画像へ変換する
+
+    出力先フォルダに保存した記録と比べて、更新日時とサイズが同じファイルは開かずに読み飛ばす
+    更新日時が変わっていても、内容のハッシュ値が同じなら変換しない
+    削除されたファイルやモジュールのSVG画像は削除する
+    並列に処理する場合、変換に失敗したファイルは前回の記録を残し、次回に変換し直す
+
+    Args:
+        input_path (str): hcpファイルを読み込むフォルダパス
+        output_path (str): SVG画像を保存するフォルダパス
+        jobs (int): 並列に処理するワーカ数
+        executor (str): 並列に処理するワーカの種類(EXECUTORSのいずれか)
+
+    Returns:
+        list[str]: 変換したhcpファイルのパスのリスト
+    """
+    manifest_path = os.path.join(output_path, BuildManifest.FILE_NAME)
+    previous_manifest = BuildManifest.load(manifest_path)
+    manifest = BuildManifest(get_tool_version())
+    # ツールが変わった場合は前回の記録を信用しない
+    is_trusted = previous_manifest.build_key == manifest.build_key
+
+    changed_files_state: dict[str, tuple[os.stat_result, str]] = {}
+
+    def iter_changed_file_paths() -> Iterator[str]:
+        for hcp_file_path in iter_hcp_file_paths(input_path):
+            stat = os.stat(hcp_file_path)
+            record = previous_manifest.get_up_to_date_record(hcp_file_path, stat, output_path) if is_trusted else None
+            if record is not None:
+                manifest.inputs[hcp_file_path] = record
+                continue
+
+            digest = get_file_digest(hcp_file_path)
+            record = previous_manifest.get_unchanged_record(hcp_file_path, digest, output_path) if is_trusted else None
+            if record is not None:
+                manifest.inputs[hcp_file_path] = record._replace(mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+                continue
+
+            changed_files_state[hcp_file_path] = (stat, digest)
+            yield hcp_file_path
+
+    # 探索・読み込みと変換・書き出しを並行させ、読み込んだファイルは順に変換して手放す
+    changed_files_info = prefetch(iter_hcp_files_info(iter_changed_file_paths(), skip_errors=jobs > 1), PREFETCH_FILES)
+    outputs = create_hcp_images(changed_files_info, input_path, output_path, skip_unchanged=True, jobs=jobs, executor=executor)
+    for hcp_file_path, (stat, digest) in changed_files_state.items():
+        if hcp_file_path in outputs:
+            manifest.inputs[hcp_file_path] = InputRecord(stat.st_mtime_ns, stat.st_size, digest, outputs[hcp_file_path])
+        elif hcp_file_path in previous_manifest.inputs:
+            # 失敗したファイルの出力は削除せずに残す
+            manifest.inputs[hcp_file_path] = previous_manifest.inputs[hcp_file_path]
+
+    # 出力しなくなったSVG画像を削除する
+    for stale_output in previous_manifest.get_outputs() - manifest.get_outputs():
+        stale_path = os.path.join(output_path, stale_output)
+        if os.path.exists(stale_path):
+            os.remove(stale_path)
+
+    manifest.save(manifest_path)
+    return list(changed_files_state)
+
+
+class HCPWatcher:
+    """入力フォルダを監視し、変更されたモジュールだけをSVG画像へ変換する
+
+    ファイルの更新日時とサイズのスナップショットを定期的に取得して変更を検出する
+    フォルダ全体の走査はファイルの追加・削除でフォルダの更新日時が変わった場合だけ行い、普段はファイルごとのos.statで済ませる
+    同じプロセスで変換を続けるため、文字列幅や描画結果のキャッシュは再利用される
+    変更を反映するたびに変換の記録を保存し、次回の差分変換で変換し直さずに済ませる
+    """
+
+    # スナップショットを取得する間隔(秒)
+    POLL_INTERVAL = 0.02
+    # 連続した保存をまとめるため、変更が止まってから待つ時間(秒)
+    DEBOUNCE = 0.03
+
+    def __init__(
+        self, input_path: str = INPUT_PATH, output_path: str = OUTPUT_PATH, poll_interval: float = POLL_INTERVAL, debounce: float = DEBOUNCE
+    ) -> None:
+        """
+        初期化メソッド
+
+        出力先フォルダのSVG画像は、入力フォルダの内容と一致していることを前提とする
+
+        Args:
+            input_path: hcpファイルを読み込むフォルダパス
+            output_path: SVG画像を保存するフォルダパス
+            poll_interval: スナップショットを取得する間隔(秒)
+            debounce: 変更が止まってから変換を始めるまでの時間(秒)
+        """
+        self.input_path = input_path
+        self.output_path = output_path
+        self.poll_interval = poll_interval
+        self.debounce = debounce
+        self.option = RenderOption()
+
+        self.manifest_path = os.path.join(output_path, BuildManifest.FILE_NAME)
+        self.manifest = BuildManifest.load(self.manifest_path)
+        if self.manifest.build_key != get_tool_version():
+            # ツールが変わった場合は前回の記録を引き継がない
+            self.manifest = BuildManifest(get_tool_version())
+
+        # 走査したフォルダごとの更新日時
+        self.folder_states: dict[str, int] = {}
+        self.snapshot: dict[str, FileState] = take_snapshot(input_path, folder_states=self.folder_states)
+        # hcpファイルのパスごとに、SVG画像のファイル名とセクションのハッシュ値を保持する
+        self.module_digests: dict[str, dict[str, str]] = {}
+        for hcp_file_path in self.snapshot:
+            try:
+                self.module_digests[hcp_file_path] = self.get_module_digests(hcp_file_path, read_module_sections(hcp_file_path))
+            except (OSError, ValueError):
+                continue
+
+    def get_module_digests(self, hcp_file_path: str, sections: list[tuple[str, list[str]]]) -> dict[str, str]:
+        """モジュールごとのSVG画像のファイル名とセクションのハッシュ値を求める
+
+        Args:
+            hcp_file_path (str): hcpファイルのパス
+            sections (list[tuple[str, list[str]]]): モジュール名とセクション行のリストから成るタプルのリスト
+
+        Returns:
+            dict[str, str]: SVG画像のファイル名ごとのハッシュ値
+        """
+        return {
+            get_output_svg_name(hcp_file_path, section_name, self.input_path): get_section_digest(section_name, section_lines, self.option)
+            for section_name, section_lines in sections
+        }
+
+    def remove_outputs(self, output_svg_names: set[str]) -> None:
+        """出力しなくなったSVG画像を削除する
+
+        Args:
+            output_svg_names (set[str]): 削除するSVG画像のファイル名の集合
+        """
+        for output_svg_name in output_svg_names:
+            output_module_svg = f"{self.output_path}{output_svg_name}"
+            if os.path.exists(output_module_svg):
+                os.remove(output_module_svg)
+
+    def update_file(self, hcp_file_path: str) -> int:
+        """追加・更新されたhcpファイルのうち、内容が変わったモジュールだけを変換する
+
+        Args:
+            hcp_file_path (str): hcpファイルのパス
+
+        Returns:
+            int: 変換したモジュールの数
+        """
+        try:
+            stat = os.stat(hcp_file_path)
+            file_digest = get_file_digest(hcp_file_path)
+            sections = read_module_sections(hcp_file_path)
+        except (OSError, ValueError) as e:
+            report_error(hcp_file_path, repr(e))
+            return 0
+
+        previous_digests = self.module_digests.get(hcp_file_path, {})
+        digests: dict[str, str] = {}
+        render_count = 0
+        is_failed = False
+        for section_name, section_lines in sections:
+            output_svg_name = get_output_svg_name(hcp_file_path, section_name, self.input_path)
+            digest = get_section_digest(section_name, section_lines, self.option)
+            digests[output_svg_name] = digest
+            if previous_digests.get(output_svg_name) == digest:
+                continue
+
+            try:
+                # 編集を元に戻した場合などに描画済みのSVGを再利用するため、プロセス内のキャッシュを通して描画する
+                write_svg_if_changed(f"{self.output_path}{output_svg_name}", render_section(section_name, section_lines, self.option))
+            except Exception as e:
+                report_error(hcp_file_path, repr(e), section_name)
+                # 次の保存で変換し直す
+                digests[output_svg_name] = ""
+                is_failed = True
+                continue
+            render_count += 1
+
+        self.remove_outputs(previous_digests.keys() - digests.keys())
+        self.module_digests[hcp_file_path] = digests
+        if is_failed:
+            # 次回の差分変換でも変換し直す
+            self.manifest.inputs.pop(hcp_file_path, None)
+        else:
+            self.manifest.inputs[hcp_file_path] = InputRecord(stat.st_mtime_ns, stat.st_size, file_digest, list(digests))
+        return render_count
+
+    def apply(self, diff: SnapshotDiff) -> int:
+        """スナップショットの差分をSVG画像へ反映する
+
+        Args:
+            diff (SnapshotDiff): スナップショットの差分
+
+        Returns:
+            int: 変換したモジュールの数
+        """
+        render_count = 0
+        for hcp_file_path in diff.changed:
+            render_count += self.update_file(hcp_file_path)
+        for hcp_file_path in diff.removed:
+            self.remove_outputs(set(self.module_digests.pop(hcp_file_path, {})))
+            self.manifest.inputs.pop(hcp_file_path, None)
+        self.manifest.save(self.manifest_path)
+        return render_count
+
+    def wait_for_changes(self) -> SnapshotDiff:
+        """変更を検出し、変更が止まるまで待ってから差分を取得する
+
+        Returns:
+            SnapshotDiff: 前回反映したスナップショットとの差分
+        """
+        # 変更を検出するまで待つ
+        snapshot = refresh_snapshot(self.input_path, self.snapshot, self.folder_states)
+        while snapshot == self.snapshot:
+            time.sleep(self.poll_interval)
+            snapshot = refresh_snapshot(self.input_path, snapshot, self.folder_states)
+
+        # 変更が止まるまで待つ
+        last_changed = time.perf_counter()
+        while time.perf_counter() - last_changed < self.debounce:
+            time.sleep(self.poll_interval)
+            latest = refresh_snapshot(self.input_path, snapshot, self.folder_states)
+            if latest != snapshot:
+                snapshot = latest
+                last_changed = time.perf_counter()
+
+        diff = diff_snapshots(self.snapshot, snapshot)
+        self.snapshot = snapshot
+        return diff
+
+    def run(self, max_updates: int | None = None) -> None:
+        """変更を監視してSVG画像へ反映し続ける
+
+        Ctrl+Cで終了する
+
+        Args:
+            max_updates (int | None): 指定した場合、この回数だけ反映したら終了する
+        """
+        update_count = 0
+        try:
+            while max_updates is None or update_count < max_updates:
+                diff = self.wait_for_changes()
+                start = time.perf_counter()
+                render_count = self.apply(diff)
+                update_count += 1
+                elapsed = (time.perf_counter() - start) * 1000
+                print(f"{len(diff.changed) + len(diff.removed)}件のファイルの変更を反映しました: {render_count}モジュールを変換 ({elapsed:.1f} ms)")
+        except KeyboardInterrupt:
+            pass
+
+
+def iter_stream_documents(input_stream: TextIO) -> Iterator[HCPDocument]:
+    """NDJSONの入力からhcpの文書を順に取得する
+
+    1行に1文書とし、{"file": 名前, "text": テキスト}もしくは{"file": 名前, "lines": 行のリスト}の形式とする
+    解釈できない行はエラーを表示して読み飛ばす
+
+    Args:
+        input_stream (TextIO): 読み込むストリーム
+
+    Yields:
+        HCPDocument: hcpの文書
+    """
+    for line_num, line in enumerate(input_stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+            text = record["text"] if "text" in record else record["lines"]
+            yield HCPDocument(str(record.get("file", "")), text)
+        except (ValueError, TypeError, KeyError) as e:
+            report_error(f"<stdin>:{line_num}", repr(e))
+
+
+def convert_stream(input_stream: TextIO, output_stream: TextIO) -> None:
+    """ストリームから読み込んだhcpの文書を変換し、モジュールごとにNDJSONで書き出す
+
+    1モジュールを変換するごとに{"file": 名前, "module": モジュール名, "svg": SVG}の1行を書き出す
+    変換に失敗した文書はエラーを表示し、次の文書の変換を続ける
+
+    Args:
+        input_stream (TextIO): NDJSONの文書を読み込むストリーム
+        output_stream (TextIO): 変換結果を書き出すストリーム
+    """
+    for document in iter_stream_documents(input_stream):
+        try:
+            for module_svg in iter_convert_documents([document]):
+                output_stream.write(json.dumps(module_svg._asdict(), ensure_ascii=False) + "\n")
+        except Exception as e:
+            report_error(document.name, repr(e))
+        # パイプの下流が文書ごとに受け取れるようにする
+        output_stream.flush()
+
+
+def main(
+    input_path: str = INPUT_PATH,
+    output_path: str = OUTPUT_PATH,
+    profile_top: int = 0,
+    trace_path: str | None = None,
+    cache_path: str | None = None,
+    cache_max_bytes: int = DiskRenderCache.MAX_BYTES,
+    cache_import_path: str | None = None,
+    cache_export_path: str | None = None,
+    incremental: bool = True,
+    jobs: int = 1,
+    watch: bool = False,
+    pipe: bool = False,
+    executor: str = EXECUTOR_PROCESS,
+) -> bool:
+    """フォルダ内のhcpファイルをSVG画像へ変換する
+
+    Args:
+        input_path (str): hcpファイルを読み込むフォルダパス
+        output_path (str): SVG画像を保存するフォルダパス
+        profile_top (int): 0より大きければ、処理時間の長いファイル・モジュールを指定した件数だけ表示する
+        trace_path (str | None): 指定した場合、計測結果をChromeのトレースイベント形式で保存する
+        cache_path (str | None): 指定した場合、描画済みのSVGをこのファイルへキャッシュする
+        cache_max_bytes (int): キャッシュの合計サイズの上限
+        cache_import_path (str | None): 指定した場合、変換前にこのファイルからキャッシュを取り込む
+        cache_export_path (str | None): 指定した場合、変換後にキャッシュをこのファイルへ書き出す
+        incremental (bool): Trueなら、前回の変換から変わったhcpファイルだけを変換する
+        jobs (int): 並列に処理するワーカ数。2以上なら変換に失敗したファイルを読み飛ばして続ける
+        watch (bool): Trueなら、変換後も入力フォルダを監視し、変更されたモジュールを変換し続ける
+        pipe (bool): Trueなら、フォルダの代わりに標準入力のNDJSONを変換し、結果を標準出力へNDJSONで書き出す
+        executor (str): 並列に処理するワーカの種類(EXECUTORSのいずれか)
+
+    Returns:
+        bool: 全てのファイルを変換できた場合はTrue
+    """
+    global _error_count
+    _error_count = 0
+
+    profiler = Profiler() if profile_top > 0 or trace_path is not None else None
+    if profiler is not None:
+        set_profiler(profiler)
+
+    disk_render_cache = DiskRenderCache(cache_path, cache_max_bytes) if cache_path is not None else None
+    if disk_render_cache is not None:
+        if cache_import_path is not None:
+            disk_render_cache.import_bundle(cache_import_path)
+        set_disk_render_cache(disk_render_cache)
+
+    try:
+        if pipe:
+            convert_stream(sys.stdin, sys.stdout)
+        elif incremental:
+            build_hcp_images(input_path, output_path, jobs, executor)
+        else:
+            # フォルダからhcpファイルの情報を順に取得する
+            hcp_files_info = prefetch(iter_hcp_files_info(iter_hcp_file_paths(input_path), skip_errors=jobs > 1), PREFETCH_FILES)
+
+            # hcpファイルの情報に基づいてsvg画像を生成する
+            create_hcp_images(hcp_files_info, input_path, output_path, jobs=jobs, executor=executor)
+
+        if watch:
+            print(f"{input_path} の監視を開始します。Ctrl+Cで終了します")
+            HCPWatcher(input_path, output_path).run()
+    finally:
+        if profiler is not None:
+            set_profiler(NullProfiler())
+        if disk_render_cache is not None:
+            set_disk_render_cache(None)
+            if cache_export_path is not None:
+                disk_render_cache.export_bundle(cache_export_path)
+            disk_render_cache.close()
+
+    if profiler is not None:
+        if profile_top > 0:
+            # 標準出力は変換結果に用いるため、パイプモードでは標準エラー出力へ表示する
+            print(profiler.summarize(profile_top), file=sys.stderr if pipe else sys.stdout)
+        if trace_path is not None:
+            profiler.write_trace(trace_path)
+
+    return _error_count == 0
 
 
-def main() -> None:
-    # フォルダからhcpファイルの情報を取得する
-    hcp_files_info = get_hcp_files_info(INPUT_PATH)
+def parse_args() -> argparse.Namespace:
+    arg_parser = argparse.ArgumentParser(description="hcpファイルをモジュールごとのSVG画像へ変換する")
+    arg_parser.add_argument("--input", default=INPUT_PATH, help="hcpファイルを読み込むフォルダ")
+    arg_parser.add_argument("--output", default=OUTPUT_PATH, help="SVG画像を保存するフォルダ")
+    arg_parser.add_argument(
+        "--profile", type=int, nargs="?", const=10, default=0, metavar="N", help="処理時間の長いファイル・モジュールを上位N件表示する"
+    )
+    arg_parser.add_argument("--trace", default=None, metavar="PATH", help="計測結果をChromeのトレースイベント形式で保存する")
+    arg_parser.add_argument("--cache", default=None, metavar="PATH", help="描画済みのSVGをキャッシュするファイル")
+    arg_parser.add_argument(
+        "--cache-max-mb", type=int, default=DiskRenderCache.MAX_BYTES // (1024 * 1024), metavar="MB", help="キャッシュの合計サイズの上限"
+    )
+    arg_parser.add_argument("--cache-import", default=None, metavar="PATH", help="変換前にキャッシュを取り込むファイル")
+    arg_parser.add_argument("--cache-export", default=None, metavar="PATH", help="変換後にキャッシュを書き出すファイル")
+    arg_parser.add_argument("--rebuild", action="store_true", help="前回の変換記録を用いず、全てのhcpファイルを変換する")
+    arg_parser.add_argument("--watch", action="store_true", help="変換後も入力フォルダを監視し、変更されたモジュールを変換し続ける")
+    arg_parser.add_argument(
+        "--pipe", action="store_true", help="標準入力のNDJSON({file, text})を変換し、標準出力へNDJSON({file, module, svg})で書き出す"
+    )
+    arg_parser.add_argument("--jobs", type=int, default=1, metavar="N", help="並列に処理するワーカ数。0ならCPU数")
+    arg_parser.add_argument(
+        "--executor", choices=EXECUTORS, default=EXECUTOR_PROCESS, help="並列に処理するワーカの種類。threadはGILを無効にしたPython向け"
+    )
+    args = arg_parser.parse_args()
 
-    # hcpファイルの情報に基づいてsvg画像を生成する
-    create_hcp_images(hcp_files_info)
+    if args.jobs == 0:
+        args.jobs = os.cpu_count() or 1
+    if args.cache is None and (args.cache_import is not None or args.cache_export is not None):
+        arg_parser.error("--cache-import/--cache-export には --cache の指定が必要です")
+    if args.pipe and args.watch:
+        arg_parser.error("--pipe と --watch は同時に指定できません")
+    return args
 
 
 if __name__ == "__main__":
-    main()
+    args = parse_args()
+    if args.pipe:
+        # 環境の既定の文字コードによらず、NDJSONはUTF-8で読み書きする
+        sys.stdin.reconfigure(encoding="utf-8")  # type: ignore[union-attr]
+        sys.stdout.reconfigure(encoding="utf-8")  # type: ignore[union-attr]
+    is_succeeded = main(
+        os.path.join(args.input, ""),
+        os.path.join(args.output, ""),
+        args.profile,
+        args.trace,
+        args.cache,
+        args.cache_max_mb * 1024 * 1024,
+        args.cache_import,
+        args.cache_export,
+        not args.rebuild,
+        args.jobs,
+        args.watch,
+        args.pipe,
+        args.executor,
+    )
+    sys.exit(0 if is_succeeded else 1)
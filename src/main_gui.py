@@ -4,12 +4,16 @@ import os
 import streamlit as st
 
 from core import HCPInfo, convert_file2hcp_info_list
+from define import RenderOption
 
 PATH_DEFAULT = ""
 
 COL_NUM_MODULE = 2
 CONTAINER_HEIGHT_MODULES = 140
 
+# 画面上の要素数を減らすため、線分はまとめて描画する
+RENDER_OPTION = RenderOption(batch_lines=True)
+
 
 def set_input_folder_path_section() -> None:
     if "selected_path" not in st.session_state:
@@ -114,7 +118,7 @@ def set_module_list() -> None:
 def read_file(path: str) -> list[HCPInfo]:
     hcp_info_list: list[HCPInfo] = []
     try:
-        hcp_info_list = convert_file2hcp_info_list(path)
+        hcp_info_list = convert_file2hcp_info_list(path, RENDER_OPTION)
     except Exception as e:
         st.error(f"ファイルの読み込み中にエラーが発生しました: {e}")
 
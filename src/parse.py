@@ -1,20 +1,68 @@
-import re
+from collections.abc import Iterable
 
+from data_table import DataSymbol, DataSymbolTable
 from define import DataInfo, InOutData, LineInfo
 from line_level import LineLevel
-from line_type import LineType, LineTypeDefine, LineTypeEnum
+from line_lexer import LexedLine, LineLexer
+from line_type import LineTypeDefine, LineTypeEnum
 
 
 class DiagramParser:
+    """hcpのテキストをパースして、処理部とデータ部の情報を作成する
+
+    パース結果の各行の情報は変更できないので、前後関係などは全て求めてから作成する
+    """
+
+    _DATA_TYPE_VALUE = LineTypeDefine.get_format_by_type(LineTypeEnum.DATA).type_value
+    # 前後関係を持たない行の(行番号, 1つ前, 1つ後)
+    __NO_RELATIONSHIP = (LineInfo.DEFAULT_VALUE, LineInfo.DEFAULT_VALUE, LineInfo.DEFAULT_VALUE)
+
     def __init__(self, text_lines: list[str]) -> None:
-        self.line_info_list: list[LineInfo] = self.convert_lines2lineinfo(text_lines)
-        self.update_line_level()
-        self.update_line_type()
-        self.update_line_io()
+        self.__build([(line, LineLexer.lex(line)) for line in text_lines])
+
+    @classmethod
+    def from_lexed_lines(cls, lexed_lines: Iterable[tuple[str, LexedLine]]) -> "DiagramParser":
+        """字句解析済みの行からパース結果を作成する
+
+        テキストを介さずに図を組み立てる場合に用いる
+
+        Args:
+            lexed_lines (Iterable[tuple[str, LexedLine]]): 元の文字列と字句解析結果から成るタプル
+
+        Returns:
+            DiagramParser: パース結果
+        """
+        parser = cls.__new__(cls)
+        parser.__build(list(lexed_lines))
+        return parser
+
+    def __build(self, lexed_lines: list[tuple[str, LexedLine]]) -> None:
+        """字句解析結果から処理部とデータ部の情報を組み立てる
+
+        Args:
+            lexed_lines (list[tuple[str, LexedLine]]): 元の文字列と字句解析結果から成るタプルのリスト
+        """
+        # 処理部とデータ部に分け、行ごとの前後関係を求めてから情報を作成する
+        process_indexes = self.create_process_indexes(lexed_lines)
+        # データ名からデータ部の情報を引けるようにしておく
+        self.data_table = self.create_data_table(lexed_lines)
+        data_indexes = self.data_table.get_indexes()
+        relationships: dict[int, tuple[int, int, int]] = {}
+        for indexes in (process_indexes, data_indexes):
+            line_relationships = self.__assign_line_relationships([lexed_lines[index][1].level for index in indexes])
+            for no, (index, (before_no, next_no)) in enumerate(zip(indexes, line_relationships, strict=True)):
+                relationships[index] = (no, before_no, next_no)
+
+        self.line_info_list: list[LineInfo] = [
+            self.convert_lexed2lineinfo(line, lexed, *relationships.get(index, self.__NO_RELATIONSHIP))
+            for index, (line, lexed) in enumerate(lexed_lines)
+        ]
 
         # 処理部とデータ部のリストを保持
-        self.process_line_info_list = self.create_process_info_list()
-        self.data_line_info_list = self.create_data_info_list()
+        self.process_line_info_list = [self.line_info_list[index] for index in process_indexes]
+        for symbol in self.data_table:
+            symbol.line_info = self.line_info_list[symbol.index]
+        self.data_line_info_list = self.data_table.get_line_info_list()
 
         # 処理部とデータ部の最小レベルを保持
         self.process_level_min = self.get_level_min(self.process_line_info_list)
@@ -25,7 +73,10 @@ class DiagramParser:
 
     @staticmethod
     def convert_lines2lineinfo(lines: list[str]) -> list[LineInfo]:
-        """文字列リストを文字列情報リストに変換する
+        """文字列リストを字句解析して文字列情報リストに変換する
+
+        各行は一度だけ読み込み、レベル・種別・入出力情報をまとめて決定する
+        行の前後関係は設定しない
 
         Args:
             lines (list[str]): 文字列リスト
@@ -33,133 +84,105 @@ class DiagramParser:
         Returns:
             list[LineInfo]: 文字列情報リスト
         """
-        line_info_list: list[LineInfo] = []
-        for line in lines:
-            line_info = LineInfo()
-            line_info.text_org = line
-            line_info_list.append(line_info)
-
-        return line_info_list
-
-    def update_line_level(self) -> None:
-        """処理部のレベルをインデントに応じて決定する"""
-        for line_info in self.line_info_list:
-            line_info.level.value = LineLevel.get_line_level(line_info.text_org)
-
-    def update_line_type(self) -> None:
-        """処理部の種別を決定する"""
-        for line_info in self.line_info_list:
-            line_info.type, line_info.text_typeless = LineType.get_line_type(line_info.text_org)
-
-    def update_line_io(self) -> None:
-        """処理部の入出力情報を決定する"""
-        for line_info in self.line_info_list:
-            # \inと\outのパターンを抽出
-            in_matches = re.finditer(r"\\in\s+(\S+)", line_info.text_typeless)  # マッチした全ての文字列をリストに格納
-            out_matches = re.finditer(r"\\out\s+(\S+)", line_info.text_typeless)
+        return [DiagramParser.convert_lexed2lineinfo(line, LineLexer.lex(line)) for line in lines]
 
-            # データを対応するリストに格納
-            in_data = [DataInfo(name=match.group(1)) for match in in_matches]  # マッチオブジェクトの2番目の要素を順に取り出したリストを連結
-            out_data = [DataInfo(name=match.group(1)) for match in out_matches]
-
-            # \inと\out要素を取り除いた行を取得
-            cleaned_text = re.sub(r"\\(?:in\s|out\s)(?:(\S+))?", "", line_info.text_typeless).strip()
-
-            line_info.iodata = InOutData(in_data, out_data, line_info.level.value)
-            line_info.text_clean = cleaned_text
+    @staticmethod
+    def convert_lexed2lineinfo(
+        line: str,
+        lexed: LexedLine,
+        no: int = LineInfo.DEFAULT_VALUE,
+        before_no: int = LineInfo.DEFAULT_VALUE,
+        next_no: int = LineInfo.DEFAULT_VALUE,
+    ) -> LineInfo:
+        """1行分の字句解析結果を文字列情報に変換する
 
-    def __categorize_line_info_process(self) -> list[LineInfo]:
-        """処理のみのリスト生成
+        Args:
+            line (str): 元の文字列
+            lexed (LexedLine): 字句解析結果
+            no (int): 処理部もしくはデータ部での行番号
+            before_no (int): 同じレベルで1つ前の行番号
+            next_no (int): 同じレベルで1つ後の行番号
 
         Returns:
-            list[LineInfo]: 処理のみのリスト
+            LineInfo: 文字列情報
         """
-        process_line_info_list: list[LineInfo] = []
-        for line_info in self.line_info_list:
-            if line_info.type.type_value != LineTypeDefine.get_format_by_type(LineTypeEnum.DATA).type_value:
-                process_line_info_list.append(line_info)
-
-        return process_line_info_list
+        return LineInfo(
+            text_org=line,
+            level=LineLevel.of(lexed.level),
+            type=lexed.type,
+            text_typeless=lexed.text_typeless,
+            iodata=InOutData(
+                tuple([DataInfo(name) for name in lexed.in_names]),
+                tuple([DataInfo(name) for name in lexed.out_names]),
+                lexed.level,
+            ),
+            text_clean=lexed.text_clean,
+            no=no,
+            next_no=next_no,
+            before_no=before_no,
+        )
+
+    @classmethod
+    def create_process_indexes(cls, lexed_lines: list[tuple[str, LexedLine]]) -> list[int]:
+        """処理部の行の位置を取得する
 
-    def __categorize_line_info_data(self) -> list[LineInfo]:
-        """データのみのリスト生成
+        Args:
+            lexed_lines (list[tuple[str, LexedLine]]): 元の文字列と字句解析結果から成るタプルのリスト
 
         Returns:
-            list[LineInfo]: データのみのリスト
+            list[int]: 処理部の行の位置のリスト
         """
-        # データのみのリスト生成
-        data_line_info_list: list[LineInfo] = []
-        for line_info in self.line_info_list:
-            if line_info.type.type_value == LineTypeDefine.get_format_by_type(LineTypeEnum.DATA).type_value:
-                data_line_info_list.append(line_info)
+        return [index for index, (_, lexed) in enumerate(lexed_lines) if lexed.type.type_value != cls._DATA_TYPE_VALUE]
 
-        return data_line_info_list
+    @classmethod
+    def create_data_table(cls, lexed_lines: list[tuple[str, LexedLine]]) -> DataSymbolTable:
+        """データ部の行を、名前と行の位置でデータの表へ登録する
 
-    @staticmethod
-    def __assign_line_relationships(line_info_list: list[LineInfo]) -> None:
-        """各行のレベルに応じた前後関係を決定する
+        同じ名前のデータは最初の記載だけを対象とする
 
         Args:
-            line_info_list (list[LineInfo]): 処理部のリストもしくはデータ部のリスト
+            lexed_lines (list[tuple[str, LexedLine]]): 元の文字列と字句解析結果から成るタプルのリスト
+
+        Returns:
+            DataSymbolTable: データ部の行を登録したデータの表
         """
-        for count, line_info in enumerate(line_info_list):
-            line_info.no = count
-
-            # 同じレベルで1つ前の番号を見つける
-            for search_idx in range(count - 1, -1, -1):
-                search_line = line_info_list[search_idx]
-
-                if search_line.level.value == line_info.level.value:
-                    # 1つ前の番号を保持する
-                    line_info.before_no = search_line.no
-                    # 同時に次の番号として保存する
-                    search_line.next_no = line_info.no
-                    break
-                elif search_line.level.value < line_info.level.value:
-                    # 自身よりレベルが小さいなら階層が変わる
-                    break
+        data_table = DataSymbolTable()
+        for index, (_, lexed) in enumerate(lexed_lines):
+            if lexed.type.type_value == cls._DATA_TYPE_VALUE:
+                data_table.add(lexed.text_clean, index)
+        return data_table
 
     @staticmethod
-    def __remove_duplicate_from_list(original_list: list[LineInfo]) -> list[LineInfo]:
-        """リストから重複した要素を除外する
+    def __assign_line_relationships(levels: list[int]) -> list[tuple[int, int]]:
+        """各行のレベルに応じた前後関係を決定する
 
         Args:
-            original_list (list[LineInfo]): 除外前のリスト
+            levels (list[int]): 処理部もしくはデータ部の行ごとのレベル
 
         Returns:
-            list[LineInfo]: 除外後のリスト
+            list[tuple[int, int]]: 行ごとの、同じレベルで1つ前と1つ後の行番号から成るタプルのリスト
         """
-        removed_duplicate_list: list[LineInfo] = []
-        check_name_list: list[str] = []  # 重複チェックを効率化するための名前用リスト
-        for original in original_list:
-            # 未登録の名前だけを新規リストへ登録する
-            if original.text_clean not in check_name_list:
-                removed_duplicate_list.append(original)
-                check_name_list.append(original.text_clean)
-
-        return removed_duplicate_list
+        before_nos = [LineInfo.DEFAULT_VALUE] * len(levels)
+        next_nos = [LineInfo.DEFAULT_VALUE] * len(levels)
 
-    def create_process_info_list(self) -> list[LineInfo]:
-        """処理部の情報をリストにして返す
+        # 直前の行から遡って辿れる行を、レベルの昇順に積んでおく
+        # 自身よりレベルが大きい行は、以降の行から見ると階層が変わるので取り除く
+        level_stack: list[int] = []
+        for no, level in enumerate(levels):
+            while level_stack and levels[level_stack[-1]] > level:
+                level_stack.pop()
 
-        Returns:
-            list[LineInfo]:処理部の情報リスト
-        """
-        process_line_info_list = self.__categorize_line_info_process()
-        process_lines = process_line_info_list.copy()
-        self.__assign_line_relationships(process_lines)
-        return process_lines
+            # 同じレベルで1つ前の行が残っていれば前後関係とする
+            if level_stack and levels[level_stack[-1]] == level:
+                before_no = level_stack.pop()
+                # 1つ前の番号を保持する
+                before_nos[no] = before_no
+                # 同時に次の番号として保存する
+                next_nos[before_no] = no
 
-    def create_data_info_list(self) -> list[LineInfo]:
-        """データ部の情報をリストにして返す
+            level_stack.append(no)
 
-        Returns:
-            list[LineInfo]: データ部の情報リスト
-        """
-        data_line_info_list = self.__categorize_line_info_data()
-        data_lines = self.__remove_duplicate_from_list(data_line_info_list)
-        self.__assign_line_relationships(data_lines)
-        return data_lines
+        return list(zip(before_nos, next_nos, strict=True))
 
     @staticmethod
     def get_level_min(info_list: list[LineInfo]) -> int:
@@ -169,68 +192,47 @@ class DiagramParser:
             info_list (list[LineInfo]): 最小レベルを取得したいリスト
 
         Returns:
-            int: リスト内の最小レベル
+            int: リスト内の最小レベル。空のリストなら最小のレベルを返す
         """
-        level_min: int = LineLevel.LEVEL_MAX
-        for info in info_list:
-            level_min = min(level_min, info.level.value)
+        return min((info.level.value for info in info_list), default=LineLevel.LEVEL_MIN)
+
+    def __register_io_data(self, data_name: str) -> DataSymbol:
+        """in/outのデータ名に対応するデータ部の情報を取得する
 
-        return level_min
+        データ部に記載のないデータは、データ部の情報を作成して追加する
 
-    def __create_io_data_info_list(self) -> list[LineInfo]:
-        """処理部のin/outからdataの情報リストを作成する
+        Args:
+            data_name (str): データ名
 
         Returns:
-            list[LineInfo]: 作成したdataの情報リスト
+            DataSymbol: データ名に対応するデータ部の情報
         """
+        symbol = self.data_table.get(data_name)
+        if symbol is not None:
+            return symbol
+
+        # データ部に相当する情報を作成する
+        data_info = LineInfo(
+            text_org=data_name,
+            level=LineLevel.of(self.data_level_min),
+            type=LineTypeDefine.get_format_by_type(LineTypeEnum.DATA),
+            text_typeless=data_name,
+            text_clean=data_name,
+        )
+
+        self.data_line_info_list.append(data_info)
+        symbol = self.data_table.add(data_name)
+        symbol.line_info = data_info
+        return symbol
 
-        def create_data_info(data_name: str) -> LineInfo:
-            """データ名に基づいて、データ部に相当する情報を作成する
-
-            Args:
-                data_name (str): データ名
-
-            Returns:
-                LineInfo: 作成したdataの情報
-            """
-            data_info = LineInfo()
-            data_info.text_org = data_name
-            data_info.level.value = self.data_level_min
-            data_info.type = LineTypeDefine.get_format_by_type(LineTypeEnum.DATA)
-            data_info.text_typeless = data_name
-            data_info.text_clean = data_name
-            return data_info
+    def merge_iodata_dataline(self) -> None:
+        """処理部のみに記載されたin/outをdata部の情報として追加する
 
-        io_data_info_list: list[LineInfo] = []
+        併せて、データごとに参照する処理部を入力と出力に分けて保持する
+        """
         for process_line_info in self.process_line_info_list:
-            # \inを\data情報化
             for in_data in process_line_info.iodata.in_data_list:
-                io_data_info = create_data_info(in_data.name)
-                io_data_info_list.append(io_data_info)
+                self.__register_io_data(in_data.name).readers.append(process_line_info)
 
-            # \outを\data情報化
             for out_data in process_line_info.iodata.out_data_list:
-                io_data_info = create_data_info(out_data.name)
-                io_data_info_list.append(io_data_info)
-
-        return io_data_info_list
-
-    def __append_iodata_to_orgdata(self, io_data_list: list[LineInfo]) -> None:
-        """入出力データリストのデータをデータ部のリストへ追加する
-
-        Args:
-            io_data_list (list[LineInfo]): 入出力データのリスト
-        """
-        for io_data in io_data_list:
-            # データ部のリストからデータ部の名前だけのリストを用意する
-            # データ部のリストは都度更新する想定なので、名前だけリストも繰り返し文の中で都度生成する。
-            data_info_name_list = [data_info.text_clean for data_info in self.data_line_info_list]
-
-            # 名前だけリストに存在しないデータをデータ部のリストへ追加する
-            if io_data.text_clean not in data_info_name_list:
-                self.data_line_info_list.append(io_data)
-
-    def merge_iodata_dataline(self) -> None:
-        """処理部のみに記載されたin/outをdata部の情報として追加する"""
-        io_data_info_liset = self.__create_io_data_info_list()
-        self.__append_iodata_to_orgdata(io_data_info_liset)
+                self.__register_io_data(out_data.name).writers.append(process_line_info)
@@ -0,0 +1,70 @@
+import queue
+import threading
+from collections.abc import Iterable, Iterator
+from typing import TypeVar
+
+T = TypeVar("T")
+
+
+class _PipelineError:
+    """上流で発生した例外を下流へ受け渡すための入れ物"""
+
+    __slots__ = ("error",)
+
+    def __init__(self, error: BaseException) -> None:
+        self.error = error
+
+
+_END = object()
+
+
+def prefetch(iterable: Iterable[T], maxsize: int) -> Iterator[T]:
+    """上流の要素を別スレッドで先読みし、上限付きのキューを介して順に受け渡す
+
+    ファイルの読み込みなどの待ち時間を下流の処理と重ねる
+    キューが一杯になると上流は待つため、先読みした要素の数はmaxsizeを超えない
+    上流で発生した例外は、下流で要素を取り出した時点で送出する
+
+    Args:
+        iterable (Iterable[T]): 上流の要素
+        maxsize (int): 先読みする要素の最大数
+
+    Yields:
+        T: 上流の要素
+    """
+    items: queue.Queue[object] = queue.Queue(maxsize)
+    stop = threading.Event()
+
+    def put(item: object) -> bool:
+        # 下流が途中で止めた場合に待ち続けないよう、定期的に確認する
+        while not stop.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce() -> None:
+        try:
+            for item in iterable:
+                if not put(item):
+                    return
+        except BaseException as e:
+            put(_PipelineError(e))
+            return
+        put(_END)
+
+    thread = threading.Thread(target=produce, daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = items.get()
+            if item is _END:
+                return
+            if isinstance(item, _PipelineError):
+                raise item.error
+            yield item  # type: ignore[misc]
+    finally:
+        stop.set()
+        thread.join()
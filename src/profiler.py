@@ -0,0 +1,264 @@
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from typing import Any, NamedTuple
+
+# 子の区間へ引き継ぐ引数
+INHERITED_ARGS = ("file", "module")
+
+
+class TraceEvent(NamedTuple):
+    """計測した1区間
+
+    Attributes:
+        name(str): 区間の名前
+        start(float): 開始時刻(秒)
+        duration(float): 所要時間(秒)
+        process_id(int): 計測したプロセスのID
+        thread_id(int): 計測したスレッドのID
+        args(dict[str, Any]): ファイル名・モジュール名・カウンタなどの付加情報
+    """
+
+    name: str
+    start: float
+    duration: float
+    process_id: int
+    thread_id: int
+    args: dict[str, Any]
+
+
+class _Span:
+    """計測中の区間"""
+
+    __slots__ = ("profiler", "name", "args", "start")
+
+    def __init__(self, profiler: "Profiler", name: str, args: dict[str, Any]) -> None:
+        self.profiler = profiler
+        self.name = name
+        self.args = args
+        self.start = 0.0
+
+    def __enter__(self) -> "_Span":
+        stack = self.profiler._get_stack()
+        if stack:
+            # 親の区間のファイル名・モジュール名を引き継ぐ
+            parent_args = stack[-1].args
+            for key in INHERITED_ARGS:
+                if key in parent_args:
+                    self.args.setdefault(key, parent_args[key])
+        stack.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        duration = time.perf_counter() - self.start
+        self.profiler._get_stack().pop()
+        self.profiler.events.append(TraceEvent(self.name, self.start, duration, os.getpid(), threading.get_ident(), self.args))
+
+
+class _NullSpan:
+    """計測しない場合の区間"""
+
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        pass
+
+
+class NullProfiler:
+    """計測を行わないプロファイラ
+
+    無効時の負荷を抑えるため、区間は共有のインスタンスを返すだけとする
+    """
+
+    enabled = False
+    _NULL_SPAN = _NullSpan()
+
+    def span(self, name: str, **args: Any) -> _NullSpan:
+        return self._NULL_SPAN
+
+    def add_counters(self, **counters: int) -> None:
+        pass
+
+    def record(self, name: str, start: float, duration: float, pid: int | None = None, tid: int | None = None, **args: Any) -> None:
+        pass
+
+
+class Profiler:
+    """処理の段階ごとの所要時間とカウンタを記録する"""
+
+    enabled = True
+
+    def __init__(self) -> None:
+        self.events: list[TraceEvent] = []
+        self._local = threading.local()
+
+    def _get_stack(self) -> list[_Span]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = []
+            self._local.stack = stack
+        return stack
+
+    def span(self, name: str, **args: Any) -> _Span:
+        """区間の計測を開始する
+
+        with文で用いる。区間内で開始した区間は、ファイル名とモジュール名を引き継ぐ
+
+        Args:
+            name (str): 区間の名前
+            **args: ファイル名(file)・モジュール名(module)などの付加情報
+
+        Returns:
+            _Span: 計測中の区間
+        """
+        return _Span(self, name, args)
+
+    def add_counters(self, **counters: int) -> None:
+        """計測中の区間へカウンタを加算する
+
+        Args:
+            **counters: カウンタ名と加算する値
+        """
+        stack = self._get_stack()
+        if not stack:
+            return
+
+        args = stack[-1].args
+        for key, value in counters.items():
+            args[key] = args.get(key, 0) + value
+
+    def record(self, name: str, start: float, duration: float, pid: int | None = None, tid: int | None = None, **args: Any) -> None:
+        """別のプロセスなどで計測した区間を記録する
+
+        Args:
+            name (str): 区間の名前
+            start (float): 開始時刻(time.perf_counterの値)
+            duration (float): 所要時間(秒)
+            pid (int | None): 計測したプロセスのID。Noneなら記録するプロセス
+            tid (int | None): 計測したスレッドのID。Noneなら記録するスレッド
+            **args: ファイル名(file)・モジュール名(module)などの付加情報
+        """
+        process_id = pid if pid is not None else os.getpid()
+        thread_id = tid if tid is not None else threading.get_ident()
+        self.events.append(TraceEvent(name, start, duration, process_id, thread_id, args))
+
+    def get_totals(self, name: str, keys: tuple[str, ...]) -> list[tuple[tuple[Any, ...], float]]:
+        """指定した区間の所要時間を引数ごとに集計する
+
+        Args:
+            name (str): 集計する区間の名前
+            keys (tuple[str, ...]): 集計のキーとする引数名
+
+        Returns:
+            list[tuple[tuple[Any, ...], float]]: キーと所要時間の合計を、所要時間の降順に並べたリスト
+        """
+        totals: dict[tuple[Any, ...], float] = defaultdict(float)
+        for event in self.events:
+            if event.name == name:
+                totals[tuple(event.args.get(key) for key in keys)] += event.duration
+        return sorted(totals.items(), key=lambda item: item[1], reverse=True)
+
+    def summarize(self, top: int) -> str:
+        """計測結果の要約を作成する
+
+        Args:
+            top (int): 表示するファイル・モジュールの数
+
+        Returns:
+            str: 段階ごとの合計と、時間のかかったファイル・モジュールの一覧
+        """
+        lines = ["[段階ごとの合計]"]
+        for (name,), total in self.get_totals_by_name():
+            lines.append(f"{total * 1000:10.1f} ms  {name}")
+
+        lines.append(f"[時間のかかったファイル 上位{top}件]")
+        for (file_name,), total in self.get_totals("file", ("file",))[:top]:
+            lines.append(f"{total * 1000:10.1f} ms  {file_name}")
+
+        lines.append(f"[時間のかかったモジュール 上位{top}件]")
+        counters = self.get_module_counters()
+        for (file_name, module_name), total in self.get_totals("module", ("file", "module"))[:top]:
+            counter_text = " ".join(f"{key}={value}" for key, value in counters.get((file_name, module_name), {}).items())
+            lines.append(f"{total * 1000:10.1f} ms  {file_name} : {module_name}  {counter_text}")
+
+        return "\n".join(lines)
+
+    def get_totals_by_name(self) -> list[tuple[tuple[str], float]]:
+        """区間の名前ごとに所要時間を集計する
+
+        Returns:
+            list[tuple[tuple[str], float]]: 区間の名前と所要時間の合計を、所要時間の降順に並べたリスト
+        """
+        totals: dict[tuple[str], float] = defaultdict(float)
+        for event in self.events:
+            totals[(event.name,)] += event.duration
+        return sorted(totals.items(), key=lambda item: item[1], reverse=True)
+
+    def get_module_counters(self) -> dict[tuple[Any, Any], dict[str, int]]:
+        """モジュールごとにカウンタを集計する
+
+        Returns:
+            dict[tuple[Any, Any], dict[str, int]]: (ファイル名, モジュール名)ごとのカウンタ
+        """
+        counters: dict[tuple[Any, Any], dict[str, int]] = defaultdict(dict)
+        for event in self.events:
+            if "module" not in event.args:
+                continue
+            module_counters = counters[(event.args.get("file"), event.args["module"])]
+            for key, value in event.args.items():
+                if key not in INHERITED_ARGS and isinstance(value, int):
+                    module_counters[key] = max(module_counters.get(key, 0), value)
+        return counters
+
+    def write_trace(self, path: str) -> None:
+        """Chromeのトレースイベント形式で計測結果を保存する
+
+        chrome://tracing や Perfetto で時系列として表示できる
+        区間は計測したプロセス・スレッドごとに分けて表示する
+
+        Args:
+            path (str): 保存先のファイルパス
+        """
+        trace_events = [
+            {
+                "name": event.name,
+                "cat": "ihcp",
+                "ph": "X",
+                "ts": event.start * 1_000_000,
+                "dur": event.duration * 1_000_000,
+                "pid": event.process_id,
+                "tid": event.thread_id,
+                "args": event.args,
+            }
+            for event in self.events
+        ]
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": trace_events, "displayTimeUnit": "ms"}, f, ensure_ascii=False)
+
+
+_active_profiler: Profiler | NullProfiler = NullProfiler()
+
+
+def get_profiler() -> Profiler | NullProfiler:
+    """有効なプロファイラを取得する
+
+    Returns:
+        Profiler | NullProfiler: 計測中ならProfiler、そうでなければNullProfiler
+    """
+    return _active_profiler
+
+
+def set_profiler(profiler: Profiler | NullProfiler) -> None:
+    """有効なプロファイラを設定する
+
+    Args:
+        profiler (Profiler | NullProfiler): 以降の計測に用いるプロファイラ
+    """
+    global _active_profiler
+    _active_profiler = profiler
@@ -1,361 +1,278 @@
-from define import Coordinate, DataInfo, DiagramElement, Line, LineInfo, ParseInfo, ParseInfo4Render, Process2Data
-from draw_svg import DrawFigure, DrawSvg
+from typing import IO
+
+from define import LineInfo, ParseInfo4Render, RenderOption
+from draw_svg import DrawFigure, DrawSvg, DrawSvgSymbol, LinePathBatch
+from layout import ConnectorColumns, DiagramLayout, ElementColumns, LayoutTable, TrunkColumns
 from line_level import LineLevel
 from line_type import LineTypeDefine, LineTypeEnum
+from profiler import get_profiler
+from svg_writer import SvgSink, SvgStreamSink
+from text_metrics import get_text_metrics
 
 
 class SVGRenderer:
-    LINE_OFFSET = 10
-    IMG_MARGIN = 30
-    color_table = [
-        "black",
-        "red",
-        "green",
-        "blue",
-        "yellow",
-        "purple",
-        "orange",
-        "turquoise",
-    ]
-
-    def __init__(self, name: str, prase_info_4_render: ParseInfo4Render) -> None:
-        # ヘッダは最後に挿入する
-        # svg = ['<svg xmlns="http://www.w3.org/2000/svg" width="800" height="600" style="background-color: #AFC0B1">']
-        self.svg: list[str] = []
-
-        self.draw_svg = DrawSvg()
+    LINE_OFFSET = DiagramLayout.LINE_OFFSET
+    IMG_MARGIN = DiagramLayout.IMG_MARGIN
+    COLOR_TABLE = DiagramLayout.COLOR_TABLE
+
+    BG_COLOR = "808d81"
+
+    def __init__(self, name: str, prase_info_4_render: ParseInfo4Render, option: RenderOption = RenderOption()) -> None:
+        """
+        初期化メソッド
+
+        Args:
+            name: モジュール名
+            prase_info_4_render: 描画用のパース結果
+            option: 描画方法の指定
+        """
+        # ヘッダは画像サイズが決まってから付与する
+        self.svg: SvgSink = []
+
+        self.option = option
+        text_metrics = get_text_metrics(option.font_path)
+        self.draw_svg = DrawSvgSymbol(text_metrics) if option.use_symbols else DrawSvg(text_metrics)
         self.draw_fig = DrawFigure(self.draw_svg)
+        self.layout_engine = DiagramLayout(text_metrics)
 
         self.name: str = name
-        self.process_parse_info = prase_info_4_render.process_parse_info
-        self.data_parse_info = prase_info_4_render.data_parse_info
+        self.parse_info_4_render = prase_info_4_render
+
+    def create_layout(self) -> LayoutTable:
+        """パースされた要素の配置を求める
 
-        self.process_elements: list[DiagramElement] = []
-        self.data_elements: list[DiagramElement] = []
+        Returns:
+            LayoutTable: 配置結果
+        """
+        return self.layout_engine.compute(self.name, self.parse_info_4_render)
 
     def render(self) -> str:
         """パースされた要素をSVGとして描画"""
-        start_x = 0
-        start_y = 30
+        svg: list[str] = []
+        self.svg = svg
+        with get_profiler().span("render", module=self.name):
+            layout = self.create_layout()
+            self.draw_elements(layout)
+            self.add_profile_counters(layout)
+            return self.finish_svg(svg, layout.width, layout.height)
 
-        # タイトル部を描画
-        title_height, title_width = self.set_title(start_x, start_y)
+    def write(self, stream: IO[str] | IO[bytes], bg_color: str = BG_COLOR) -> None:
+        """パースされた要素をSVGとして描画しながらストリームへ書き出す
 
-        # 処理部を描画
-        self.process_elements = self.set_elements(start_x, title_height, self.process_parse_info)
-        process_height, process_width = self.render_process()
+        画像サイズは配置を求めた時点で決まるため、SVG全体をメモリ上に保持しない
 
-        # 処理部からの水平線を描画
-        exit_width = self.render_line_exit_from_process(process_width)
-
-        # データ部を描画
-        self.data_elements = self.set_elements(exit_width, title_height, self.data_parse_info)
-        data_height, data_width = self.render_data()
-
-        # データ部への水平線を描画
-        self.render_line_enter_to_data()
+        Args:
+            stream (IO[str] | IO[bytes]): 書き出し先のテキストもしくはバイナリストリーム
+            bg_color (str): 画像の背景色
+        """
+        profiler = get_profiler()
+
+        # 文字列として描画する場合と同じく、全体をrenderの区間として計測する
+        with profiler.span("render", module=self.name):
+            with profiler.span("layout", module=self.name):
+                layout = self.create_layout()
+                self.add_profile_counters(layout)
+
+            # ヘッダに続けて要素を書き出す
+            with profiler.span("emit", module=self.name):
+                self.svg = SvgStreamSink(stream)
+                for header in self.create_svg_header(layout.width, layout.height, bg_color):
+                    self.svg.append(header)
+                for definition in self.draw_svg.create_defs():
+                    self.svg.append(definition)
+                self.draw_elements(layout)
+                for definition in self.draw_svg.create_glyph_defs():
+                    self.svg.append(definition)
+                self.svg.append("</svg>")
 
-        # 処理部とデータ部を結ぶ
-        self.connect_process2data()
+    @staticmethod
+    def add_profile_counters(layout: LayoutTable) -> None:
+        """描画した要素数と接続線の数を計測中の区間へ記録する
 
-        # 描画終了
-        total_width = max(title_width, process_width, data_width)
-        total_height = max(title_height, process_height, data_height)
-        return self.finish_svg(total_width, total_height)
+        Args:
+            layout (LayoutTable): 描画した配置結果
+        """
+        profiler = get_profiler()
+        if profiler.enabled:
+            profiler.add_counters(
+                elements=len(layout.process.line_info_list) + len(layout.data.line_info_list),
+                connectors=len(layout.connectors.process_no),
+                trunks=len(layout.trunks.lane),
+            )
 
-    def set_title(self, start_x: int, start_y: int) -> tuple[int, int]:
-        """タイトル部を描画する
+    def draw_elements(self, layout: LayoutTable) -> None:
+        """配置結果に従って要素を描画する
 
         Args:
-            start_x (int): 描画開始位置(X座標)
-            start_y (int): 描画開始位置(Y座標)
-
-        Returns:
-            tuple[int, int]: 描画後のサイズ(高さ, 幅)
+            layout (LayoutTable): 配置結果
         """
-        end_x = self.draw_svg.draw_string(self.svg, start_x, start_y, "モジュール名: " + self.name, font_size=150)
-        end_y = start_y + DiagramElement.LEVEL_SHIFT
+        # 線分は描画の最後に色ごとにまとめて描画する
+        self.draw_svg.line_batch = LinePathBatch() if self.option.batch_lines else None
 
-        # マージンを設けておく
-        end_x += SVGRenderer.IMG_MARGIN
-        end_y += SVGRenderer.IMG_MARGIN
-        return end_y, end_x
+        # タイトル部を描画
+        self.draw_svg.draw_string(
+            self.svg, DiagramLayout.TITLE_X, DiagramLayout.TITLE_Y, DiagramLayout.TITLE_PREFIX + self.name, DiagramLayout.TITLE_FONT_SIZE
+        )
 
-    @staticmethod
-    def set_elements(start_x: int, start_y: int, parse_info: ParseInfo) -> list[DiagramElement]:
-        """各要素の配置を計算して保持する
+        # 処理部を描画
+        self.render_process(layout.process)
 
-        Args:
-            start_x (int): 描画開始位置(X座標)
-            start_y (int): 描画開始位置(Y座標)
-            line_info_list (list[LineInfo]): 配置情報を更新したいリスト
+        # 処理部からの水平線を描画
+        self.render_line_exit_from_process(layout.connectors)
 
-        Returns:
-            list[DiagramElement]: 配置情報を更新したリスト
-        """
-        element_list: list[DiagramElement] = []
-        for line_info in parse_info.line_info_list:
-            element = DiagramElement(line_info)
-            element.x = start_x + (element.line_info.level.value - parse_info.level_min + 1) * DiagramElement.LEVEL_SHIFT
-            element.y = start_y + len(element_list) * DiagramElement.LEVEL_SHIFT
-            element_list.append(element)
+        # データ部を描画
+        self.render_data(layout.data)
 
-        return element_list
+        # データ部への水平線を描画
+        self.render_line_enter_to_data(layout.data, layout.connectors, layout.trunks)
+
+        # 処理部とデータ部を結ぶ
+        self.connect_process2data(layout.trunks)
 
-    def render_process(self) -> tuple[int, int]:
+        if self.draw_svg.line_batch is not None:
+            self.draw_svg.line_batch.flush(self.svg)
+
+    def render_process(self, process: ElementColumns) -> None:
         """処理部を描画する
 
-        Returns:
-            tuple[int, int]: 処理部を描画した状態の画像サイズ(高さ, 幅)
+        Args:
+            process (ElementColumns): 処理部の配置
         """
-        process_height = 0
-        process_width = 0
-        for element in self.process_elements:
+        for line_info, x, y in zip(process.line_info_list, process.x, process.y, strict=True):
             # 種別に応じた図形とテキストを描画
-            element.end_x = self.draw_fig.draw_figure_method(self.svg, element)
+            self.draw_fig.draw_figure(self.svg, line_info, x, y)
 
             # ステップ間の垂直線の追加
-            if element.line_info.before_no != LineInfo.DEFAULT_VALUE:
-                bef_elem = self.process_elements[element.line_info.before_no]
+            if line_info.before_no != LineInfo.DEFAULT_VALUE:
+                bef_y = process.y[line_info.before_no]
                 # 直前のレベルまで線を引く
-                self.draw_svg.draw_line_v(
-                    self.svg,
-                    element.x,
-                    (bef_elem.y + DrawSvg.CIRCLE_R),
-                    (element.y - DrawSvg.CIRCLE_R) - (bef_elem.y + DrawSvg.CIRCLE_R),
-                )
+                self.draw_svg.draw_line_v(self.svg, x, (bef_y + DrawSvg.CIRCLE_R), (y - DrawSvg.CIRCLE_R) - (bef_y + DrawSvg.CIRCLE_R))
 
             # 始点の追加
-            if (element.line_info.before_no == LineInfo.DEFAULT_VALUE) and (
-                (element.line_info.level.value - self.process_parse_info.level_min) == LineLevel.LEVEL_MIN
-            ):
-                self.draw_svg.draw_figure_level_start(self.svg, element.x, element.y)
+            if (line_info.before_no == LineInfo.DEFAULT_VALUE) and ((line_info.level.value - process.level_min) == LineLevel.LEVEL_MIN):
+                self.draw_svg.draw_figure_level_start(self.svg, x, y)
 
             # 終点の追加
-            if element.line_info.next_no == LineInfo.DEFAULT_VALUE:
-                if element.line_info.type.type_value == LineTypeDefine.get_format_by_type(LineTypeEnum.RETURN).type_value:
+            if line_info.next_no == LineInfo.DEFAULT_VALUE:
+                if line_info.type.type_value == LineTypeDefine.get_format_by_type(LineTypeEnum.RETURN).type_value:
                     # \returnは図として終点を描画する
                     pass
                 else:
-                    self.draw_svg.draw_figure_level_end(self.svg, element.x, element.y)
+                    self.draw_svg.draw_figure_level_end(self.svg, x, y)
 
             # レベル下げの追加
-            if ((element.line_info.level.value - self.process_parse_info.level_min) > LineLevel.LEVEL_MIN) and (
-                element.line_info.before_no == LineInfo.DEFAULT_VALUE
-            ):
-                self.draw_svg.draw_figure_level_step(self.svg, element.x, element.y)
-
-            # 処理部の高さと幅を更新する
-            process_height = max(process_height, element.y)
-            process_width = max(process_width, element.end_x)
+            if ((line_info.level.value - process.level_min) > LineLevel.LEVEL_MIN) and (line_info.before_no == LineInfo.DEFAULT_VALUE):
+                self.draw_svg.draw_figure_level_step(self.svg, x, y)
 
-        return process_height, process_width
-
-    def render_line_exit_from_process(self, process_end_x: int) -> int:
+    def render_line_exit_from_process(self, connectors: ConnectorColumns) -> None:
         """処理部に対する入出力線を描画する
 
         Args:
-            process_end_x (int): 入出力線の描画開始位置(X座標)
-
-        Returns:
-            int: 処理部の入出力線を描画した状態の画像幅
+            connectors (ConnectorColumns): 接続線の配置
         """
-        offset = 0
-        exit_width = 0
-        color_cnt = 0
-
-        def process_io_line(element: DiagramElement, data_list: list[DataInfo], io: bool) -> None:
-            """種別(入力・出力)に応じた線の描画
-
-            Args:
-                element (DiagramElement): 線を描画したい処理部
-                data_list (list[DataInfo]): 描画したい種別のリスト
-                io (bool): 種別の指定(入力: true, 出力: false)
-            """
-            nonlocal offset, exit_width, color_cnt
-
-            for data in data_list:
-                # 種別に応じた情報の更新
-                if io is True:
-                    y_offset = -5
-                    draw_method = self.draw_svg.draw_arrow_l
-                else:
-                    y_offset = 5
-                    draw_method = self.draw_svg.draw_line_h
-
-                # 水平線の始点と終点を決定
-                line = Line()
-                line.start = Coordinate(element.end_x, element.y + y_offset)
-                line.end = Coordinate(process_end_x + SVGRenderer.IMG_MARGIN + offset, element.y + y_offset)
-
-                # 水平線を保持
-                connect_line = Process2Data()
-                connect_line.exit_from_process = line
-                data.connect_line = connect_line
-
-                # 線の色を保持
-                data.connect_line.color = self.color_table[color_cnt]
-                color_cnt = (color_cnt + 1) % len(self.color_table)
-
-                # 線を描画
-                draw_method(
-                    self.svg,
-                    data.connect_line.exit_from_process.start.x,
-                    data.connect_line.exit_from_process.start.y,
-                    data.connect_line.exit_from_process.line_width(),
-                    data.connect_line.color,
-                )
-
-                # 描画情報を更新
-                offset += self.LINE_OFFSET
-                exit_width = max(exit_width, line.end.x)
-
-        for process_element in self.process_elements:
-            # 入出力がなければ何もしない
-            if (process_element.line_info.iodata.in_data_list is None) or (
-                (len(process_element.line_info.iodata.in_data_list) == 0) and (len(process_element.line_info.iodata.out_data_list) == 0)
-            ):
-                continue
-
+        for index in range(len(connectors.process_no)):
             # 関数への入出力は接続線で表現しない
-            if (process_element.line_info.level.value - self.process_parse_info.level_min) == LineLevel.LEVEL_MIN:
+            if connectors.function[index]:
                 continue
 
-            process_io_line(process_element, process_element.line_info.iodata.in_data_list, io=True)
-            process_io_line(process_element, process_element.line_info.iodata.out_data_list, io=False)
-
-        return exit_width
-
-    def render_data(self) -> tuple[int, int]:
+            # 種別(入力・出力)に応じた線の描画
+            draw_method = self.draw_svg.draw_arrow_l if connectors.io[index] else self.draw_svg.draw_line_h
+            draw_method(
+                self.svg,
+                connectors.exit_x1[index],
+                connectors.exit_y[index],
+                abs(connectors.exit_x2[index] - connectors.exit_x1[index]),
+                self.COLOR_TABLE[connectors.color[index]],
+            )
+
+    def render_data(self, data: ElementColumns) -> None:
         """データ部を描画する
 
-        Returns:
-            tuple[int, int]: データ部を描画した状態の画像サイズ(高さ, 幅)
+        Args:
+            data (ElementColumns): データ部の配置
         """
-        data_height = 0
-        data_width = 0
-        for data_element in self.data_elements:
+        for line_info, x, y in zip(data.line_info_list, data.x, data.y, strict=True):
             # 種別に応じた図形とテキストを描画
-            end_x = self.draw_fig.draw_figure_method(self.svg, data_element)
+            self.draw_fig.draw_figure(self.svg, line_info, x, y)
 
             # ステップ間の垂直線の追加
-            if (data_element.line_info.level.value - self.data_parse_info.level_min) > LineLevel.LEVEL_MIN:
-                if data_element.line_info.before_no != LineInfo.DEFAULT_VALUE:
-                    bef_elem = self.process_elements[data_element.line_info.before_no]
+            if (line_info.level.value - data.level_min) > LineLevel.LEVEL_MIN:
+                if line_info.before_no != LineInfo.DEFAULT_VALUE:
+                    bef_y = data.y[line_info.before_no]
                     # 直前のレベルまで線を引く
-                    self.draw_svg.draw_line_v(
-                        self.svg,
-                        data_element.x,
-                        (bef_elem.y + DrawSvg.CIRCLE_R),
-                        (data_element.y - DrawSvg.CIRCLE_R) - (bef_elem.y + DrawSvg.CIRCLE_R),
-                    )
+                    self.draw_svg.draw_line_v(self.svg, x, (bef_y + DrawSvg.CIRCLE_R), (y - DrawSvg.CIRCLE_R) - (bef_y + DrawSvg.CIRCLE_R))
 
             # レベル下げの追加
-            if ((data_element.line_info.level.value - self.data_parse_info.level_min) > LineLevel.LEVEL_MIN) and (
-                data_element.line_info.before_no == LineInfo.DEFAULT_VALUE
-            ):
-                self.draw_svg.draw_figure_level_step(self.svg, data_element.x, data_element.y)
-
-            # データ部の高さと幅を更新する
-            data_height = max(data_height, data_element.y)
-            data_width = max(data_width, end_x)
-
-        # マージンを設ける
-        return data_height, data_width
-
-    def render_line_enter_to_data(self) -> None:
-        """データ部に対する入出力線を描画する"""
-
-        def data_io_line(data_elem: DiagramElement, process_info: LineInfo, data_list: list[DataInfo], io: bool) -> None:
-            """種別(入力・出力)に応じた線の描画
-
-            Args:
-                data_elem (DiagramElement): 線を描画したいデータ部
-                process_info (LineInfo): 処理部の情報
-                data_list (list[DataInfo]): 描画したい種別のリスト
-                io (bool): 種別の指定(入力: true, 出力: false)
-            """
-            for data in data_list:
-                # 種別に応じた情報の更新
-                if io is True:
-                    y_offset = +5
-                    draw_line_method = self.draw_svg.draw_line_h
-                    draw_dataio_method = self.draw_svg.draw_figure_data_func_in
-                else:
-                    y_offset = -5
-                    draw_line_method = self.draw_svg.draw_arrow_r
-                    draw_dataio_method = self.draw_svg.draw_figure_data_func_out
+            if ((line_info.level.value - data.level_min) > LineLevel.LEVEL_MIN) and (line_info.before_no == LineInfo.DEFAULT_VALUE):
+                self.draw_svg.draw_figure_level_step(self.svg, x, y)
 
-                # 同じデータ名をつなぐ
-                if data_elem.line_info.text_clean != data.name:
-                    continue
+    def render_line_enter_to_data(self, data: ElementColumns, connectors: ConnectorColumns, trunks: TrunkColumns) -> None:
+        """データ部に対する入出力線を描画する
 
-                if (process_info.level.value - self.process_parse_info.level_min) == LineLevel.LEVEL_MIN:
-                    # 関数への入出力は接続線で表現しない
-                    draw_dataio_method(self.svg, data_elem.x, data_elem.y)
-                else:
-                    # 水平線の始点と終点を決定
-                    line = Line()
-                    line.start = Coordinate(data.connect_line.exit_from_process.end.x, data_elem.y + y_offset)
-                    line.end = Coordinate(data_elem.x - DrawSvg.CIRCLE_R, data_elem.y + y_offset)
-                    data.connect_line.enter_to_data = line
-
-                    # 線を描画
-                    draw_line_method(
-                        self.svg,
-                        data.connect_line.enter_to_data.start.x,
-                        data.connect_line.enter_to_data.start.y,
-                        data.connect_line.enter_to_data.line_width(),
-                        data.connect_line.color,
-                    )
-
-        for data_element in self.data_elements:
-            # 処理部へ存在する入出力を基準に描画する
-            for process_element in self.process_elements:
-                data_io_line(data_element, process_element.line_info, process_element.line_info.iodata.in_data_list, io=True)
-                data_io_line(data_element, process_element.line_info, process_element.line_info.iodata.out_data_list, io=False)
-
-    def connect_process2data(self) -> None:
-        """処理部とデータ部の入出力線を結ぶ"""
-
-        def process2data(data_list: list[DataInfo]) -> None:
-            """_summary_
-
-            Args:
-                data_list (list[DataInfo]): _description_
-            """
-            for data in data_list:
-                # 画像の上部から下部に向かって描画するように更新
-                start_y = min(data.connect_line.enter_to_data.start.y, data.connect_line.exit_from_process.end.y)
-                end_y = max(data.connect_line.enter_to_data.start.y, data.connect_line.exit_from_process.end.y)
-
-                # 垂直線の始点と終点を決定
-                line = Line()
-                line.start = Coordinate(data.connect_line.enter_to_data.start.x, start_y)
-                line.end = Coordinate(data.connect_line.enter_to_data.start.x, end_y)
-                data.connect_line.between_process_data = line
-
-                # 線を描画
-                self.draw_svg.draw_line_v(
-                    self.svg,
-                    data.connect_line.between_process_data.start.x,
-                    data.connect_line.between_process_data.start.y,
-                    data.connect_line.between_process_data.line_height(),
-                    data.connect_line.color,
-                )
-
-        for process_element in self.process_elements:
+        関数への入出力はデータ部の順に図形で描画し、幹からデータ部への水平線は幹ごとに1本だけ描画する
+
+        Args:
+            data (ElementColumns): データ部の配置
+            connectors (ConnectorColumns): 接続線の配置
+            trunks (TrunkColumns): 接続線をまとめた幹の配置
+        """
+        function_indexes = (index for index, no in enumerate(connectors.data_no) if no >= 0 and connectors.function[index])
+        for index in sorted(function_indexes, key=connectors.data_no.__getitem__):
+            no = connectors.data_no[index]
             # 関数への入出力は接続線で表現しない
-            if (process_element.line_info.level.value - self.process_parse_info.level_min) == LineLevel.LEVEL_MIN:
+            draw_dataio_method = self.draw_svg.draw_figure_data_func_in if connectors.io[index] else self.draw_svg.draw_figure_data_func_out
+            draw_dataio_method(self.svg, data.x[no], data.y[no])
+
+        for trunk_no in sorted((trunk_no for trunk_no, no in enumerate(trunks.data_no) if no >= 0), key=trunks.data_no.__getitem__):
+            # 種別(入力・出力)に応じた線の描画
+            draw_line_method = self.draw_svg.draw_line_h if trunks.io[trunk_no] else self.draw_svg.draw_arrow_r
+            draw_line_method(
+                self.svg,
+                trunks.x[trunk_no],
+                trunks.enter_y[trunk_no],
+                abs(trunks.enter_x2[trunk_no] - trunks.x[trunk_no]),
+                self.COLOR_TABLE[trunks.color[trunk_no]],
+            )
+
+    def connect_process2data(self, trunks: TrunkColumns) -> None:
+        """処理部とデータ部の入出力線を幹の垂直線で結ぶ
+
+        Args:
+            trunks (TrunkColumns): 接続線をまとめた幹の配置
+        """
+        for trunk_no in range(len(trunks.lane)):
+            # 参照先のデータがない幹は結ばない
+            if trunks.data_no[trunk_no] < 0:
                 continue
 
-            process2data(process_element.line_info.iodata.in_data_list)
-            process2data(process_element.line_info.iodata.out_data_list)
+            # 画像の上部から下部に向かって描画する
+            start_y = trunks.top_y[trunk_no]
+            self.draw_svg.draw_line_v(
+                self.svg, trunks.x[trunk_no], start_y, trunks.bottom_y[trunk_no] - start_y, self.COLOR_TABLE[trunks.color[trunk_no]]
+            )
+
+    @staticmethod
+    def create_svg_header(width: int, height: int, bg_color: str = BG_COLOR) -> list[str]:
+        """SVGのヘッダを生成する
+
+        Args:
+            width (int): 画像全体の幅
+            height (int): 画像全体の高さ
+            bg_color (str): 画像の背景色
+
+        Returns:
+            list[str]: ヘッダを構成する文字列リスト
+        """
+        return [
+            f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height + 50}" style="background-color: #{bg_color}">',
+            f'<rect x="0" y="0" width="{width}" height="{height + 50}" fill="#{bg_color}" stroke="#{bg_color}"/>',
+        ]
 
-    def finish_svg(self, width: int, height: int, bg_color: str = "808d81") -> str:
+    def finish_svg(self, svg: list[str], width: int, height: int, bg_color: str = BG_COLOR) -> str:
         """SVGの描画を終える
 
         Args:
+            svg (list[str]): 描画した要素の文字列リスト
             width (int): 画像全体の幅
             height (int): 画像全体の高さ
             bg_color (str): 画像の背景色
@@ -363,7 +280,4 @@ class SVGRenderer:
         Returns:
             str: SVGを構成する文字列リストを連結した文字列
         """
-        self.svg.insert(0, f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height + 50}" style="background-color: #{bg_color}">')
-        self.svg.insert(1, f'<rect x="0" y="0" width="{width}" height="{height + 50}" fill="#{bg_color}" stroke="#{bg_color}"/>')
-        self.svg.append("</svg>")
-        return "\n".join(self.svg)
+        return "\n".join([*self.create_svg_header(width, height, bg_color), *self.draw_svg.create_defs(), *svg, *self.draw_svg.create_glyph_defs(), "</svg>"])
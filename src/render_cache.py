@@ -0,0 +1,311 @@
+import functools
+import glob
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import NamedTuple
+
+from define import RenderOption
+
+
+class CacheInfo(NamedTuple):
+    """キャッシュの統計
+
+    Attributes:
+        hits(int): キャッシュから返した回数
+        misses(int): キャッシュになく描画した回数
+        maxsize(int): 上限。メモリ上のキャッシュはモジュール数、ディスク上のキャッシュはバイト数
+        currsize(int): 現在の量。単位はmaxsizeと同じ
+    """
+
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+def get_section_digest(section_name: str, section_lines: list[str], option: RenderOption) -> str:
+    """モジュールのセクションと描画方法の指定からハッシュ値を求める
+
+    Args:
+        section_name (str): モジュール名
+        section_lines (list[str]): セクション行のリスト
+        option (RenderOption): 描画方法の指定
+
+    Returns:
+        str: ハッシュ値の16進文字列
+    """
+    hasher = hashlib.blake2b(digest_size=20)
+    # モジュール名は画像のタイトルとして描画されるため、キーに含める
+    hasher.update(repr((section_name, tuple(option))).encode("utf-8"))
+    for line in section_lines:
+        hasher.update(b"\n")
+        hasher.update(line.encode("utf-8"))
+    return hasher.hexdigest()
+
+
+class RenderCache:
+    """描画済みのSVGをハッシュ値ごとに保持する上限付きのキャッシュ
+
+    上限を超えた場合は最も長く参照されていないモジュールから破棄する
+    """
+
+    MAX_SIZE = 256
+
+    def __init__(self, maxsize: int = MAX_SIZE) -> None:
+        """
+        初期化メソッド
+
+        Args:
+            maxsize: 保持するモジュールの最大数
+        """
+        self.maxsize = maxsize
+        self._svg_images: OrderedDict[str, str] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, digest: str) -> str | None:
+        """ハッシュ値に対応するSVGを取得する
+
+        Args:
+            digest (str): get_section_digestで求めたハッシュ値
+
+        Returns:
+            str | None: 描画済みのSVG。キャッシュになければNone
+        """
+        with self._lock:
+            svg_img = self._svg_images.get(digest)
+            if svg_img is None:
+                self._misses += 1
+                return None
+
+            self._hits += 1
+            self._svg_images.move_to_end(digest)
+            return svg_img
+
+    def put(self, digest: str, svg_img: str) -> None:
+        """描画したSVGを保持する
+
+        Args:
+            digest (str): get_section_digestで求めたハッシュ値
+            svg_img (str): 描画したSVG
+        """
+        if self.maxsize <= 0:
+            return
+
+        with self._lock:
+            self._svg_images[digest] = svg_img
+            self._svg_images.move_to_end(digest)
+            while len(self._svg_images) > self.maxsize:
+                self._svg_images.popitem(last=False)
+
+    def clear(self) -> None:
+        """保持しているSVGと統計を破棄する"""
+        with self._lock:
+            self._svg_images.clear()
+            self._hits = 0
+            self._misses = 0
+
+    def cache_info(self) -> CacheInfo:
+        """キャッシュのヒット数などの統計を取得する"""
+        with self._lock:
+            return CacheInfo(self._hits, self._misses, self.maxsize, len(self._svg_images))
+
+
+# 描画結果に影響するソースファイルを変更したら上げる
+TOOL_VERSION = "1.0.4"
+
+
+@functools.cache
+def get_tool_version() -> str:
+    """ディスク上のキャッシュを区別するためのツールのバージョンを取得する
+
+    バージョン番号の更新漏れに備えて、ソースファイルのハッシュ値も含める
+
+    Returns:
+        str: バージョン番号とソースファイルのハッシュ値
+    """
+    hasher = hashlib.blake2b(digest_size=8)
+    for source_path in sorted(glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)), "*.py"))):
+        with open(source_path, "rb") as f:
+            hasher.update(f.read())
+    return f"{TOOL_VERSION}+{hasher.hexdigest()}"
+
+
+class DiskRenderCache:
+    """描画済みのSVGをSQLiteのファイルへ保持するキャッシュ
+
+    キーはget_section_digestで求めたハッシュ値とツールのバージョンの組とする
+    SVGは圧縮して保存し、合計サイズが上限を超えた場合は最も長く参照されていないものから破棄する
+    """
+
+    MAX_BYTES = 256 * 1024 * 1024
+
+    def __init__(self, path: str, max_bytes: int = MAX_BYTES, tool_version: str | None = None) -> None:
+        """
+        初期化メソッド
+
+        Args:
+            path: キャッシュを保存するファイルパス
+            max_bytes: 保持するSVGの合計サイズ(圧縮後)の上限
+            tool_version: キーに含めるツールのバージョン。Noneならget_tool_versionの値を用いる
+
+        Raises:
+            sqlite3.Error: キャッシュファイルを開けない場合
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.tool_version = tool_version if tool_version is not None else get_tool_version()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+        self._conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS svg_cache ("
+            "digest TEXT NOT NULL, tool_version TEXT NOT NULL, svg BLOB NOT NULL, size INTEGER NOT NULL, last_used REAL NOT NULL, "
+            "PRIMARY KEY (digest, tool_version))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS svg_cache_last_used ON svg_cache (last_used)")
+        self._total_bytes: int = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM svg_cache").fetchone()[0]
+
+    def get(self, digest: str) -> str | None:
+        """ハッシュ値に対応するSVGを取得する
+
+        Args:
+            digest (str): get_section_digestで求めたハッシュ値
+
+        Returns:
+            str | None: 描画済みのSVG。キャッシュになければNone
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT svg FROM svg_cache WHERE digest = ? AND tool_version = ?", (digest, self.tool_version)
+            ).fetchone()
+            if row is None:
+                self._misses += 1
+                return None
+
+            self._hits += 1
+            self._conn.execute(
+                "UPDATE svg_cache SET last_used = ? WHERE digest = ? AND tool_version = ?", (time.time(), digest, self.tool_version)
+            )
+            return zlib.decompress(row[0]).decode("utf-8")
+
+    def put(self, digest: str, svg_img: str) -> None:
+        """描画したSVGを保持する
+
+        Args:
+            digest (str): get_section_digestで求めたハッシュ値
+            svg_img (str): 描画したSVG
+        """
+        blob = zlib.compress(svg_img.encode("utf-8"))
+        with self._lock:
+            row = self._conn.execute("SELECT size FROM svg_cache WHERE digest = ? AND tool_version = ?", (digest, self.tool_version)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO svg_cache VALUES (?, ?, ?, ?, ?)", (digest, self.tool_version, blob, len(blob), time.time())
+            )
+            self._total_bytes += len(blob) - (row[0] if row is not None else 0)
+            self.__evict()
+
+    def __evict(self) -> None:
+        """合計サイズが上限を超えていれば、最も長く参照されていないものから破棄する"""
+        if self._total_bytes <= self.max_bytes:
+            return
+
+        evicted: list[tuple[str, str]] = []
+        for digest, tool_version, size in self._conn.execute("SELECT digest, tool_version, size FROM svg_cache ORDER BY last_used"):
+            if self._total_bytes <= self.max_bytes:
+                break
+            evicted.append((digest, tool_version))
+            self._total_bytes -= size
+
+        self._conn.executemany("DELETE FROM svg_cache WHERE digest = ? AND tool_version = ?", evicted)
+
+    def export_bundle(self, bundle_path: str) -> None:
+        """キャッシュの内容を1つのファイルへ書き出す
+
+        CIなどの別環境へキャッシュを持ち込む場合に用いる
+
+        Args:
+            bundle_path (str): 書き出すファイルパス。既存のファイルは上書きする
+        """
+        with self._lock:
+            if os.path.exists(bundle_path):
+                os.remove(bundle_path)
+            bundle = sqlite3.connect(bundle_path)
+            try:
+                self._conn.backup(bundle)
+            finally:
+                bundle.close()
+
+    def import_bundle(self, bundle_path: str) -> None:
+        """export_bundleで書き出したファイルの内容を取り込む
+
+        既に保持しているものは上書きしない
+
+        Args:
+            bundle_path (str): 取り込むファイルパス
+        """
+        with self._lock:
+            self._conn.execute("ATTACH DATABASE ? AS bundle", (bundle_path,))
+            try:
+                self._conn.execute("INSERT OR IGNORE INTO svg_cache SELECT * FROM bundle.svg_cache")
+            finally:
+                self._conn.execute("DETACH DATABASE bundle")
+            self._total_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM svg_cache").fetchone()[0]
+            self.__evict()
+
+    def close(self) -> None:
+        """キャッシュファイルを閉じる"""
+        with self._lock:
+            self._conn.close()
+
+    def cache_info(self) -> CacheInfo:
+        """キャッシュのヒット数などの統計を取得する"""
+        with self._lock:
+            return CacheInfo(self._hits, self._misses, self.max_bytes, self._total_bytes)
+
+
+# プロセス内で共有するキャッシュ
+_render_cache = RenderCache()
+# ディスク上のキャッシュは指定された場合だけ用いる
+_disk_render_cache: DiskRenderCache | None = None
+
+
+def get_render_cache() -> RenderCache:
+    """プロセス内で共有する描画済みSVGのキャッシュを取得する
+
+    Returns:
+        RenderCache: 描画済みSVGのキャッシュ
+    """
+    return _render_cache
+
+
+def get_disk_render_cache() -> DiskRenderCache | None:
+    """ディスク上のキャッシュを取得する
+
+    Returns:
+        DiskRenderCache | None: 設定されたキャッシュ。未設定ならNone
+    """
+    return _disk_render_cache
+
+
+def set_disk_render_cache(disk_render_cache: DiskRenderCache | None) -> None:
+    """ディスク上のキャッシュを設定する
+
+    プロセス内のキャッシュにだけ残ったSVGがディスクへ保存されないことを防ぐため、プロセス内のキャッシュは破棄する
+
+    Args:
+        disk_render_cache (DiskRenderCache | None): 以降の変換で参照するキャッシュ。Noneなら参照しない
+    """
+    global _disk_render_cache
+    _disk_render_cache = disk_render_cache
+    _render_cache.clear()
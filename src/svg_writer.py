@@ -0,0 +1,41 @@
+import io
+from typing import IO, Protocol
+
+
+class SvgSink(Protocol):
+    """SVGの要素を受け取る出力先
+
+    list[str]もそのまま出力先として扱える
+    """
+
+    def append(self, element: str) -> None: ...
+
+
+class SvgStreamSink:
+    """要素を受け取った順にストリームへ書き出す出力先
+
+    テキストストリームとバイナリストリームのどちらにも書き出せる
+    要素の間は改行で区切る
+    """
+
+    def __init__(self, stream: IO[str] | IO[bytes], encoding: str = "utf-8") -> None:
+        self._stream = stream
+        self._encoding = encoding
+        self._is_binary = isinstance(stream, io.RawIOBase | io.BufferedIOBase)
+        self._is_first = True
+
+    def append(self, element: str) -> None:
+        """要素を1つ書き出す
+
+        Args:
+            element (str): SVGの要素
+        """
+        if self._is_first:
+            self._is_first = False
+        else:
+            element = "\n" + element
+
+        if self._is_binary:
+            self._stream.write(element.encode(self._encoding))  # type: ignore[arg-type]
+        else:
+            self._stream.write(element)  # type: ignore[arg-type]
@@ -0,0 +1,240 @@
+import functools
+import math
+import struct
+import unicodedata
+
+
+class FontAdvanceTable:
+    """フォントファイルから文字ごとの送り幅を読み込む
+
+    TrueType/OpenTypeのcmap・hmtxテーブルだけを読むので、外部ライブラリは必要としない
+    """
+
+    def __init__(self, font_path: str) -> None:
+        """
+        初期化メソッド
+
+        Args:
+            font_path: 読み込むフォントファイル(.ttf/.otf/.ttc)のパス
+
+        Raises:
+            OSError: ファイル読み込みに失敗した場合
+            ValueError: フォントファイルとして解釈できない場合
+        """
+        with open(font_path, "rb") as f:
+            self._data = f.read()
+
+        try:
+            tables = self.__read_table_offsets()
+            units_per_em = self.__read_uint16(tables["head"] + 18)
+            advances = self.__read_advances(tables["hhea"], tables["hmtx"])
+            glyph_ids = self.__read_cmap(tables["cmap"])
+        except (KeyError, IndexError, struct.error) as e:
+            raise ValueError(f"フォントファイルを解釈できません: {font_path}: {e!r}") from e
+
+        # 文字ごとの送り幅を、全角1文字を1とした単位で保持する
+        self.widths: dict[int, float] = {
+            code_point: advances[min(glyph_id, len(advances) - 1)] / units_per_em for code_point, glyph_id in glyph_ids.items()
+        }
+
+        # 読み込み後はデータを保持しない
+        del self._data
+
+    def __read_uint16(self, offset: int) -> int:
+        return struct.unpack_from(">H", self._data, offset)[0]
+
+    def __read_uint32(self, offset: int) -> int:
+        return struct.unpack_from(">I", self._data, offset)[0]
+
+    def __read_table_offsets(self) -> dict[str, int]:
+        """テーブル名と開始位置の対応を取得する"""
+        font_offset = 0
+        # フォントコレクションは先頭のフォントを使う
+        if self._data[:4] == b"ttcf":
+            font_offset = self.__read_uint32(12)
+
+        num_tables = self.__read_uint16(font_offset + 4)
+        tables: dict[str, int] = {}
+        for index in range(num_tables):
+            record = font_offset + 12 + index * 16
+            tag = self._data[record : record + 4].decode("latin-1")
+            tables[tag] = self.__read_uint32(record + 8)
+        return tables
+
+    def __read_advances(self, hhea_offset: int, hmtx_offset: int) -> list[int]:
+        """グリフごとの送り幅を取得する"""
+        number_of_h_metrics = self.__read_uint16(hhea_offset + 34)
+        return [self.__read_uint16(hmtx_offset + index * 4) for index in range(number_of_h_metrics)]
+
+    def __read_cmap(self, cmap_offset: int) -> dict[int, int]:
+        """文字コードとグリフ番号の対応を取得する
+
+        Unicodeのサブテーブルのうち、format 12を優先し、なければformat 4を使う
+        """
+        subtables: dict[int, int] = {}
+        num_subtables = self.__read_uint16(cmap_offset + 2)
+        for index in range(num_subtables):
+            record = cmap_offset + 4 + index * 8
+            platform_id = self.__read_uint16(record)
+            encoding_id = self.__read_uint16(record + 2)
+            if (platform_id, encoding_id) not in [(0, 3), (0, 4), (3, 1), (3, 10)]:
+                continue
+            subtable = cmap_offset + self.__read_uint32(record + 4)
+            subtables.setdefault(self.__read_uint16(subtable), subtable)
+
+        if 12 in subtables:
+            return self.__read_cmap_format12(subtables[12])
+        if 4 in subtables:
+            return self.__read_cmap_format4(subtables[4])
+        raise ValueError("Unicodeのcmapがありません")
+
+    def __read_cmap_format4(self, offset: int) -> dict[int, int]:
+        seg_count = self.__read_uint16(offset + 6) // 2
+        end_codes = offset + 14
+        start_codes = end_codes + seg_count * 2 + 2
+        id_deltas = start_codes + seg_count * 2
+        id_range_offsets = id_deltas + seg_count * 2
+
+        glyph_ids: dict[int, int] = {}
+        for segment in range(seg_count):
+            end_code = self.__read_uint16(end_codes + segment * 2)
+            start_code = self.__read_uint16(start_codes + segment * 2)
+            id_delta = self.__read_uint16(id_deltas + segment * 2)
+            range_offset_pos = id_range_offsets + segment * 2
+            id_range_offset = self.__read_uint16(range_offset_pos)
+            for code_point in range(start_code, min(end_code, 0xFFFE) + 1):
+                if id_range_offset == 0:
+                    glyph_id = (code_point + id_delta) & 0xFFFF
+                else:
+                    glyph_id = self.__read_uint16(range_offset_pos + id_range_offset + (code_point - start_code) * 2)
+                    if glyph_id != 0:
+                        glyph_id = (glyph_id + id_delta) & 0xFFFF
+                if glyph_id != 0:
+                    glyph_ids[code_point] = glyph_id
+        return glyph_ids
+
+    def __read_cmap_format12(self, offset: int) -> dict[int, int]:
+        num_groups = self.__read_uint32(offset + 12)
+        glyph_ids: dict[int, int] = {}
+        for group in range(num_groups):
+            start_code, end_code, start_glyph_id = struct.unpack_from(">III", self._data, offset + 16 + group * 12)
+            for code_point in range(start_code, end_code + 1):
+                glyph_ids[code_point] = start_glyph_id + (code_point - start_code)
+        return glyph_ids
+
+
+class TextMetrics:
+    """文字列の描画幅を求める
+
+    文字幅はEast Asian Widthに基づいて判定し、結果は(文字列, フォントサイズ)ごとにキャッシュする
+    フォントファイルを指定した場合は、フォントに含まれる文字の送り幅を優先する
+    """
+
+    CACHE_SIZE = 4096
+
+    # 全角1文字を1とした文字幅(フォントサイズに対する比)
+    WIDTH_FULL = 1.0
+    WIDTH_HALF = 0.5
+    WIDTH_NONE = 0.0
+
+    # 全角として扱うEast Asian Width
+    # 曖昧(A)は日本語環境の表示に合わせて全角とする
+    _FULL_WIDTH_CLASSES = frozenset(["F", "W", "A"])
+
+    def __init__(self, font_path: str | None = None, cache_size: int = CACHE_SIZE) -> None:
+        """
+        初期化メソッド
+
+        Args:
+            font_path: 送り幅を読み込むフォントファイルのパス。Noneならフォントは参照しない
+            cache_size: キャッシュする文字列の最大数
+        """
+        self.font_widths: dict[int, float] = FontAdvanceTable(font_path).widths if font_path is not None else {}
+
+        # インスタンスごとに上限付きのキャッシュを持たせる
+        self._cached_text_width = functools.lru_cache(maxsize=cache_size)(self._measure_text_width)
+
+    @classmethod
+    @functools.cache
+    def get_char_width(cls, char: str) -> float:
+        """1文字の幅をEast Asian Widthに基づいて取得する
+
+        Args:
+            char (str): 幅を取得したい文字
+
+        Returns:
+            float: 全角1文字を1とした文字幅
+        """
+        # 結合文字と制御文字は幅を持たない
+        if unicodedata.combining(char) or unicodedata.category(char) in ("Mn", "Me", "Cf", "Cc"):
+            return cls.WIDTH_NONE
+
+        if unicodedata.east_asian_width(char) in cls._FULL_WIDTH_CLASSES:
+            return cls.WIDTH_FULL
+
+        return cls.WIDTH_HALF
+
+    def count_widths(self, string: str) -> float:
+        """文字列の幅を積算する
+
+        Args:
+            string (str): 幅を取得したい文字列
+
+        Returns:
+            float: 全角1文字を1とした文字列の幅
+        """
+        font_widths = self.font_widths
+        count_widths = 0.0
+        for char in string:
+            width = font_widths.get(ord(char))
+            count_widths += width if width is not None else self.get_char_width(char)
+        return count_widths
+
+    def get_string_widths(self, string: str) -> int:
+        """文字列の幅を取得する
+
+        Args:
+            string (str): 幅を取得したい文字列
+
+        Returns:
+            int: 全角1文字を1とした文字列の幅。端数は切り上げ。
+        """
+        return math.ceil(self.count_widths(string))
+
+    def _measure_text_width(self, text: str, font_px: int) -> int:
+        # フォントの送り幅は細かいので、ピクセル単位で切り上げる
+        if self.font_widths:
+            return math.ceil(self.count_widths(text) * font_px)
+
+        return self.get_string_widths(text) * font_px
+
+    def get_text_width(self, text: str, font_px: int) -> int:
+        """文字列の描画幅を取得する
+
+        同じ文字列とフォントサイズの組み合わせはキャッシュから返す
+
+        Args:
+            text (str): 幅を取得したい文字列
+            font_px (int): フォントサイズ(px)
+
+        Returns:
+            int: 文字列の描画幅(px)
+        """
+        return self._cached_text_width(text, font_px)
+
+    def cache_info(self) -> "functools._CacheInfo":
+        """キャッシュのヒット数などの統計を取得する"""
+        return self._cached_text_width.cache_info()
+
+
+@functools.cache
+def get_text_metrics(font_path: str | None = None) -> TextMetrics:
+    """フォントファイルごとに共有する文字列幅の計算を取得する
+
+    Args:
+        font_path (str | None): 送り幅を読み込むフォントファイルのパス
+
+    Returns:
+        TextMetrics: 文字列幅の計算
+    """
+    return TextMetrics(font_path)
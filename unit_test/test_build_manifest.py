@@ -0,0 +1,93 @@
+import os
+
+import pytest
+
+from src.build_manifest import BuildManifest, InputRecord
+from src.main_cli import build_hcp_images
+
+HCP_TEXT = "\n".join(
+    [
+        "\\module モジュール1",
+        "    処理開始 \\in データ1",
+        "",
+        "\\module モジュール2",
+        "    処理開始",
+    ]
+)
+
+
+class TestBuildManifest:
+    """BuildManifestのテストクラス"""
+
+    def test_save_load(self, tmp_path: str) -> None:
+        """保存した記録を読み込めることを確認"""
+        manifest_path = os.path.join(tmp_path, BuildManifest.FILE_NAME)
+        manifest = BuildManifest("key", {"a.hcp": InputRecord(1, 2, "digest", ["a_m.svg"])})
+        manifest.save(manifest_path)
+
+        loaded = BuildManifest.load(manifest_path)
+        assert loaded.build_key == "key"
+        assert loaded.inputs == manifest.inputs
+        assert loaded.get_outputs() == {"a_m.svg"}
+
+    def test_load_broken(self, tmp_path: str) -> None:
+        """解釈できない記録は空として扱うことを確認"""
+        manifest_path = os.path.join(tmp_path, BuildManifest.FILE_NAME)
+        with open(manifest_path, "w", encoding="utf-8") as f:
+            f.write("{")
+        assert BuildManifest.load(manifest_path).inputs == {}
+
+
+class TestBuildHcpImages:
+    """build_hcp_imagesのテストクラス"""
+
+    @pytest.fixture
+    def paths(self, tmp_path: str) -> tuple[str, str]:
+        input_path = os.path.join(tmp_path, "input", "")
+        output_path = os.path.join(tmp_path, "output", "")
+        os.makedirs(input_path)
+        os.makedirs(output_path)
+        with open(os.path.join(input_path, "a.hcp"), "w", encoding="utf-8") as f:
+            f.write(HCP_TEXT)
+        with open(os.path.join(input_path, "b.hcp"), "w", encoding="utf-8") as f:
+            f.write(HCP_TEXT)
+        return input_path, output_path
+
+    def test_skip_unchanged(self, paths: tuple[str, str]) -> None:
+        """変更のないファイルは変換せず、更新日時だけ変わったファイルも書き出さないことを確認"""
+        input_path, output_path = paths
+        assert len(build_hcp_images(input_path, output_path)) == 2
+        assert build_hcp_images(input_path, output_path) == []
+
+        # 更新日時だけを変えても、内容が同じなら変換しない
+        svg_path = os.path.join(output_path, "a_モジュール1.svg")
+        svg_mtime = os.stat(svg_path).st_mtime_ns
+        os.utime(os.path.join(input_path, "a.hcp"), ns=(0, 0))
+        assert build_hcp_images(input_path, output_path) == []
+        assert os.stat(svg_path).st_mtime_ns == svg_mtime
+
+    def test_changed_and_stale(self, paths: tuple[str, str]) -> None:
+        """変更したファイルだけを変換し、不要になったSVG画像を削除することを確認"""
+        input_path, output_path = paths
+        build_hcp_images(input_path, output_path)
+        unchanged_svg = os.path.join(output_path, "a_モジュール1.svg")
+        unchanged_mtime = os.stat(unchanged_svg).st_mtime_ns
+
+        # モジュール2を削除する
+        with open(os.path.join(input_path, "a.hcp"), "w", encoding="utf-8") as f:
+            f.write(HCP_TEXT.split("\n\n")[0])
+        os.remove(os.path.join(input_path, "b.hcp"))
+
+        assert build_hcp_images(input_path, output_path) == [os.path.join(input_path, "a.hcp")]
+        assert sorted(os.listdir(output_path)) == sorted([BuildManifest.FILE_NAME, "a_モジュール1.svg"])
+        # 内容の変わらないSVG画像は書き出さない
+        assert os.stat(unchanged_svg).st_mtime_ns == unchanged_mtime
+
+    def test_missing_output(self, paths: tuple[str, str]) -> None:
+        """出力したSVG画像が削除された場合は変換し直すことを確認"""
+        input_path, output_path = paths
+        build_hcp_images(input_path, output_path)
+        os.remove(os.path.join(output_path, "b_モジュール2.svg"))
+
+        assert build_hcp_images(input_path, output_path) == [os.path.join(input_path, "b.hcp")]
+        assert os.path.exists(os.path.join(output_path, "b_モジュール2.svg"))
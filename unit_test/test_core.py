@@ -0,0 +1,104 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.core import (
+    HCPDocument,
+    RenderOption,
+    SVGRenderer,
+    convert_documents,
+    convert_file2hcp_info_list,
+    convert_text2svg_list,
+    create_renderer,
+    get_render_cache,
+)
+
+HCP_TEXT = "\n".join(
+    [
+        "\\module モジュール1",
+        "    \\data データ1",
+        "    処理開始 \\in データ1",
+        "\\module モジュール2",
+        "    処理開始",
+    ]
+)
+
+
+class TestHCPInfo:
+    """HCPInfoのテストクラス"""
+
+    def test_lazy_svg(self, tmp_path: str) -> None:
+        """SVG画像は参照した時点で描画し、以降は同じものを返すことを確認"""
+        file_path = os.path.join(tmp_path, "sample.hcp")
+        with open(file_path, "w", encoding="utf-8") as f:
+            f.write(HCP_TEXT)
+
+        get_render_cache().clear()
+        hcp_info_list = convert_file2hcp_info_list(file_path)
+        assert [hcp_info.name for hcp_info in hcp_info_list] == ["モジュール1", "モジュール2"]
+        assert get_render_cache().cache_info().currsize == 0
+
+        svg_img = hcp_info_list[0].svg_img
+        assert get_render_cache().cache_info().currsize == 1
+        assert svg_img == create_renderer("モジュール1", list(hcp_info_list[0].raw_text)).render()
+        assert hcp_info_list[0].svg_img is svg_img
+
+    def test_cache_before_parse(self, tmp_path: str, monkeypatch: pytest.MonkeyPatch) -> None:
+        """キャッシュ済みのモジュールは、読み込み直してもパースしないことを確認"""
+        file_path = os.path.join(tmp_path, "sample.hcp")
+        with open(file_path, "w", encoding="utf-8") as f:
+            f.write(HCP_TEXT)
+        expected = [hcp_info.svg_img for hcp_info in convert_file2hcp_info_list(file_path)]
+
+        parsed: list[str] = []
+
+        def create_renderer_spy(section_name: str, *args: object) -> SVGRenderer:
+            parsed.append(section_name)
+            return create_renderer(section_name, *args)  # type: ignore[arg-type]
+
+        monkeypatch.setattr("src.core.create_renderer", create_renderer_spy)
+        assert [hcp_info.svg_img for hcp_info in convert_file2hcp_info_list(file_path)] == expected
+        assert parsed == []
+
+    def test_wrong_indent(self, tmp_path: str) -> None:
+        """インデントの誤りはSVG画像の参照を待たずにエラーとすることを確認"""
+        file_path = os.path.join(tmp_path, "sample.hcp")
+        with open(file_path, "w", encoding="utf-8") as f:
+            f.write("\\module モジュール\n   処理\n")
+        with pytest.raises(ValueError):
+            convert_file2hcp_info_list(file_path)
+
+
+class TestSharedParse:
+    """パース結果の共有のテストクラス"""
+
+    def test_concurrent_render(self) -> None:
+        """1つのパース結果を異なる描画方法で並行して描画しても、個別に描画した場合と同じになることを確認"""
+        lines = HCP_TEXT.split("\n")[1:3] + ["        \\fork 分岐 \\in データ1 \\out データ2", "            \\true 真の場合"]
+        parse_info_4_render = create_renderer("モジュール1", lines).parse_info_4_render
+        options = [RenderOption(), RenderOption(use_symbols=True), RenderOption(batch_lines=True)] * 4
+
+        expected = [create_renderer("モジュール1", lines, option).render() for option in options]
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            actual = list(executor.map(lambda option: SVGRenderer("モジュール1", parse_info_4_render, option).render(), options))
+        assert actual == expected
+
+
+class TestConvertText:
+    """テキストからの変換のテストクラス"""
+
+    def test_same_as_file(self, tmp_path: str) -> None:
+        """テキスト・行のリストから、ファイルと同じSVG画像へ変換することを確認"""
+        file_path = os.path.join(tmp_path, "sample.hcp")
+        with open(file_path, "w", encoding="utf-8") as f:
+            f.write(HCP_TEXT + "\n# コメント\n")
+        expected = [(hcp_info.name, hcp_info.svg_img) for hcp_info in convert_file2hcp_info_list(file_path)]
+
+        assert [(result.module, result.svg) for result in convert_text2svg_list(HCP_TEXT, "sample")] == expected
+        assert [(result.module, result.svg) for result in convert_text2svg_list(HCP_TEXT.split("\n"))] == expected
+
+    def test_documents(self) -> None:
+        """複数の文書をまとめて変換し、文書の名前を付けて返すことを確認"""
+        results = convert_documents([HCPDocument("a", HCP_TEXT), HCPDocument("b", "\\module モジュール3\n    処理")])
+        assert [(result.file, result.module) for result in results] == [("a", "モジュール1"), ("a", "モジュール2"), ("b", "モジュール3")]
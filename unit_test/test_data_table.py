@@ -0,0 +1,66 @@
+from src.data_table import DataSymbol, DataSymbolTable
+from src.define import LineInfo
+from src.parse import DiagramParser
+
+
+class TestDataSymbolTable:
+    """DataSymbolTableのテストクラス"""
+
+    def test_keep_first_seen(self) -> None:
+        """同じ名前は最初に登録した情報を保持することを確認"""
+        table = DataSymbolTable()
+        first = table.add("data1", 0)
+        table.add("data2", 1)
+        registered = table.add("data1", 2)
+
+        assert registered is first
+        assert len(table) == 2
+        assert table.get_indexes() == [0, 1]
+
+    def test_get(self) -> None:
+        """名前で登録済みの情報を取得できることを確認"""
+        table = DataSymbolTable()
+        table.add("data1", 0)
+
+        assert "data1" in table
+        assert table.get("data1") is not None
+        assert table.get("data2") is None
+
+    def test_line_info_list(self) -> None:
+        """行の情報を設定したデータだけを登録順に取得し、元の行のないデータは行の位置に含めないことを確認"""
+        table = DataSymbolTable()
+        table.add("data1", 3).line_info = LineInfo(text_clean="data1")
+        table.add("data2")
+        table.add("data3").line_info = LineInfo(text_clean="data3")
+
+        assert table.get_indexes() == [3]
+        assert table.get("data2").index == DataSymbol.NO_INDEX  # type: ignore[union-attr]
+        assert [info.text_clean for info in table.get_line_info_list()] == ["data1", "data3"]
+
+
+class TestMergeIoData:
+    """in/outとデータ部の統合のテストクラス"""
+
+    def test_readers_and_writers(self) -> None:
+        """データごとに参照する処理部を保持することを確認"""
+        parser = DiagramParser(
+            [
+                "\\data data1",
+                "main",
+                "    read \\in data1 \\in data2",
+                "    write \\out data1",
+                "\\data data1",
+            ]
+        )
+
+        assert [info.text_clean for info in parser.data_line_info_list] == ["data1", "data2"]
+        assert parser.data_table.get_line_info_list() == parser.data_line_info_list
+        data1 = parser.data_table.get("data1")
+        assert data1.line_info is parser.data_line_info_list[0]
+        assert [info.text_clean for info in data1.readers] == ["read"]
+        assert [info.text_clean for info in data1.writers] == ["write"]
+        data2 = parser.data_table.get("data2")
+        assert data2.line_info is parser.data_line_info_list[1]
+        assert data2.line_info.level.value == parser.data_level_min
+        assert [info.text_clean for info in data2.readers] == ["read"]
+        assert data2.writers == []
@@ -0,0 +1,72 @@
+import pytest
+
+from src.core import create_renderer
+from src.diagram_builder import DiagramBuilder, LineTypeEnum
+
+HCP_LINES = [
+    "    \\data データ1",
+    "        \\data データ1-1",
+    "    \\data データ2",
+    "    処理開始 \\in データ1",
+    "        \\repeat 取得 \\in データ1 \\out データ2",
+    "        \\fork 条件 \\in データ2 \\out データ3",
+    "            \\true 真の場合",
+    "                \\mod 関数 \\out データ1-1",
+    "            \\false 偽の場合",
+    "                何もしない",
+    "        \\return 0",
+]
+
+
+def build_diagram() -> DiagramBuilder:
+    builder = DiagramBuilder()
+    builder.add_data("データ1", 1).add_data("データ1-1", 2).add_data("データ2", 1)
+    builder.add_step("処理開始", 1, in_data=["データ1"])
+    builder.add_step("取得", 2, LineTypeEnum.REPEAT, in_data=["データ1"], out_data=["データ2"])
+    builder.add_step("条件", 2, LineTypeEnum.FORK, in_data=["データ2"], out_data=["データ3"])
+    builder.add_step("真の場合", 3, LineTypeEnum.TRUE)
+    builder.add_step("関数", 4, LineTypeEnum.MOD, out_data=["データ1-1"])
+    builder.add_step("偽の場合", 3, LineTypeEnum.FALSE)
+    builder.add_step("何もしない", 4)
+    builder.add_step("0", 2, LineTypeEnum.RETURN)
+    return builder
+
+
+class TestDiagramBuilder:
+    """DiagramBuilderのテストクラス"""
+
+    def test_same_as_text(self) -> None:
+        """テキストをパースした場合と同じSVG画像を描画することを確認"""
+        expected = create_renderer("モジュール", HCP_LINES).render()
+        builder = build_diagram()
+        assert builder.build_renderer("モジュール").render() == expected
+        # 繰り返し描画しても同じ結果になる
+        assert builder.build_renderer("モジュール").render() == expected
+
+    def test_wrong_level(self) -> None:
+        """直前の処理より2以上深いレベルはエラーとすることを確認"""
+        builder = DiagramBuilder().add_step("処理", 1)
+        with pytest.raises(ValueError):
+            builder.add_step("深すぎる処理", 3)
+        with pytest.raises(ValueError):
+            builder.add_data("データ", -1)
+
+    def test_fork_child(self) -> None:
+        """\\true・\\false・\\branchは\\forkの直下にのみ追加できることを確認"""
+        builder = DiagramBuilder().add_step("処理", 1)
+        with pytest.raises(ValueError):
+            builder.add_step("真の場合", 2, LineTypeEnum.TRUE)
+
+        builder.add_step("条件", 1, LineTypeEnum.FORK).add_step("場合1", 2, LineTypeEnum.BRANCH)
+        with pytest.raises(ValueError):
+            builder.add_step("場合2", 3, LineTypeEnum.BRANCH)
+
+    def test_wrong_data(self) -> None:
+        """空白を含むデータ名や重複したデータはエラーとすることを確認"""
+        builder = DiagramBuilder().add_data("データ", 1)
+        with pytest.raises(ValueError):
+            builder.add_data("データ", 1)
+        with pytest.raises(ValueError):
+            builder.add_step("処理", 1, in_data=["データ 1"])
+        with pytest.raises(ValueError):
+            builder.add_step("処理", 1, LineTypeEnum.DATA)
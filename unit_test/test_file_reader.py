@@ -0,0 +1,134 @@
+import codecs
+import os
+
+import pytest
+
+from src.core import convert_file2hcp_info_list
+from src.file_reader import HCPFileReader, detect_encoding
+from src.parse_file import FileParse
+
+HCP_TEXT = "\r\n".join(
+    [
+        "# 先頭のコメント",
+        "\\module モジュール1 # コメント",
+        "    \\data データ1",
+        "",
+        "    処理開始 \\in データ1   ",
+        "\\module",
+        "    ソ\\in データ1",
+        "\\module モジュール3",
+        "    処理   ",
+        "",
+    ]
+)
+
+
+def write_file(tmp_path: str, data: bytes) -> str:
+    file_path = os.path.join(tmp_path, "sample.hcp")
+    with open(file_path, "wb") as f:
+        f.write(data)
+    return file_path
+
+
+def read_with_file_parse(file_path: str) -> list[tuple[str, list[str]]]:
+    file_parser = FileParse()
+    return file_parser.get_module_sections(file_parser.convert_text2lines(file_parser.read_file(file_path)))
+
+
+class TestDetectEncoding:
+    """detect_encodingのテストクラス"""
+
+    def test_detect(self) -> None:
+        """UTF-8とShift-JISを判定できることを確認"""
+        assert detect_encoding("モジュール".encode()) == "utf-8"
+        assert detect_encoding("モジュール".encode("shift_jis")) == "shift_jis"
+
+    def test_split_char(self) -> None:
+        """標本の末尾で文字が途切れたUTF-8をShift-JISと誤判定しないことを確認"""
+        assert detect_encoding("モジュール".encode()[:-1]) == "utf-8"
+
+
+class TestHCPFileReader:
+    """HCPFileReaderのテストクラス"""
+
+    @pytest.mark.parametrize("encoding", ["utf-8", "shift_jis"])
+    def test_same_as_file_parse(self, tmp_path: str, encoding: str) -> None:
+        """FileParseで読み込んだ場合と同じセクションを取り出すことを確認"""
+        file_path = write_file(tmp_path, HCP_TEXT.encode(encoding))
+        with HCPFileReader(file_path) as reader:
+            sections = [(section.name, section.lines()) for section in reader.iter_module_sections()]
+            assert reader.encoding == encoding
+
+        assert sections == read_with_file_parse(file_path)
+        assert [name for name, _ in sections] == ["モジュール1", "モジュール名無し", "モジュール3"]
+
+    def test_bom(self, tmp_path: str) -> None:
+        """BOM付きのUTF-8はBOMを除いて読み込むことを確認"""
+        file_path = write_file(tmp_path, codecs.BOM_UTF8 + HCP_TEXT.encode())
+        with HCPFileReader(file_path) as reader:
+            assert reader.encoding == "utf-8"
+            assert next(reader.iter_module_sections()).name == "モジュール1"
+
+    def test_ascii_prefix(self, tmp_path: str) -> None:
+        """ASCIIだけの範囲では判定せず、初めてASCII以外を含む範囲から判定することを確認"""
+        text = "\\module abc\n" + "    process\n" * 10000 + "\\module def\n    ソフト\n"
+        file_path = write_file(tmp_path, text.encode("shift_jis"))
+        with HCPFileReader(file_path) as reader:
+            sections = reader.iter_module_sections()
+            assert next(sections).lines()[0] == "    process"
+            assert reader.encoding is None
+            section = next(sections)
+            assert section.lines() == ["    ソフト"]
+            assert reader.encoding == "shift_jis"
+
+    def test_sample_mismatch(self, tmp_path: str, monkeypatch: pytest.MonkeyPatch) -> None:
+        """標本より後ろが判定した文字コードで読めない場合は、文字コードを切り替えずにエラーとすることを確認"""
+        text = "\\module モジュール1\n    処理\n".encode() + "\\module m2\n    処理\n".encode("shift_jis")
+        file_path = write_file(tmp_path, text)
+        monkeypatch.setattr(HCPFileReader, "ENCODING_SAMPLE_SIZE", 8)
+        with HCPFileReader(file_path) as reader:
+            sections = reader.iter_module_sections()
+            assert next(sections).lines() == ["    処理"]
+            assert reader.encoding == "utf-8"
+            with pytest.raises(OSError):
+                next(sections).lines()
+
+    def test_decode_on_demand(self, tmp_path: str) -> None:
+        """セクションを取り出した時点では、そのセクションの行をデコードしないことを確認"""
+        file_path = write_file(tmp_path, HCP_TEXT.encode())
+        with HCPFileReader(file_path) as reader:
+            decoded_ranges: list[tuple[int, int]] = []
+            decode = reader.decode
+
+            def spy_decode(start: int, end: int) -> str:
+                decoded_ranges.append((start, end))
+                return decode(start, end)
+
+            reader.decode = spy_decode  # type: ignore[method-assign]
+            first = next(reader.iter_module_sections())
+            # モジュールの開始行の候補だけをデコードしている
+            assert all("\\module" in decode(start, end) for start, end in decoded_ranges)
+            first.lines()
+            assert decoded_ranges[-1] == (first.start, first.end)
+
+    def test_lazy(self, tmp_path: str) -> None:
+        """セクションは行を参照した時点で一度だけデコードし、シーケンスとして扱えることを確認"""
+        file_path = write_file(tmp_path, HCP_TEXT.encode())
+        section = next(iter(HCPFileReader(file_path).iter_module_sections()))
+        assert len(section) == 2
+        assert section[0].rstrip() == "    \\data データ1"
+        assert list(section) == section.lines()
+        assert section.lines() is section.lines()
+
+    def test_empty(self, tmp_path: str) -> None:
+        """空のファイルはエラーとすることを確認"""
+        with pytest.raises(ValueError):
+            HCPFileReader(write_file(tmp_path, b""))
+
+    def test_hcp_info_raw_text(self, tmp_path: str) -> None:
+        """HCPInfo.raw_textからセクション行を参照できることを確認"""
+        file_path = write_file(tmp_path, HCP_TEXT.encode())
+        hcp_info_list = convert_file2hcp_info_list(file_path)
+        assert [(hcp_info.name, hcp_info.raw_text) for hcp_info in hcp_info_list] == read_with_file_parse(file_path)
+        # セクションがデコードした行のリストを参照し、ファイルのメモリマップは参照しない
+        assert all(type(hcp_info.raw_text) is list for hcp_info in hcp_info_list)
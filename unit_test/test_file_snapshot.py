@@ -0,0 +1,54 @@
+import os
+
+import pytest
+
+from src.file_snapshot import FileState, diff_snapshots, refresh_snapshot, take_snapshot
+
+
+class TestRefreshSnapshot:
+    """refresh_snapshotのテストクラス"""
+
+    @pytest.fixture
+    def folder_path(self, tmp_path: str) -> str:
+        folder_path = os.path.join(tmp_path, "input", "")
+        os.makedirs(os.path.join(folder_path, "sub"))
+        for file_name in ["a.hcp", os.path.join("sub", "b.hcp")]:
+            with open(os.path.join(folder_path, file_name), "w", encoding="utf-8") as f:
+                f.write("\\module モジュール1")
+        return folder_path
+
+    def test_modified_without_scan(self, folder_path: str, monkeypatch: pytest.MonkeyPatch) -> None:
+        """ファイルの更新だけなら、フォルダを走査せずに検出することを確認"""
+        folder_states: dict[str, int] = {}
+        snapshot = take_snapshot(folder_path, folder_states=folder_states)
+        assert set(folder_states) == {folder_path, os.path.join(folder_path, "sub")}
+
+        file_path = os.path.join(folder_path, "sub", "b.hcp")
+        os.utime(file_path, ns=(0, 0))
+
+        def fail_scandir(path: str) -> None:
+            raise AssertionError(f"{path} を走査した")
+
+        monkeypatch.setattr(os, "scandir", fail_scandir)
+        refreshed = refresh_snapshot(folder_path, snapshot, folder_states)
+        assert refreshed[file_path] == FileState(0, snapshot[file_path].size)
+        assert diff_snapshots(snapshot, refreshed).changed == [file_path]
+
+    def test_added_and_removed(self, folder_path: str) -> None:
+        """ファイルの追加・削除はフォルダを走査し直して検出することを確認"""
+        folder_states: dict[str, int] = {}
+        snapshot = take_snapshot(folder_path, folder_states=folder_states)
+
+        added_path = os.path.join(folder_path, "sub", "c.hcp")
+        with open(added_path, "w", encoding="utf-8") as f:
+            f.write("")
+        removed_path = os.path.join(folder_path, "a.hcp")
+        os.remove(removed_path)
+        # 更新日時の精度が粗いファイルシステムでも、フォルダの変更として検出できるようにする
+        for folder in folder_states:
+            os.utime(folder, ns=(0, 0))
+
+        refreshed = refresh_snapshot(folder_path, snapshot, folder_states)
+        assert refreshed == take_snapshot(folder_path)
+        diff = diff_snapshots(snapshot, refreshed)
+        assert (diff.changed, diff.removed) == ([added_path], [removed_path])
@@ -0,0 +1,95 @@
+import json
+
+from src.core import create_renderer
+from src.layout import DiagramLayout
+
+SECTION_LINES = [
+    "    \\data データ1",
+    "    \\data データ2",
+    "    処理開始 \\in データ1",
+    "        \\fork 分岐 \\in データ1 \\out データ2",
+    "            \\true 真の場合",
+    "                \\return",
+]
+
+
+class TestDiagramLayout:
+    """DiagramLayoutのテストクラス"""
+
+    def test_columns(self) -> None:
+        """要素と接続線の配置を列ごとに求めることを確認"""
+        layout = create_renderer("module", SECTION_LINES).create_layout()
+        assert list(layout.process.x) == [30, 60, 90, 120]
+        assert list(layout.process.y) == [90, 120, 150, 180]
+        assert all(end_x > x for x, end_x in zip(layout.process.x, layout.process.end_x, strict=True))
+
+        # 関数への入力は接続線を持たない
+        connectors = layout.connectors
+        assert list(connectors.function) == [1, 0, 0]
+        assert list(connectors.data_no) == [0, 0, 1]
+        assert list(connectors.color) == [0, 0, 1]
+        # 処理部からの水平線は右へずらして並べ、データ部は水平線より右に置く
+        assert connectors.exit_x2[2] - connectors.exit_x2[1] == 10
+        assert min(layout.data.x) > max(connectors.exit_x2)
+
+    def test_trunks(self) -> None:
+        """同じデータへの同じ種別の参照は1本の幹にまとめ、範囲の重ならない幹は列を共有することを確認"""
+        lines = [
+            "    \\data データ1",
+            "    \\data データ2",
+            "    \\data データ3",
+            "    処理開始",
+            "        読み込み1 \\in データ1",
+            "        読み込み2 \\in データ1",
+            "        書き込み \\out データ2",
+            "        処理1",
+            "        処理2",
+            "        処理3",
+            "        読み込み3 \\in データ3",
+        ]
+        layout = create_renderer("module", lines).create_layout()
+        connectors = layout.connectors
+        trunks = layout.trunks
+        assert list(connectors.trunk) == [0, 0, 1, 2]
+        assert list(trunks.data_no) == [0, 1, 2]
+        assert list(trunks.io) == [1, 0, 1]
+        # データ1への幹はデータ2への幹と重なるので別の列、データ3への幹は先頭の列を再利用する
+        assert list(trunks.lane) == [0, 1, 0]
+        assert connectors.exit_x2[0] == connectors.exit_x2[1] == connectors.exit_x2[3] == trunks.x[0]
+        assert trunks.top_y[0] == layout.data.y[0] + 5
+        assert trunks.bottom_y[0] == layout.process.y[2] - 5
+        assert min(layout.data.x) > max(trunks.x)
+
+        # 垂直線は参照ごとではなく幹ごとに1本だけ描画する
+        svg = create_renderer("module", lines).render()
+        x = trunks.x[0]
+        assert svg.count(f'x1="{x}" y1="{trunks.top_y[0]}" x2="{x}"') == 1
+        assert svg.count(f'x1="{x}" y1="{trunks.top_y[2]}" x2="{x}"') == 1
+
+    def test_allocate_lanes(self) -> None:
+        """列の数が同じY座標を通る垂直線の最大数と等しくなることを確認"""
+        top_y = [0, 10, 20, 40, 35, 70]
+        bottom_y = [30, 15, 50, 60, 45, 80]
+        lanes = DiagramLayout.allocate_lanes(top_y, bottom_y)
+        assert lanes == [0, 1, 1, 2, 0, 0]
+        # 端点が接する範囲は同じ列に置かない
+        assert DiagramLayout.allocate_lanes([0, 10], [10, 20]) == [0, 1]
+
+    def test_same_size_as_svg(self) -> None:
+        """配置結果の画像サイズがSVGと一致することを確認"""
+        renderer = create_renderer("module", SECTION_LINES)
+        layout = renderer.create_layout()
+        header = renderer.render().split("\n")[0]
+        assert f'width="{layout.width}" height="{layout.height + 50}"' in header
+
+    def test_to_json(self) -> None:
+        """配置結果をJSONへ書き出せることを確認"""
+        layout = create_renderer("module", SECTION_LINES).create_layout()
+        text = layout.to_json()
+        assert ": " not in text and ", " not in text
+
+        loaded = json.loads(text)
+        assert loaded["process"]["type"] == ["", "\\fork", "\\true", "\\return"]
+        assert loaded["data"]["text"] == ["データ1", "データ2"]
+        assert loaded["connectors"]["exit_x2"] == list(layout.connectors.exit_x2)
+        assert loaded["trunks"]["lane"] == list(layout.trunks.lane)
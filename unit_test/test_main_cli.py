@@ -0,0 +1,267 @@
+import io
+import json
+import os
+import stat
+import time
+from collections.abc import Iterator
+
+import pytest
+
+from src.core import get_render_cache
+from src.main_cli import (
+    EXECUTOR_THREAD,
+    HCPFileInfo,
+    HCPWatcher,
+    build_hcp_images,
+    convert_stream,
+    create_hcp_images,
+    create_hcp_images_parallel,
+    iter_hcp_file_paths,
+    iter_hcp_files_info,
+    main,
+    write_module_svg,
+)
+
+HCP_TEXT = "\n".join(
+    [
+        "\\module モジュール1",
+        "    \\data データ1",
+        "    処理開始 \\in データ1",
+        "        \\fork 分岐 \\out データ2",
+        "            \\true 真の場合",
+        "                処理",
+        "",
+        "\\module モジュール2",
+        "    処理開始",
+    ]
+)
+
+
+class TestMainJobs:
+    """main_cliの並列変換のテストクラス"""
+
+    @pytest.fixture
+    def input_path(self, tmp_path: str) -> str:
+        input_path = os.path.join(tmp_path, "input", "")
+        os.makedirs(os.path.join(input_path, "sub"))
+        for file_name in ["a.hcp", "b.hcp", os.path.join("sub", "c.hcp")]:
+            with open(os.path.join(input_path, file_name), "w", encoding="utf-8") as f:
+                f.write(HCP_TEXT)
+        return input_path
+
+    @staticmethod
+    def read_outputs(output_path: str) -> dict[str, str]:
+        outputs: dict[str, str] = {}
+        for file_name in os.listdir(output_path):
+            if file_name.endswith(".svg"):
+                with open(os.path.join(output_path, file_name), encoding="utf-8") as f:
+                    outputs[file_name] = f.read()
+        return outputs
+
+    def test_same_as_sequential(self, input_path: str, tmp_path: str) -> None:
+        """並列に変換しても逐次変換と同じSVG画像を出力することを確認"""
+        sequential_path = os.path.join(tmp_path, "sequential", "")
+        parallel_path = os.path.join(tmp_path, "parallel", "")
+        os.makedirs(sequential_path)
+        os.makedirs(parallel_path)
+
+        assert main(input_path, sequential_path, incremental=False)
+        assert main(input_path, parallel_path, jobs=2)
+
+        expected = self.read_outputs(sequential_path)
+        assert len(expected) == 6
+        assert self.read_outputs(parallel_path) == expected
+
+    def test_thread_executor(self, input_path: str, tmp_path: str) -> None:
+        """スレッドで並列に変換しても逐次変換と同じSVG画像を出力することを確認"""
+        sequential_path = os.path.join(tmp_path, "sequential", "")
+        thread_path = os.path.join(tmp_path, "thread", "")
+        os.makedirs(sequential_path)
+        os.makedirs(thread_path)
+
+        assert main(input_path, sequential_path, incremental=False)
+        assert main(input_path, thread_path, jobs=4, executor=EXECUTOR_THREAD)
+        assert self.read_outputs(thread_path) == self.read_outputs(sequential_path)
+
+    def test_unknown_executor(self, input_path: str, tmp_path: str) -> None:
+        """ワーカの種類が誤っている場合はエラーとすることを確認"""
+        with pytest.raises(ValueError):
+            create_hcp_images_parallel(iter_hcp_files_info(iter_hcp_file_paths(input_path)), input_path, str(tmp_path), executor="fiber")
+
+    def test_broken_file(self, input_path: str, tmp_path: str, capsys: pytest.CaptureFixture[str]) -> None:
+        """壊れたファイルがあっても他のファイルの変換を続けることを確認"""
+        with open(os.path.join(input_path, "empty.hcp"), "w", encoding="utf-8"):
+            pass
+        with open(os.path.join(input_path, "indent.hcp"), "w", encoding="utf-8") as f:
+            f.write("\\module 壊れたモジュール\n   処理\n")
+
+        output_path = os.path.join(tmp_path, "output", "")
+        os.makedirs(output_path)
+        assert not main(input_path, output_path, jobs=2)
+
+        errors = capsys.readouterr().err
+        assert "empty.hcp" in errors
+        assert "壊れたモジュール" in errors
+        assert len(self.read_outputs(output_path)) == 6
+
+
+class TestCreateHCPImages:
+    """create_hcp_imagesのテストクラス"""
+
+    def test_streaming(self, tmp_path: str) -> None:
+        """hcpファイルを1つずつ受け取り、次を受け取る前に書き出すことを確認"""
+        input_path = os.path.join(tmp_path, "input", "")
+        output_path = os.path.join(tmp_path, "output", "")
+        os.makedirs(input_path)
+        os.makedirs(output_path)
+        for file_name in ["a.hcp", "b.hcp"]:
+            with open(os.path.join(input_path, file_name), "w", encoding="utf-8") as f:
+                f.write(HCP_TEXT)
+
+        def iter_files_info() -> Iterator[HCPFileInfo]:
+            for hcp_file_info in iter_hcp_files_info(sorted(iter_hcp_file_paths(input_path))):
+                yield hcp_file_info
+                # 前のファイルのSVG画像は、次のファイルを要求した時点で書き出し済み
+                svg_name = os.path.basename(hcp_file_info.name).replace(".hcp", "_モジュール2.svg")
+                assert os.path.exists(os.path.join(output_path, svg_name))
+
+        outputs = create_hcp_images(iter_files_info(), input_path, output_path)
+        assert sorted(outputs) == [os.path.join(input_path, "a.hcp"), os.path.join(input_path, "b.hcp")]
+
+
+class TestWriteModuleSvg:
+    """write_module_svgのテストクラス"""
+
+    def test_skip_unchanged_streams(self, tmp_path: str, monkeypatch: pytest.MonkeyPatch) -> None:
+        """内容の変わらないSVG画像を、文字列として描画せずに比較して書き出さないことを確認"""
+        section_lines = HCP_TEXT.split("\n")[1:6]
+        svg_path = os.path.join(tmp_path, "モジュール1.svg")
+        write_module_svg("モジュール1", section_lines, svg_path)
+        svg_mtime = os.stat(svg_path).st_mtime_ns
+
+        def fail_render_section(*args: object) -> str:
+            raise AssertionError("SVG画像全体を文字列として描画した")
+
+        monkeypatch.setattr("src.main_cli.render_section", fail_render_section)
+        write_module_svg("モジュール1", section_lines, svg_path, skip_unchanged=True)
+        assert os.stat(svg_path).st_mtime_ns == svg_mtime
+
+        write_module_svg("モジュール1", section_lines + ["        追加した処理"], svg_path, skip_unchanged=True)
+        with open(svg_path, encoding="utf-8") as f:
+            assert "追加した処理" in f.read()
+        # 一時ファイルは残さない
+        assert os.listdir(tmp_path) == ["モジュール1.svg"]
+
+    def test_skip_unchanged_permission(self, tmp_path: str) -> None:
+        """一時ファイル経由で書き出しても、open()で作成した場合と同じパーミッションになることを確認"""
+        section_lines = HCP_TEXT.split("\n")[1:6]
+        opened_path = os.path.join(tmp_path, "opened.svg")
+        with open(opened_path, "w", encoding="utf-8") as f:
+            f.write("<svg/>")
+        new_svg_path = os.path.join(tmp_path, "new.svg")
+        write_module_svg("モジュール1", section_lines, new_svg_path, skip_unchanged=True)
+        assert stat.S_IMODE(os.stat(new_svg_path).st_mode) == stat.S_IMODE(os.stat(opened_path).st_mode)
+
+        # 既存のSVG画像を置き換える場合は、既存のパーミッションを引き継ぐ
+        os.chmod(opened_path, 0o664)
+        write_module_svg("モジュール1", section_lines, opened_path, skip_unchanged=True)
+        assert stat.S_IMODE(os.stat(opened_path).st_mode) == 0o664
+        with open(opened_path, encoding="utf-8") as f:
+            assert f.read() != "<svg/>"
+
+
+class TestConvertStream:
+    """convert_streamのテストクラス"""
+
+    def test_ndjson(self, capsys: pytest.CaptureFixture[str]) -> None:
+        """NDJSONの文書をモジュールごとのNDJSONへ変換し、解釈できない行は読み飛ばすことを確認"""
+        input_stream = io.StringIO(
+            "\n".join(
+                [
+                    json.dumps({"file": "a", "text": HCP_TEXT}),
+                    "壊れた行",
+                    json.dumps({"file": "b", "lines": HCP_TEXT.split("\n")[7:]}),
+                ]
+            )
+        )
+        output_stream = io.StringIO()
+        convert_stream(input_stream, output_stream)
+
+        records = [json.loads(line) for line in output_stream.getvalue().splitlines()]
+        assert [(record["file"], record["module"]) for record in records] == [("a", "モジュール1"), ("a", "モジュール2"), ("b", "モジュール2")]
+        assert records[1]["svg"] == records[2]["svg"]
+        assert "<stdin>:2" in capsys.readouterr().err
+
+
+class TestHCPWatcher:
+    """HCPWatcherのテストクラス"""
+
+    @pytest.fixture
+    def paths(self, tmp_path: str) -> tuple[str, str]:
+        input_path = os.path.join(tmp_path, "input", "")
+        output_path = os.path.join(tmp_path, "output", "")
+        os.makedirs(input_path)
+        os.makedirs(output_path)
+        for file_name in ["a.hcp", "b.hcp"]:
+            with open(os.path.join(input_path, file_name), "w", encoding="utf-8") as f:
+                f.write(HCP_TEXT)
+        main(input_path, output_path)
+        return input_path, output_path
+
+    def test_update_changed_module(self, paths: tuple[str, str]) -> None:
+        """内容の変わったモジュールだけを変換することを確認"""
+        input_path, output_path = paths
+        watcher = HCPWatcher(input_path, output_path)
+
+        with open(os.path.join(input_path, "a.hcp"), "w", encoding="utf-8") as f:
+            f.write(HCP_TEXT + "\n        追加した処理")
+        diff = watcher.wait_for_changes()
+        assert diff.changed == [os.path.join(input_path, "a.hcp")]
+        assert watcher.apply(diff) == 1
+
+        with open(os.path.join(output_path, "a_モジュール2.svg"), encoding="utf-8") as f:
+            assert "追加した処理" in f.read()
+        # 反映した変更は記録に保存され、次回の差分変換では変換し直さない
+        assert build_hcp_images(input_path, output_path) == []
+
+    def test_reuse_rendered(self, paths: tuple[str, str]) -> None:
+        """編集を元に戻した内容は、描画済みのSVGをプロセス内のキャッシュから再利用することを確認"""
+        input_path, output_path = paths
+        watcher = HCPWatcher(input_path, output_path)
+
+        get_render_cache().clear()
+        for hcp_text in [HCP_TEXT + "\n        追加した処理", HCP_TEXT, HCP_TEXT + "\n        追加した処理"]:
+            with open(os.path.join(input_path, "a.hcp"), "w", encoding="utf-8") as f:
+                f.write(hcp_text)
+            assert watcher.apply(watcher.wait_for_changes()) == 1
+
+        cache_info = get_render_cache().cache_info()
+        assert (cache_info.hits, cache_info.misses) == (1, 2)
+        with open(os.path.join(output_path, "a_モジュール2.svg"), encoding="utf-8") as f:
+            assert "追加した処理" in f.read()
+
+    def test_default_latency(self, paths: tuple[str, str]) -> None:
+        """既定の間隔でも、保存してから間もなく変更を反映することを確認"""
+        input_path, output_path = paths
+        watcher = HCPWatcher(input_path, output_path)
+
+        start = time.perf_counter()
+        with open(os.path.join(input_path, "b.hcp"), "w", encoding="utf-8") as f:
+            f.write(HCP_TEXT + "\n        追加した処理")
+        assert watcher.apply(watcher.wait_for_changes()) == 1
+        # 既定では数十ミリ秒で反映する。負荷の高い環境でも失敗しないよう余裕を持たせる
+        assert time.perf_counter() - start < 0.5
+
+    def test_remove(self, paths: tuple[str, str]) -> None:
+        """削除したファイル・モジュールのSVG画像を削除することを確認"""
+        input_path, output_path = paths
+        watcher = HCPWatcher(input_path, output_path)
+
+        os.remove(os.path.join(input_path, "b.hcp"))
+        with open(os.path.join(input_path, "a.hcp"), "w", encoding="utf-8") as f:
+            f.write(HCP_TEXT.split("\n\n")[0])
+        assert watcher.apply(watcher.wait_for_changes()) == 0
+
+        svg_names = sorted(file_name for file_name in os.listdir(output_path) if file_name.endswith(".svg"))
+        assert svg_names == ["a_モジュール1.svg"]
+        assert build_hcp_images(input_path, output_path) == []
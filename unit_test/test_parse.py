@@ -1,33 +1,15 @@
+import dataclasses
+import random
+
 import pytest
 
+from src.define import LineInfo
+from src.line_level import LineLevel
+from src.line_lexer import LineLexer
+from src.line_type import LineTypeDefine, LineTypeEnum
 from src.parse import DiagramParser
 
 
-@pytest.fixture
-def parser() -> DiagramParser:
-    """テスト用のパーサーインスタンスを生成するフィクスチャ"""
-    return DiagramParser([])
-
-
-class TestCreateIndentPattern:
-    """create_indent_patternメソッドのテストクラス"""
-
-    def test_valid_tab_count(self, parser: DiagramParser) -> None:
-        """正常なtab_countでパターンが正しく生成されることを確認"""
-        pattern = parser.create_indent_pattern(1)
-        assert "^(?:[ ]{4}|\t{1})\\S.*$" == pattern
-
-    def test_zero_tab_count(self, parser: DiagramParser) -> None:
-        """tab_count=0でパターンが正しく生成されることを確認"""
-        pattern = parser.create_indent_pattern(0)
-        assert "^(?:[ ]{0}|\t{0})\\S.*$" == pattern
-
-    def test_negative_tab_count(self, parser: DiagramParser) -> None:
-        """負のtab_countで例外が発生することを確認"""
-        with pytest.raises(ValueError, match="tab_count must be non-negative"):
-            parser.create_indent_pattern(-1)
-
-
 class TestGetLineLevel:
     """get_line_levelメソッドのテストクラス"""
 
@@ -39,11 +21,12 @@ class TestGetLineLevel:
             ("\tFirst level", 1),  # 1タブ
             ("        Second level", 2),  # 8スペース
             ("\t\tSecond level", 2),  # 2タブ
+            ("\t" * 30 + "Deep level", 30),  # レベルの上限は無い
         ],
     )
-    def test_valid_indentation(self, parser: DiagramParser, input_line: str, expected_level: int) -> None:
+    def test_valid_indentation(self, input_line: str, expected_level: int) -> None:
         """正常なインデントのテスト"""
-        assert parser.get_line_level(input_line) == expected_level
+        assert LineLevel.get_line_level(input_line) == expected_level
 
     @pytest.mark.parametrize(
         "input_line",
@@ -51,24 +34,45 @@ class TestGetLineLevel:
             "",  # 空文字列
             "   ",  # スペースのみ
             "\t  ",  # タブとスペース
-            "\n",  # 改行のみ
-        ],
-    )
-    def test_empty_lines(self, parser: DiagramParser, input_line: str) -> None:
-        """空行のテスト"""
-        assert parser.get_line_level(input_line) == DiagramParser.LEVEL_NONE
-
-    @pytest.mark.parametrize(
-        "input_line",
-        [
             "   Wrong indent",  # 3スペース（4の倍数でない）
             "\t    Mixed",  # タブとスペースの混在
-            "\t\t\t\t\t\t\t\t\tTooManySpaces",  # レベルMAX以上のスペース
+            "    \tMixed",  # スペースとタブの混在
         ],
     )
-    def test_invalid_indentation(self, parser: DiagramParser, input_line: str) -> None:
+    def test_invalid_indentation(self, input_line: str) -> None:
         """不正なインデントのテスト"""
-        assert parser.get_line_level(input_line) == DiagramParser.LEVEL_ERROR
+        with pytest.raises(ValueError, match="Wrong indent pattern"):
+            LineLevel.get_line_level(input_line)
+
+
+class TestLineLexer:
+    """LineLexerのテストクラス"""
+
+    def test_normal_line(self) -> None:
+        """種別も入出力もない行のテスト"""
+        lexed = LineLexer.lex("    処理開始")
+        assert lexed.level == 1
+        assert lexed.type.type_value == LineTypeDefine.get_format_by_type(LineTypeEnum.NORMAL).type_value
+        assert lexed.text_typeless == "    処理開始"
+        assert lexed.in_names == []
+        assert lexed.out_names == []
+        assert lexed.text_clean == "処理開始"
+
+    def test_typed_line_with_io(self) -> None:
+        """種別と入出力を持つ行のテスト"""
+        lexed = LineLexer.lex("\t\t\\fork 条件を満足する  \\in データ3 \\out データ4 \\in データ5")
+        assert lexed.level == 2
+        assert lexed.type.type_value == LineTypeDefine.get_format_by_type(LineTypeEnum.FORK).type_value
+        assert lexed.text_typeless == "条件を満足する  \\in データ3 \\out データ4 \\in データ5"
+        assert lexed.in_names == ["データ3", "データ5"]
+        assert lexed.out_names == ["データ4"]
+        assert lexed.text_clean == "条件を満足する"
+
+    def test_unknown_type(self) -> None:
+        """未定義の種別はNORMALとして扱うことを確認"""
+        lexed = LineLexer.lex("\\unknown 処理")
+        assert lexed.type.type_value == LineTypeDefine.get_format_by_type(LineTypeEnum.NORMAL).type_value
+        assert lexed.text_clean == "\\unknown 処理"
 
 
 class TestParserInitialization:
@@ -76,14 +80,124 @@ class TestParserInitialization:
 
     def test_initialization(self) -> None:
         """正常な初期化のテスト"""
-        test_data = ["line1", "line2"]
+        test_data = ["line1", "    line2 \\in data1", "\\data data2"]
         parser = DiagramParser(test_data)
-        assert parser.text_data == test_data
+        assert [info.text_org for info in parser.line_info_list] == test_data
+        assert [info.text_clean for info in parser.process_line_info_list] == ["line1", "line2"]
+        assert [info.text_clean for info in parser.data_line_info_list] == ["data2", "data1"]
 
     def test_empty_initialization(self) -> None:
         """空リストでの初期化テスト"""
         parser = DiagramParser([])
-        assert parser.text_data == []
+        assert parser.line_info_list == []
+        assert parser.process_level_min == LineLevel.LEVEL_MIN
+
+
+def assign_line_relationships_naive(levels: list[int]) -> list[tuple[int, int]]:
+    """前後関係を各行から遡って決定する比較用の実装"""
+    before_nos = [-1] * len(levels)
+    next_nos = [-1] * len(levels)
+    for count, level in enumerate(levels):
+        for search_idx in range(count - 1, -1, -1):
+            if levels[search_idx] == level:
+                before_nos[count] = search_idx
+                next_nos[search_idx] = count
+                break
+            elif levels[search_idx] < level:
+                break
+    return list(zip(before_nos, next_nos))
+
+
+class TestAssignLineRelationships:
+    """__assign_line_relationshipsメソッドのテストクラス"""
+
+    assign_line_relationships = staticmethod(DiagramParser._DiagramParser__assign_line_relationships)  # type: ignore[attr-defined]
+
+    def test_relationships(self) -> None:
+        """レベルに応じた前後関係が求まることを確認"""
+        relationships = self.assign_line_relationships([0, 1, 2, 1, 0, 1])
+        assert [before_no for before_no, _ in relationships] == [-1, -1, -1, 1, 0, -1]
+        assert [next_no for _, next_no in relationships] == [4, 3, -1, -1, -1, -1]
+
+    def test_set_to_line_info(self) -> None:
+        """パース結果の各行に行番号と前後関係が設定されることを確認"""
+        parser = DiagramParser(["step0", "    step1", "        step2", "    step3", "step4", "    step5"])
+        assert [info.no for info in parser.process_line_info_list] == [0, 1, 2, 3, 4, 5]
+        assert [info.before_no for info in parser.process_line_info_list] == [-1, -1, -1, 1, 0, -1]
+        assert [info.next_no for info in parser.process_line_info_list] == [4, 3, -1, -1, -1, -1]
+
+    @pytest.mark.parametrize("seed", range(5))
+    def test_same_as_naive(self, seed: int) -> None:
+        """遡って探索する実装と同じ結果になることを確認"""
+        rand = random.Random(seed)
+        levels = [rand.randint(0, 6) for _ in range(500)]
+        assert self.assign_line_relationships(levels) == assign_line_relationships_naive(levels)
+
+    def test_linear_operation_count(self) -> None:
+        """行数に対してレベルを参照する回数が線形に増えることを確認
+
+        レベルが1つずつ浅くなる行が続くと、遡る探索では行数の2乗に比例する
+        処理時間は環境によってばらつくため、レベルを参照した回数で判定する
+        """
+
+        class CountingList(list[int]):
+            """要素を参照した回数を数えるリスト"""
+
+            read_count = 0
+
+            def __getitem__(self, index):  # type: ignore[no-untyped-def]
+                self.read_count += 1
+                return super().__getitem__(index)
+
+        for line_count in (1000, 8000):
+            levels = CountingList([0] + list(range(line_count, 0, -1)))
+            self.assign_line_relationships(levels)
+            # 各行につき、積んだ行を取り除く比較・取り除かない比較・同じレベルの比較の高々3回
+            assert levels.read_count <= 3 * len(levels)
+
+
+class TestMemory:
+    """パース結果のメモリ使用量のテストクラス
+
+    使用量そのものはbenchmark/run_memory.pyでベースラインの表現と比較する
+    """
+
+    def test_no_instance_dict(self) -> None:
+        """行ごとの情報が__dict__を持たないことを確認"""
+        line_info = DiagramParser(["step \\in data1"]).line_info_list[0]
+        assert not hasattr(line_info, "__dict__")
+        assert not hasattr(line_info.level, "__dict__")
+        assert not hasattr(line_info.iodata, "__dict__")
+        assert not hasattr(line_info.iodata.in_data_list[0], "__dict__")
+
+    def test_shared_type_format(self) -> None:
+        """種別の形式を行ごとに生成せず共有することを確認"""
+        parser = DiagramParser(["step1", "step2", "\\fork step3", "\\fork step4"])
+        assert parser.line_info_list[0].type is parser.line_info_list[1].type
+        assert parser.line_info_list[2].type is parser.line_info_list[3].type
+        assert parser.line_info_list[0].type is LineInfo().type
+
+
+class TestImmutable:
+    """パース結果を変更できないことのテストクラス"""
+
+    def test_frozen(self) -> None:
+        """行ごとの情報とその属性を変更できないことを確認"""
+        parser = DiagramParser(["step \\in data1", "    step2"])
+        line_info = parser.process_line_info_list[0]
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            line_info.no = 1  # type: ignore[misc]
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            line_info.level.value = 1  # type: ignore[misc]
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            line_info.iodata.in_data_list[0].name = "data2"  # type: ignore[misc]
+        assert isinstance(line_info.iodata.in_data_list, tuple)
+
+    def test_shared_level(self) -> None:
+        """同じレベルの行はレベルの情報を共有することを確認"""
+        parser = DiagramParser(["step1", "    step2", "step3"])
+        assert parser.line_info_list[0].level is parser.line_info_list[2].level
+        assert parser.line_info_list[1].level.value == 1
 
 
 class TestConstants:
@@ -91,8 +205,7 @@ class TestConstants:
 
     def test_constant_values(self) -> None:
         """各定数が期待値と一致することを確認"""
-        assert DiagramParser.LEVEL_MIN == 0
-        assert DiagramParser.LEVEL_MAX == 9
-        assert DiagramParser.LEVEL_ERROR == -1
-        assert DiagramParser.LEVEL_NONE == -2
-        assert DiagramParser.TAB2SPACE == 4
+        assert LineLevel.LEVEL_MIN == 0
+        assert LineLevel.LEVEL_ERROR == -1
+        assert LineLevel.LEVEL_NONE == -2
+        assert LineLevel.TAB2SPACE == 4
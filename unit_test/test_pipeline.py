@@ -0,0 +1,45 @@
+import threading
+from collections.abc import Iterator
+
+import pytest
+
+from src.pipeline import prefetch
+
+
+class TestPrefetch:
+    """prefetchのテストクラス"""
+
+    def test_order(self) -> None:
+        """上流の要素を順に受け渡すことを確認"""
+        assert list(prefetch(range(100), 4)) == list(range(100))
+
+    def test_bounded(self) -> None:
+        """先読みする要素の数が上限を超えないことを確認"""
+        produced: list[int] = []
+        reached = threading.Event()
+
+        def produce() -> Iterator[int]:
+            for i in range(100):
+                produced.append(i)
+                if i == 3:
+                    reached.set()
+                yield i
+
+        items = prefetch(produce(), 2)
+        assert next(items) == 0
+        assert reached.wait(1.0)
+        # 取り出した1件・キュー内の2件・キューの空きを待つ1件
+        assert len(produced) <= 4
+        items.close()
+
+    def test_error(self) -> None:
+        """上流で発生した例外を下流で送出することを確認"""
+
+        def produce() -> Iterator[int]:
+            yield 1
+            raise ValueError("上流のエラー")
+
+        items = prefetch(produce(), 4)
+        assert next(items) == 1
+        with pytest.raises(ValueError, match="上流のエラー"):
+            next(items)
@@ -0,0 +1,119 @@
+import json
+import os
+import threading
+
+import pytest
+
+from src.core import get_render_cache
+from src.main_cli import main
+from src.profiler import NullProfiler, Profiler
+
+HCP_TEXT = "\n".join(
+    [
+        "\\module モジュール1",
+        "    \\data データ1",
+        "    処理開始 \\in データ1",
+        "        処理 \\out データ2",
+        "",
+        "\\module モジュール2",
+        "    処理開始",
+    ]
+)
+
+
+class TestProfiler:
+    """Profilerのテストクラス"""
+
+    def test_span_inherits_context(self) -> None:
+        """入れ子の区間がファイル名・モジュール名を引き継ぎ、カウンタを記録することを確認"""
+        profiler = Profiler()
+        with profiler.span("file", file="a.hcp"):
+            with profiler.span("module", module="m"):
+                with profiler.span("parse"):
+                    profiler.add_counters(lines=3)
+                    profiler.add_counters(lines=2)
+
+        assert [event.name for event in profiler.events] == ["parse", "module", "file"]
+        assert profiler.events[0].args == {"file": "a.hcp", "module": "m", "lines": 5}
+        assert profiler.get_module_counters()[("a.hcp", "m")] == {"lines": 5}
+
+    def test_concurrent_span_thread_ids(self, tmp_path: str) -> None:
+        """並行するスレッドの区間が、それぞれのスレッドIDでトレースに保存されることを確認"""
+        profiler = Profiler()
+        barrier = threading.Barrier(2)
+
+        def work(module_name: str) -> None:
+            with profiler.span("module", module=module_name):
+                barrier.wait()
+
+        threads = [threading.Thread(target=work, args=(module_name,)) for module_name in ("m1", "m2")]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        profiler.record("module", 0.0, 0.1, pid=1, tid=2, module="m3")
+
+        trace_path = os.path.join(tmp_path, "trace.json")
+        profiler.write_trace(trace_path)
+        with open(trace_path, encoding="utf-8") as f:
+            trace_events = {event["args"]["module"]: event for event in json.load(f)["traceEvents"]}
+        assert trace_events["m1"]["tid"] != trace_events["m2"]["tid"]
+        assert trace_events["m1"]["pid"] == trace_events["m2"]["pid"] == os.getpid()
+        assert (trace_events["m3"]["pid"], trace_events["m3"]["tid"]) == (1, 2)
+
+    def test_null_profiler(self) -> None:
+        """無効時は共有の区間を返し、何も記録しないことを確認"""
+        profiler = NullProfiler()
+        assert profiler.span("a", file="x") is profiler.span("b")
+        with profiler.span("a"):
+            profiler.add_counters(lines=1)
+
+
+class TestMainProfile:
+    """main_cliの計測オプションのテストクラス"""
+
+    @pytest.fixture
+    def input_path(self, tmp_path: str) -> str:
+        input_path = os.path.join(tmp_path, "input", "")
+        os.makedirs(input_path)
+        with open(os.path.join(input_path, "sample.hcp"), "w", encoding="utf-8") as f:
+            f.write(HCP_TEXT)
+        return input_path
+
+    def test_profile_summary_and_trace(self, input_path: str, tmp_path: str, capsys: pytest.CaptureFixture[str]) -> None:
+        """上位のファイル・モジュールの表示とトレースの保存を確認"""
+        trace_path = os.path.join(tmp_path, "trace.json")
+        # 他のテストで描画したモジュールをキャッシュから返さないようにする
+        get_render_cache().clear()
+        main(input_path, os.path.join(tmp_path, ""), profile_top=2, trace_path=trace_path)
+
+        output = capsys.readouterr().out
+        assert "sample.hcp" in output
+        assert "モジュール1  lines=3 elements=4 connectors=2" in output
+        assert "モジュール2  lines=1 elements=1 connectors=0" in output
+
+        with open(trace_path, encoding="utf-8") as f:
+            trace_events = json.load(f)["traceEvents"]
+        names = {event["name"] for event in trace_events}
+        assert {"file", "module", "read", "split", "parse", "render"} <= names
+        assert all(event["ph"] == "X" and event["dur"] >= 0 for event in trace_events)
+
+    @pytest.mark.parametrize("executor", ["process", "thread"])
+    def test_profile_parallel_file_totals(self, input_path: str, tmp_path: str, executor: str) -> None:
+        """並列変換でも、モジュールの処理時間がファイルの処理時間に含まれることを確認"""
+        trace_path = os.path.join(tmp_path, "trace.json")
+        get_render_cache().clear()
+        main(input_path, os.path.join(tmp_path, ""), trace_path=trace_path, incremental=False, jobs=2, executor=executor)
+
+        with open(trace_path, encoding="utf-8") as f:
+            trace_events = json.load(f)["traceEvents"]
+        file_total = sum(event["dur"] for event in trace_events if event["name"] == "file")
+        module_total = sum(event["dur"] for event in trace_events if event["name"] == "module")
+        assert module_total > 0
+        assert file_total >= module_total
+
+    def test_profile_disabled(self, input_path: str, tmp_path: str, capsys: pytest.CaptureFixture[str]) -> None:
+        """計測しない場合は何も表示しないことを確認"""
+        main(input_path, os.path.join(tmp_path, ""))
+        assert capsys.readouterr().out == ""
+        assert os.path.exists(os.path.join(tmp_path, "sample_モジュール1.svg"))
@@ -0,0 +1,129 @@
+import io
+import re
+
+import pytest
+
+from src.core import create_renderer
+from src.define import RenderOption
+
+SECTION_LINES = [
+    "    \\data データ1",
+    "    処理開始 \\in データ1",
+    "        \\fork 分岐 \\in データ1 \\out データ2",
+    "            \\true 真の場合",
+    "                \\return",
+]
+
+
+class TestSVGRendererWrite:
+    """SVGRenderer.writeのテストクラス"""
+
+    @pytest.fixture
+    def expected(self) -> str:
+        """文字列として描画したSVG"""
+        return create_renderer("module", SECTION_LINES).render()
+
+    def test_write_text(self, expected: str) -> None:
+        """テキストストリームへ書き出した結果が文字列の描画と一致することを確認"""
+        stream = io.StringIO()
+        create_renderer("module", SECTION_LINES).write(stream)
+        assert stream.getvalue() == expected
+
+    def test_write_binary(self, expected: str) -> None:
+        """バイナリストリームへ書き出した結果が文字列の描画と一致することを確認"""
+        stream = io.BytesIO()
+        create_renderer("module", SECTION_LINES).write(stream)
+        assert stream.getvalue() == expected.encode("utf-8")
+
+
+class TestSymbolMode:
+    """図形を<use>で配置する描画のテストクラス"""
+
+    def test_same_canvas(self) -> None:
+        """通常の描画と同じ画像サイズになることを確認"""
+        normal = create_renderer("module", SECTION_LINES).render()
+        symbol = create_renderer("module", SECTION_LINES, RenderOption(use_symbols=True)).render()
+        assert normal.split("\n")[0] == symbol.split("\n")[0]
+
+    def test_glyph_defined_once(self) -> None:
+        """図形は一度だけ定義して<use>で配置することを確認"""
+        symbol = create_renderer("module", SECTION_LINES, RenderOption(use_symbols=True)).render()
+        assert symbol.count('<g id="fork">') == 1
+        assert symbol.count('<use href="#fork"') == 1
+        assert symbol.count('<use href="#cond"') == 1
+        assert "<circle" not in symbol.split("<defs>")[0]
+
+    def test_define_used_glyphs(self) -> None:
+        """配置した図形だけを定義し、矢印は色を<use>で指定することを確認"""
+        symbol = create_renderer("module", SECTION_LINES, RenderOption(use_symbols=True)).render()
+        defined = re.findall(r'<g id="([\w-]+)">', symbol)
+        assert sorted(defined) == sorted(set(re.findall(r'<use href="#([\w-]+)"', symbol)))
+        assert "repeat" not in defined
+        assert re.search(r'<use href="#arrow-[rl]" x="-?\d+" y="-?\d+" color="\w+"/>', symbol)
+
+    def test_size_ratio(self) -> None:
+        """大きなモジュールでは、通常の描画より数倍小さくなることを確認"""
+        types = ["", "\\fork ", "\\repeat ", "\\mod "]
+        section_lines = [f"    \\data データ{count}" for count in range(10)] + [
+            "    " * (1 + count % 4)
+            + types[count % len(types)]
+            + f"処理{count}"
+            + (f" \\in データ{count % 10}" if count % 3 == 0 else "")
+            + (f" \\out データ{count % 7}" if count % 5 == 0 else "")
+            for count in range(200)
+        ]
+        normal_size = len(create_renderer("module", section_lines).render().encode("utf-8"))
+        symbol_size = len(create_renderer("module", section_lines, RenderOption(use_symbols=True)).render().encode("utf-8"))
+        batch_size = len(create_renderer("module", section_lines, RenderOption(use_symbols=True, batch_lines=True)).render().encode("utf-8"))
+        # 作成時点では、それぞれ約2.7倍・約3.2倍小さくなる
+        assert normal_size / symbol_size >= 2.5
+        assert normal_size / batch_size >= 3.0
+
+    def test_write_same_as_render(self) -> None:
+        """ストリームへの書き出しでも定義が含まれることを確認"""
+        stream = io.StringIO()
+        create_renderer("module", SECTION_LINES, RenderOption(use_symbols=True)).write(stream)
+        assert stream.getvalue() == create_renderer("module", SECTION_LINES, RenderOption(use_symbols=True)).render()
+
+
+def parse_line_segments(svg: str) -> list[tuple[str, int, int, int, int]]:
+    """<line>要素を(色, x1, y1, x2, y2)のリストとして取得する"""
+    pattern = re.compile(r'<line x1="(-?\d+)" y1="(-?\d+)" x2="(-?\d+)" y2="(-?\d+)" stroke="(\w+)"/>')
+    return [(m[4], int(m[0]), int(m[1]), int(m[2]), int(m[3])) for m in pattern.findall(svg)]
+
+
+def parse_path_segments(svg: str) -> list[tuple[str, int, int, int, int]]:
+    """まとめた<path>要素を(色, x1, y1, x2, y2)のリストとして取得する"""
+    segments: list[tuple[str, int, int, int, int]] = []
+    for d, color in re.findall(r'<path d="(M[^"]*)" stroke="(\w+)" fill="none"/>', svg):
+        x = y = 0
+        for command, args in re.findall(r"([MmhvlL])([-\d ]+)", d):
+            values = [int(value) for value in args.split()]
+            if command == "M":
+                x, y = values
+            elif command == "m":
+                x, y = x + values[0], y + values[1]
+            else:
+                dx, dy = {"h": (values[0], 0), "v": (0, values[0])}.get(command, tuple(values))
+                segments.append((color, x, y, x + dx, y + dy))
+                x, y = x + dx, y + dy
+    return segments
+
+
+class TestBatchLines:
+    """線分をまとめて描画するテストクラス"""
+
+    def test_same_segments(self) -> None:
+        """まとめた<path>が個別の<line>と同じ線分を表すことを確認"""
+        normal = create_renderer("module", SECTION_LINES).render()
+        batched = create_renderer("module", SECTION_LINES, RenderOption(batch_lines=True)).render()
+
+        assert "<line" not in batched
+        assert sorted(parse_path_segments(batched)) == sorted(parse_line_segments(normal))
+        assert normal.split("\n")[0] == batched.split("\n")[0]
+
+    def test_one_path_per_color(self) -> None:
+        """色ごとに1つの<path>へまとめることを確認"""
+        batched = create_renderer("module", SECTION_LINES, RenderOption(batch_lines=True)).render()
+        colors = re.findall(r'<path d="M[^"]*" stroke="(\w+)" fill="none"/>', batched)
+        assert len(colors) == len(set(colors))
@@ -0,0 +1,128 @@
+import os
+
+from src.core import create_renderer, get_render_cache, render_section
+from src.define import RenderOption
+from src.main_cli import main
+from src.render_cache import DiskRenderCache, RenderCache, get_section_digest
+
+SECTION_LINES = [
+    "    \\data データ1",
+    "    処理開始 \\in データ1",
+    "        処理 \\out データ2",
+]
+
+
+class TestSectionDigest:
+    """get_section_digestのテストクラス"""
+
+    def test_digest(self) -> None:
+        """内容・モジュール名・描画方法のいずれかが異なればハッシュ値も異なることを確認"""
+        digest = get_section_digest("module", SECTION_LINES, RenderOption())
+        assert digest == get_section_digest("module", list(SECTION_LINES), RenderOption())
+        assert digest != get_section_digest("module2", SECTION_LINES, RenderOption())
+        assert digest != get_section_digest("module", SECTION_LINES[:-1], RenderOption())
+        assert digest != get_section_digest("module", SECTION_LINES, RenderOption(batch_lines=True))
+        # 行の区切りが変わった場合も区別する
+        assert get_section_digest("m", ["ab", "c"], RenderOption()) != get_section_digest("m", ["a", "bc"], RenderOption())
+
+
+class TestRenderCache:
+    """RenderCacheのテストクラス"""
+
+    def test_lru(self) -> None:
+        """上限を超えると最も長く参照されていないものから破棄することを確認"""
+        cache = RenderCache(maxsize=2)
+        cache.put("a", "svg_a")
+        cache.put("b", "svg_b")
+        assert cache.get("a") == "svg_a"
+        cache.put("c", "svg_c")
+
+        assert cache.get("b") is None
+        assert cache.get("a") == "svg_a"
+        assert cache.get("c") == "svg_c"
+        assert tuple(cache.cache_info()) == (3, 1, 2, 2)
+
+    def test_disabled(self) -> None:
+        """上限が0なら保持しないことを確認"""
+        cache = RenderCache(maxsize=0)
+        cache.put("a", "svg_a")
+        assert cache.get("a") is None
+        assert cache.cache_info().currsize == 0
+
+
+class TestRenderSection:
+    """render_sectionのテストクラス"""
+
+    def test_render_section(self) -> None:
+        """2回目はキャッシュから同じSVGを返すことを確認"""
+        get_render_cache().clear()
+        expected = create_renderer("module", SECTION_LINES).render()
+
+        assert render_section("module", SECTION_LINES) == expected
+        assert render_section("module", list(SECTION_LINES)) == expected
+        cache_info = get_render_cache().cache_info()
+        assert (cache_info.hits, cache_info.misses) == (1, 1)
+
+
+class TestDiskRenderCache:
+    """DiskRenderCacheのテストクラス"""
+
+    def test_get_put(self, tmp_path: str) -> None:
+        """保存したSVGを別の接続から取得でき、ツールのバージョンが異なれば取得しないことを確認"""
+        path = os.path.join(tmp_path, "cache.db")
+        cache = DiskRenderCache(path, tool_version="1")
+        cache.put("a", "<svg>あ</svg>")
+        cache.close()
+
+        cache = DiskRenderCache(path, tool_version="1")
+        assert cache.get("a") == "<svg>あ</svg>"
+        assert cache.get("b") is None
+        assert cache.cache_info().hits == 1
+        assert cache.cache_info().misses == 1
+        assert DiskRenderCache(path, tool_version="2").get("a") is None
+
+    def test_evict(self, tmp_path: str) -> None:
+        """合計サイズが上限を超えると最も長く参照されていないものから破棄することを確認"""
+        svg_img = "<svg>" + os.urandom(100).hex() + "</svg>"
+        cache = DiskRenderCache(os.path.join(tmp_path, "cache.db"), max_bytes=300)
+        for digest in ["a", "b", "c", "d"]:
+            cache.put(digest, svg_img)
+            # aは参照し続ける
+            cache.get("a")
+
+        assert cache.get("a") == svg_img
+        assert cache.get("b") is None
+        assert cache.get("d") == svg_img
+        assert cache.cache_info().currsize <= 300
+
+    def test_bundle(self, tmp_path: str) -> None:
+        """書き出したキャッシュを別のキャッシュへ取り込めることを確認"""
+        bundle_path = os.path.join(tmp_path, "bundle.db")
+        cache = DiskRenderCache(os.path.join(tmp_path, "cache1.db"))
+        cache.put("a", "svg_a")
+        cache.export_bundle(bundle_path)
+
+        cache = DiskRenderCache(os.path.join(tmp_path, "cache2.db"))
+        cache.put("b", "svg_b")
+        cache.import_bundle(bundle_path)
+        assert cache.get("a") == "svg_a"
+        assert cache.get("b") == "svg_b"
+
+    def test_main_cli(self, tmp_path: str) -> None:
+        """キャッシュを用いても出力が変わらないことを確認"""
+        input_path = os.path.join(tmp_path, "input", "")
+        os.makedirs(input_path)
+        with open(os.path.join(input_path, "sample.hcp"), "w", encoding="utf-8") as f:
+            f.write("\\module module\n" + "\n".join(SECTION_LINES))
+
+        cache_path = os.path.join(tmp_path, "cache.db")
+        svg_images: list[str] = []
+        for output_name in ["plain", "cold", "warm"]:
+            output_path = os.path.join(tmp_path, output_name, "")
+            os.makedirs(output_path)
+            main(input_path, output_path, cache_path=None if output_name == "plain" else cache_path)
+            with open(os.path.join(output_path, "sample_module.svg"), encoding="utf-8") as f:
+                svg_images.append(f.read())
+
+        assert svg_images[0] == svg_images[1] == svg_images[2]
+        assert DiskRenderCache(cache_path).cache_info().currsize > 0
@@ -0,0 +1,94 @@
+import struct
+from pathlib import Path
+
+import pytest
+
+from src.text_metrics import TextMetrics
+
+
+def create_font_file(path: Path, advances: dict[str, int], units_per_em: int = 1000) -> None:
+    """指定した文字と送り幅だけを持つフォントファイルを生成する
+
+    文字ごとに1つのグリフを割り当て、cmapはformat 4で記載する
+    """
+    chars = sorted(advances)
+    # グリフ0は未定義文字用
+    hmtx = struct.pack(">Hh", 0, 0) + b"".join(struct.pack(">Hh", advances[char], 0) for char in chars)
+    hhea = bytes(34) + struct.pack(">H", len(chars) + 1)
+    head = bytes(18) + struct.pack(">H", units_per_em)
+
+    # 1文字ごとに1セグメントとし、末尾に0xFFFFのセグメントを置く
+    codes = [ord(char) for char in chars] + [0xFFFF]
+    deltas = [(glyph_id - code) & 0xFFFF for glyph_id, code in enumerate(codes[:-1], start=1)] + [1]
+    seg_count = len(codes)
+    format4 = struct.pack(">HHHHHHH", 4, 0, 0, seg_count * 2, 0, 0, 0)
+    format4 += struct.pack(f">{seg_count}H", *codes) + b"\x00\x00"
+    format4 += struct.pack(f">{seg_count}H", *codes)
+    format4 += struct.pack(f">{seg_count}H", *deltas)
+    format4 += struct.pack(f">{seg_count}H", *([0] * seg_count))
+    cmap = struct.pack(">HHHHI", 0, 1, 3, 1, 12) + format4
+
+    tables = {"cmap": cmap, "head": head, "hhea": hhea, "hmtx": hmtx}
+    offset = 12 + 16 * len(tables)
+    directory = struct.pack(">IHHHH", 0x00010000, len(tables), 0, 0, 0)
+    body = b""
+    for tag, table in tables.items():
+        directory += tag.encode("latin-1") + struct.pack(">III", 0, offset + len(body), len(table))
+        body += table
+    path.write_bytes(directory + body)
+
+
+class TestGetCharWidth:
+    """get_char_widthメソッドのテストクラス"""
+
+    @pytest.mark.parametrize(
+        "char,expected_width",
+        [
+            ("a", 0.5),  # ASCII
+            ("あ", 1.0),  # 全角
+            ("Ａ", 1.0),  # 全角英字
+            ("ｱ", 0.5),  # 半角カナ
+            ("́", 0.0),  # 結合文字
+            ("ŵ", 0.5),  # ASCII以外の半角
+            ("é", 1.0),  # 曖昧な幅は全角
+        ],
+    )
+    def test_char_width(self, char: str, expected_width: float) -> None:
+        """East Asian Widthに基づいた幅になることを確認"""
+        assert TextMetrics.get_char_width(char) == expected_width
+
+
+class TestGetTextWidth:
+    """get_text_widthメソッドのテストクラス"""
+
+    def test_text_width(self) -> None:
+        """文字幅を積算して切り上げた幅になることを確認"""
+        metrics = TextMetrics()
+        assert metrics.get_text_width("abc", 12) == 24
+        assert metrics.get_text_width("処理ｱ", 12) == 36
+
+    def test_cache(self) -> None:
+        """同じ文字列とフォントサイズはキャッシュから返すことを確認"""
+        metrics = TextMetrics(cache_size=2)
+        metrics.get_text_width("abc", 12)
+        metrics.get_text_width("abc", 12)
+        metrics.get_text_width("abc", 18)
+        metrics.get_text_width("def", 12)
+        info = metrics.cache_info()
+        assert (info.hits, info.misses, info.currsize) == (1, 3, 2)
+
+    def test_font_file(self, tmp_path: Path) -> None:
+        """フォントファイルの送り幅を優先することを確認"""
+        font_path = tmp_path / "test.ttf"
+        create_font_file(font_path, {"a": 600, "i": 250})
+        metrics = TextMetrics(str(font_path))
+        assert metrics.font_widths == {ord("a"): 0.6, ord("i"): 0.25}
+        # 1.45em + フォントにない文字(全角)1em
+        assert metrics.get_text_width("aai処", 10) == 25
+
+    def test_invalid_font_file(self, tmp_path: Path) -> None:
+        """フォントファイルとして解釈できない場合は例外が発生することを確認"""
+        font_path = tmp_path / "broken.ttf"
+        font_path.write_bytes(b"\x00\x01\x00\x00\x00\x01")
+        with pytest.raises(ValueError, match="フォントファイルを解釈できません"):
+            TextMetrics(str(font_path))